@@ -1,28 +1,128 @@
 import os
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import AsyncIterator
+from typing import AsyncContextManager
+from typing import Callable
+from typing_extensions import Annotated
 
 from dotenv import load_dotenv
 
+from pydantic import BeforeValidator
+
+from starlette.requests import Request
+from starlette.concurrency import run_in_threadpool
+
 from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from apps.utils.database.database import env_bool
+from apps.utils.database.database import PoolMetrics
+from apps.utils.database.database import engine_options
 
 load_dotenv()
 
 DB_URL = os.getenv('DB_URL')
+# Opcional: URL con un driver asíncrono (ej: 'postgresql+asyncpg://...').
+# Si no se define, las rutas usan el engine síncrono desde el threadpool.
+ASYNC_DB_URL = os.getenv('ASYNC_DB_URL')
 SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM_JWT = os.getenv('ALGORITHM_JWT')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES'))
 REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv('REFRESH_TOKEN_EXPIRE_MINUTES'))
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv('ACCESS_TOKEN_EXPIRE_HOURS'))
 REFRESH_TOKEN_EXPIRE_HOURS = int(os.getenv('REFRESH_TOKEN_EXPIRE_HOURS'))
+# Tokens verificados que se guardan en memoria por worker, 0 lo desactiva
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 1024))
+# Versión mínima de token aceptada. Los tokens v1 (perfil completo en el
+# payload) siguen valiendo hasta que expiren; después se puede subir a 2
+TOKEN_MIN_VERSION = int(os.getenv('TOKEN_MIN_VERSION', 1))
+# Con ALGORITHM_JWT 'ES256' o 'EdDSA' las llaves se leen de este directorio
+# en lugar de usar SECRET_KEY (ver apps/utils/token/keys.py)
+JWT_KEYS_DIR = os.getenv('JWT_KEYS_DIR')
+# Cada cuántos segundos se revisa si se rotaron las llaves
+JWT_KEYS_REFRESH = int(os.getenv('JWT_KEYS_REFRESH', 60))
+# Filtro de Bloom de familias de refresh tokens revocadas, por worker.
+# Se recarga desde la base de datos cada REVOCATION_REFRESH segundos
+REVOCATION_CAPACITY = int(os.getenv('REVOCATION_CAPACITY', 10000))
+REVOCATION_ERROR_RATE = float(os.getenv('REVOCATION_ERROR_RATE', 0.01))
+REVOCATION_REFRESH = int(os.getenv('REVOCATION_REFRESH', 30))
+# Detalle de proyectos y tickets en memoria por worker (apps/utils/cache).
+# Las escrituras lo invalidan; el TTL acota lo que ve un worker de los
+# cambios hechos en otro. 0 en cualquiera de los dos lo desactiva
+DETAIL_CACHE_SIZE = int(os.getenv('DETAIL_CACHE_SIZE', 1024))
+DETAIL_CACHE_TTL = int(os.getenv('DETAIL_CACHE_TTL', 30))
+
+# Ajustes del pool, se dimensionan por cada worker de uvicorn
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', -1))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_PRE_PING = env_bool(os.getenv('DB_POOL_PRE_PING'), default = False)
+# En milisegundos (solo PostgreSQL), 0 lo desactiva
+DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 0))
+DB_INSERTMANYVALUES_PAGE_SIZE = int(os.getenv('DB_INSERTMANYVALUES_PAGE_SIZE', 1000))
+# Búsqueda de tickets: 'auto', 'postgres' (pg_trgm), 'fts5' (SQLite), 'memory' o 'like'
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+# Con 'false' los helpers internos no vuelven a validar con pydantic
+# los argumentos que ya validó FastAPI (ver apps/utils/validation)
+VALIDATE_CALL = env_bool(os.getenv('VALIDATE_CALL'), default = True)
+# Hilos para bcrypt y tareas que pueden esperar antes de responder 503
+PASSWORD_WORKERS = int(os.getenv('PASSWORD_WORKERS', os.cpu_count() or 1))
+PASSWORD_QUEUE_SIZE = int(os.getenv('PASSWORD_QUEUE_SIZE', 32))
+# Costo de bcrypt (4-31), ver apps/users/commands/utils/benchmark.py
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', 10))
 
 
+pool_metrics = PoolMetrics()
+
 engine = create_engine(
-	DB_URL
+	DB_URL,
+	**engine_options(
+		url = DB_URL,
+		pool_size = DB_POOL_SIZE,
+		max_overflow = DB_MAX_OVERFLOW,
+		pool_recycle = DB_POOL_RECYCLE,
+		pool_pre_ping = DB_POOL_PRE_PING,
+		pool_timeout = DB_POOL_TIMEOUT,
+		statement_timeout = DB_STATEMENT_TIMEOUT,
+		insertmanyvalues_page_size = DB_INSERTMANYVALUES_PAGE_SIZE
+	)
 )
 
+pool_metrics.register(engine)
+
 session = sessionmaker(autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+	ASYNC_DB_URL,
+	**engine_options(
+		url = ASYNC_DB_URL,
+		pool_size = DB_POOL_SIZE,
+		max_overflow = DB_MAX_OVERFLOW,
+		pool_recycle = DB_POOL_RECYCLE,
+		pool_pre_ping = DB_POOL_PRE_PING,
+		pool_timeout = DB_POOL_TIMEOUT,
+		statement_timeout = DB_STATEMENT_TIMEOUT,
+		insertmanyvalues_page_size = DB_INSERTMANYVALUES_PAGE_SIZE
+	)
+) if ASYNC_DB_URL else None
+
+if async_engine is not None:
+	pool_metrics.register(async_engine.sync_engine)
+
+async_session = async_sessionmaker(
+	autoflush=False, 
+	expire_on_commit=False,
+	bind=async_engine
+) if async_engine is not None else None
+
 def get_db():
 	db = session()
 	try:
@@ -30,6 +130,73 @@ def get_db():
 	finally:
 		db.close()
 
+@asynccontextmanager
+async def open_db() -> AsyncIterator[AsyncSession | Session]:
+	# Sesión asíncrona si hay ASYNC_DB_URL, si no la síncrona; se cierra al salir del bloque
+	if async_session is None:
+		db = session()
+		try:
+			yield db
+		finally:
+			await run_in_threadpool(db.close)
+		return
+
+	async with async_session() as db:
+		yield db
+
+async def get_async_db():
+	async with open_db() as db:
+		yield db
+
+
+@asynccontextmanager
+async def open_dependency(dependency: Callable) -> AsyncIterator[AsyncSession | Session]:
+	# 'get_async_db' o su reemplazo: generador asíncrono o síncrono
+	if inspect.isasyncgenfunction(dependency):
+		async with asynccontextmanager(dependency)() as db:
+			yield db
+		return
+
+	generator = dependency()
+	db = next(generator)
+	try:
+		yield db
+	finally:
+		await run_in_threadpool(generator.close)
+
+def get_db_opener(request: Request) -> Callable[[], AsyncContextManager[AsyncSession | Session]]:
+	"""
+		Para abrir otra sesión fuera de la petición (ej: en una
+		'BackgroundTask', cuando la de 'get_async_db' ya se cerró) con
+		la misma dependencia, incluido su 'dependency_overrides'.
+	"""
+	dependency = request.app.dependency_overrides.get(get_async_db, get_async_db)
+
+	return lambda: open_dependency(dependency)
+
+
+async def run_command(db: AsyncSession | Session, command: Callable, **kwargs) -> Any:
+	"""
+		Ejecuta un 'command' síncrono sin bloquear el event loop:
+		sobre la conexión asíncrona con 'run_sync' o en el threadpool 
+		cuando la sesión es síncrona.
+	"""
+	if isinstance(db, AsyncSession):
+		return await db.run_sync(
+			lambda sync_db: command(db = sync_db, **kwargs)
+		)
+
+	return await run_in_threadpool(command, db = db, **kwargs)
+
+
+def is_session(value: Session) -> Session:
+	if not isinstance(value, Session):
+		raise ValueError("el objeto debe ser de tipo 'Session'")
+
+	return value
+
+SessionDB = Annotated[Any, BeforeValidator(is_session)]
+
 
 class Model(DeclarativeBase):
 	pass
@@ -1,18 +1,28 @@
+import datetime
+from typing import Any
 from typing import List
 from typing import Dict
+from typing import Tuple
+from typing import Optional
 
 from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy import update
+from sqlalchemy import literal
+from sqlalchemy import union_all
 from sqlalchemy.orm import joinedload
 
-from pydantic import validate_call
+from apps.utils.validation.validation import validate_call
+from apps.utils.cache.cache import cache_key
+from apps.utils.cache.cache import detail_cache
 
-from apps import get_db
+from apps import SessionDB
 from apps.users.models.model import User
 from apps.projects.models import Project
 from apps.projects.schemas import schemas
 from apps.projects.models import ChoicesPrority
+from apps.tickets.models import Ticket
+from apps.tickets.models import ChoicesType
 
 from .utils.error_messages import (
 	InvalidPriority,
@@ -21,16 +31,20 @@ from .utils.error_messages import (
 )
 
 from apps.users.commands.utils.error_messages import DoesNotExistsUser
+from apps.tickets.commands.utils import counters
 
-from apps.utils.pagination.pagination import calculate_start_pagination
+from apps.utils.pagination.pagination import paginate
+from apps.utils.pagination.pagination import paginate_keyset
 from apps.utils.pagination.pagination import PageDefault
 from apps.utils.pagination.pagination import PageSizeDefault
 
 CHOICES:list = [choice.name for choice in ChoicesPrority]
 
+StatsDaysDefault = 30
+StatsDaysMax = 365
+
 @validate_call
-def command_create_project(project: schemas.ProjectRequest) -> Project:
-	db = next(get_db())
+def command_create_project(db: SessionDB, project: schemas.ProjectRequest) -> Project:
 	user = db.get(User, project.user_id)
 
 	if user is None:
@@ -47,19 +61,16 @@ def command_create_project(project: schemas.ProjectRequest) -> Project:
 	)
 
 	db.add(new_project)
+	db.flush()
+	counters.create_counters(db, project_id = new_project.id)
 	db.commit()
 	db.refresh(new_project)
+	db.refresh(new_project, ["user"])
 
 	return new_project
 
 
-@validate_call
-def command_get_project(project_id: int) -> Project:
-	db = next(get_db())
-
-	if db.query(Project).filter(Project.id == project_id).one_or_none() is None:
-		raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
-
+def load_project(db: SessionDB, project_id: int) -> Project:
 	sql = (
 		select(Project)
 		.options(joinedload(Project.user))
@@ -68,83 +79,192 @@ def command_get_project(project_id: int) -> Project:
 
 	project = db.scalar(sql)
 
+	if project is None:
+		raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
+
 	return project
 
 
+def project_tags(project: Project) -> List[str]:
+	# Los tickets en cache muestran su proyecto y el proyecto a su usuario
+	return [cache_key("project", project.id), cache_key("user", project.user_id)]
+
+
 @validate_call
-def command_update_project(project_id: int, infoUpdate: schemas.ProjectUpdate) -> Project:
-	db = next(get_db())
+def command_get_project(db: SessionDB, project_id: int) -> Project:
+	return detail_cache.load(
+		db,
+		key = cache_key("project", project_id),
+		loader = lambda: load_project(db, project_id = project_id),
+		tags = project_tags
+	)
+
 
+@validate_call
+def command_update_project(db: SessionDB, project_id: int, infoUpdate: schemas.ProjectUpdate) -> Project:
 	user = infoUpdate.model_dump(include = ['user_id'])
 	values = infoUpdate.model_dump(exclude_defaults = True, exclude = ['user_id'])
 
-	if db.query(Project).filter(Project.id == project_id).one_or_none() is None:
-		raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
-
-	if db.query(Project).filter(Project.id == project_id, Project.user_id == user['user_id']).one_or_none() is None:
-		raise ValueError(UnauthorizedProject.get(id = project_id), 401)
-
 	sql = (
 		update(Project)
 		.where(Project.id == project_id)
 		.where(Project.user_id == user['user_id'])
 		.values(**values)
 		.returning(Project)
+		# Si ya estaba en la sesión, toma los valores del RETURNING (Enums, 'updated')
+		.execution_options(populate_existing = True)
 	)
 
 	project = db.scalar(sql)
-	
-	db.close()
+
+	if project is None:
+		# Solo en el caso de error se consulta el motivo: no existe o no le pertenece
+		if db.get(Project, project_id) is None:
+			raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
+
+		raise ValueError(UnauthorizedProject.get(id = project_id), 401)
+
+	# Fuera de la sesión el commit no lo expira: la respuesta no vuelve a leerlo
+	db.expunge(project)
+	db.commit()
+	detail_cache.invalidate_tag(cache_key("project", project_id))
+
 	return project
 
 @validate_call
-def command_delete_project(project_id: int) -> None:
-	db = next(get_db())
-
+def command_delete_project(db: SessionDB, project_id: int) -> None:
 	project = db.get(Project, project_id)
 
 	if project is None:
 		raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
 
+	counters.delete_counters(db, project_id = project_id)
 	db.delete(project)
 	db.commit()
+	detail_cache.invalidate_tag(cache_key("project", project_id))
+
+@validate_call
+def command_get_projects_user(db: SessionDB, user_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None) -> List[Project]:
+	projects, _ = command_get_page_projects_user(
+		db = db,
+		user_id = user_id,
+		search = search,
+		page = page,
+		pageSize = pageSize,
+		cursor = cursor
+	)
+
+	return projects
 
 @validate_call
-def command_get_projects_user(user_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault) -> List[Project]:
-	db = next(get_db())
+def command_get_projects_user_validators(db: SessionDB, user_id: int, search: Dict[str, str] = {}) -> Tuple[Optional[datetime.datetime], int]:
+	"""
+		Último 'updated' y total de los proyectos del usuario, para el ETag
+		del listado.
+	"""
+	updated, total = db.execute(
+		select(func.max(Project.updated), func.count())
+		.filter_by(user_id = user_id, **search)
+	).one()
+
+	return updated, total
 
+@validate_call
+def command_get_total_project_user(db: SessionDB, user_id: int, search: Dict = {}) -> int:
 	if "priority" in search and search["priority"] not in CHOICES:
 		raise ValueError(InvalidPriority.get(choices = CHOICES), 400)
 
-	start = calculate_start_pagination(page = page, pageSize = pageSize)
-
-	filter_search = search
+	filter_search = search.copy()
 	
 	filter_search.update({
 		"user_id": user_id
 	})
 
-	projects = db.query(Project).filter_by(
+	total = db.query(Project).filter_by(
 		**filter_search
-	).offset(start).limit(pageSize)
+	).count()
 
-	return projects.all()
+	return total
 
 @validate_call
-def command_get_total_project_user(user_id: int, search: Dict = {}) -> int:
-	db = next(get_db())
-
+def command_get_page_projects_user(db: SessionDB, user_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None, total: Optional[int] = None) -> Tuple[List[Project], int | None]:
 	if "priority" in search and search["priority"] not in CHOICES:
 		raise ValueError(InvalidPriority.get(choices = CHOICES), 400)
 
-	filter_search = search
-	
+	filter_search = search.copy()
+
 	filter_search.update({
 		"user_id": user_id
 	})
 
-	total = db.query(Project).filter_by(
-		**filter_search
-	).count()
+	sql = (
+		select(Project)
+		.filter_by(**filter_search)
+		.order_by(Project.id)
+	)
 
-	return total
+	if cursor is not None:
+		return paginate_keyset(db = db, sql = sql, key = Project.id, cursor = cursor, pageSize = pageSize), None
+
+	return paginate(db = db, sql = sql, page = page, pageSize = pageSize, total = total)
+
+
+def tickets_per_day(db: SessionDB, project_id: int, since: datetime.datetime) -> Dict[str, Dict[str, int]]:
+	"""
+		Tickets creados y cerrados por día desde 'since', en una consulta.
+		Cerrado es el tipo 'cerrado' y su día el de la última actualización,
+		porque no se guarda la fecha del cierre.
+	"""
+	created_day = func.date(Ticket.created)
+	closed_day = func.date(Ticket.updated)
+
+	created = (
+		select(literal("created").label("serie"), created_day.label("day"), func.count().label("total"))
+		.where(Ticket.project_id == project_id, Ticket.created >= since)
+		.group_by(created_day)
+	)
+	closed = (
+		select(literal("closed").label("serie"), closed_day.label("day"), func.count().label("total"))
+		.where(Ticket.project_id == project_id, Ticket.type == ChoicesType.cerrado, Ticket.updated >= since)
+		.group_by(closed_day)
+	)
+
+	series = {"created": {}, "closed": {}}
+
+	for row in db.execute(union_all(created, closed)):
+		# SQLite devuelve el día como texto y PostgreSQL como 'date'
+		series[row.serie][str(row.day)] = row.total
+
+	return series
+
+
+@validate_call
+def command_get_project_stats(db: SessionDB, project_id: int, days: int = StatsDaysDefault) -> Dict[str, Any]:
+	"""
+		Tickets del proyecto por 'state', 'type' y 'priority' (de los
+		contadores, ver 'counters') y creados/cerrados por día en los
+		últimos 'days' días, incluido hoy, con 0 en los días sin tickets.
+	"""
+	if db.get(Project, project_id) is None:
+		raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
+
+	counts = counters.project_counts(db, project_id = project_id)
+
+	stats = {
+		"project_id": project_id,
+		"total": counts[(project_id, counters.CounterTotal, "")],
+		"days": days,
+	}
+
+	for field, choices in counters.CountedFields.items():
+		stats[field] = {choice.name: counts[(project_id, field, choice.name)] for choice in choices}
+
+	# 'func.now()' de la base de datos, en UTC
+	today = datetime.datetime.utcnow().date()
+	dates = [(today - datetime.timedelta(days = offset)).isoformat() for offset in range(days - 1, -1, -1)]
+	series = tickets_per_day(db, project_id = project_id, since = datetime.datetime.fromisoformat(dates[0]))
+
+	for serie, per_day in series.items():
+		stats[f"{serie}_per_day"] = [{"day": day, "total": per_day.get(day, 0)} for day in dates]
+
+	return stats
@@ -1,7 +1,8 @@
 from typing import List
-from pydantic import validate_call
 from pydantic import ConfigDict
 
+from apps.utils.validation.validation import validate_call
+
 
 class InvalidPriority:
 	@classmethod
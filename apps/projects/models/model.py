@@ -5,6 +5,7 @@ from datetime import datetime
 from sqlalchemy import Enum
 from sqlalchemy  import String
 from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy  import ForeignKey
 from sqlalchemy.orm  import Mapped 
 from sqlalchemy.orm  import relationship
@@ -21,6 +22,10 @@ class ChoicesPrority(enum.Enum):
 
 class Project(Model):
 	__tablename__ = "project"
+	__table_args__ = (
+		Index("ix_project_user_id", "user_id", "id"),
+		Index("ix_project_user_priority", "user_id", "priority", "id"),
+	)
 	
 	id: Mapped[int] = mapped_column(primary_key = True, index = True, nullable=False, unique=True)
 	title: Mapped[str] = mapped_column(String(30), nullable=False)
@@ -4,17 +4,28 @@ from typing_extensions import Annotated
 from fastapi import status
 from fastapi import Depends
 from fastapi import Request
+from fastapi import Response
 from fastapi import APIRouter
 from fastapi import Query
 
 from fastapi.responses import JSONResponse
 
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps import run_command
+from apps import get_async_db
 from apps.projects.schemas import schemas
 from apps.projects.commands import commands
 from apps.users.commands import commands as c_users
 
 from apps.utils.pagination import pagination as pg
-from apps.utils.token.token import validate_authorization
+from apps.utils.conditional.conditional import make_etag
+from apps.utils.conditional.conditional import row_values
+from apps.utils.conditional.conditional import conditional_response
+from apps.utils.responses.responses import ModelResponse
+from apps.utils.token.token import Principal
+from apps.utils.token.token import get_principal
 
 router  = APIRouter(prefix = '/project')
 
@@ -30,9 +41,9 @@ STATUS_CODE_ERRORS = {
  	status_code = status.HTTP_201_CREATED,
  	response_model = schemas.ProjectResponse,
  )
-def create_project(project: schemas.ProjectRequest, token: str = Depends(validate_authorization)) -> schemas.ProjectResponse:
+async def create_project(project: schemas.ProjectRequest, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ProjectResponse:
 	try:
-		project = commands.command_create_project(project = project)
+		project = await run_command(db, commands.command_create_project, project = project)
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -49,9 +60,9 @@ def create_project(project: schemas.ProjectRequest, token: str = Depends(validat
  	status_code = status.HTTP_200_OK,
  	response_model = schemas.ProjectFullResponse,
  )
-def get_project(id: int, token: str = Depends(validate_authorization)) -> schemas.ProjectFullResponse:
+async def get_project(request: Request, response: Response, id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ProjectFullResponse:
 	try:
-		project = commands.command_get_project(project_id = id)
+		project = await run_command(db, commands.command_get_project, project_id = id)
 	except ValueError as e:
 		message, status_code = e.args
 
@@ -60,17 +71,46 @@ def get_project(id: int, token: str = Depends(validate_authorization)) -> schema
 			status_code = STATUS_CODE_ERRORS[status_code]
 		)
 
+	etag = make_etag(row_values(project), row_values(project.user, exclude = ("password",)))
+
+	if (cached := conditional_response(request, response, etag = etag, last_modified = project.updated)) is not None:
+		return cached
+
 	return project
 
 
+@router.get(
+	"/{id}/stats",
+	status_code = status.HTTP_200_OK,
+	response_model = schemas.ProjectStats,
+)
+async def get_project_stats(request: Request, response: Response, id: int, days: Annotated[int, Query(ge = 1, le = commands.StatsDaysMax)] = commands.StatsDaysDefault, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ProjectStats:
+	try:
+		stats = await run_command(db, commands.command_get_project_stats, project_id = id, days = days)
+	except ValueError as e:
+		message, status_code = e.args
+
+		return JSONResponse(
+			content = {"message": message},
+			status_code = STATUS_CODE_ERRORS[status_code]
+		)
+
+	if (cached := conditional_response(request, response, etag = make_etag(stats))) is not None:
+		return cached
+
+	return stats
+
+
 @router.put(
 	"/{id}",
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.ProjectSimpleResponse
 )
-def update_project(id: int, project: schemas.ProjectUpdate, token: str = Depends(validate_authorization)) -> schemas.ProjectSimpleResponse:
+async def update_project(id: int, project: schemas.ProjectUpdate, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ProjectSimpleResponse:
 	try:
-		project = commands.command_update_project(
+		project = await run_command(
+			db,
+			commands.command_update_project,
 			project_id = id,
 			infoUpdate = project
 		)
@@ -89,9 +129,11 @@ def update_project(id: int, project: schemas.ProjectUpdate, token: str = Depends
 	"/{id}",
 	status_code = status.HTTP_204_NO_CONTENT,
 )
-def delete_project(id: int, token: str = Depends(validate_authorization)) -> JSONResponse:
+async def delete_project(id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> JSONResponse:
 	try:
-		commands.command_delete_project(
+		await run_command(
+			db,
+			commands.command_delete_project,
 			project_id = id,
 		)
 	except ValueError as e:
@@ -108,23 +150,36 @@ def delete_project(id: int, token: str = Depends(validate_authorization)) -> JSO
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.ProjectsByUser
 )
-def get_project_by_user(request: Request, query: Annotated[schemas.ProjectsPagination, Query()], token: str = Depends(validate_authorization)) -> schemas.ProjectsByUser:
+async def get_project_by_user(request: Request, response: Response, query: Annotated[schemas.ProjectsPagination, Query()], principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ProjectsByUser:
 
 	try:		
-		user = c_users.command_get_user(
+		user = await run_command(
+			db,
+			c_users.command_get_user,
 			user_id = query.user_id
 		)
 
-		total = commands.command_get_total_project_user(
+		updated, total = await run_command(
+			db,
+			commands.command_get_projects_user_validators,
 			user_id = query.user_id,
 			search = query.model_dump(include = ["priority"], exclude_defaults = True)
 		)
 
-		projects = commands.command_get_projects_user(
+		etag = make_etag(row_values(user, exclude = ("password",)), updated, total, request.url.query)
+
+		if (cached := conditional_response(request, response, etag = etag, last_modified = updated)) is not None:
+			return cached
+
+		projects, total = await run_command(
+			db,
+			commands.command_get_page_projects_user,
 			page = query.page,
 			pageSize = query.pageSize,
+			cursor = query.cursor,
 			user_id = query.user_id,
-			search = query.model_dump(include = ["priority"], exclude_defaults = True)
+			search = query.model_dump(include = ["priority"], exclude_defaults = True),
+			total = total
 		)
 
 	except ValueError as e:
@@ -144,14 +199,16 @@ def get_project_by_user(request: Request, query: Annotated[schemas.ProjectsPagin
 		pageSize = query.pageSize,
 		params = {
 			"user_id": query.user_id
-		}
+		},
+		cursor = query.cursor
 	)
 
-	response = {
+	content = {
 		"pagination": {
 			"previous": pagination.get('previous'),
 			"current": query.page,
 			"next": pagination.get('next'),
+			"cursor": pagination.get('cursor'),
 		},
 		"response": {
 			"user": user,
@@ -162,4 +219,4 @@ def get_project_by_user(request: Request, query: Annotated[schemas.ProjectsPagin
 		}
 	}
 
-	return response
+	return ModelResponse(schemas.ProjectsByUser, content, headers = response.headers)
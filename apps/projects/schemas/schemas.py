@@ -1,6 +1,8 @@
+from typing import Dict
 from typing import List
 from typing import Optional
 
+from datetime import date
 from datetime import datetime
 from typing_extensions import Annotated
 
@@ -103,7 +105,7 @@ class ProjectSimpleResponse(ProjectBase):
 
 
 class ListProjects(BaseModel):
-	total: int
+	total: Optional[int]
 	projects: Optional[List[ProjectSimpleResponse]]
 
 
@@ -119,4 +121,20 @@ class ProjectsByUser(BaseModel):
 
 class ProjectsPagination(pg.ListPagination):
 	user_id: int
-	priority: Optional[ChoiceProrityField] = None
\ No newline at end of file
+	priority: Optional[ChoiceProrityField] = None
+
+
+class DayTotal(BaseModel):
+	day: date
+	total: int
+
+
+class ProjectStats(BaseModel):
+	project_id: int
+	total: int
+	state: Dict[str, int]
+	type: Dict[str, int]
+	priority: Dict[str, int]
+	days: int
+	created_per_day: List[DayTotal]
+	closed_per_day: List[DayTotal]
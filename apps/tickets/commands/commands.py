@@ -1,16 +1,26 @@
+from enum import Enum
+from datetime import datetime
 from typing import List
 from typing import Dict
+from typing import Tuple
 from typing import Optional
+from typing import Iterator
 
 from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy import update
+from sqlalchemy import insert
 from sqlalchemy.orm import joinedload
 
-from pydantic import validate_call
+from apps.utils.validation.validation import validate_call
+from apps.utils.cache.cache import cache_key
+from apps.utils.cache.cache import detail_cache
+from apps.utils.database.database import expunge
 
-from apps import get_db
+from apps import SessionDB
 from .utils import utils
+from .utils import search as ticket_search
+from .utils import counters
 from .utils.error_messages import (
 	InvalidPriority,
 	InvalidState,
@@ -19,6 +29,7 @@ from .utils.error_messages import (
 	PaginationError,
 	DoesNotExistsTicketHistory,
 	EmptyValues,
+	SearchCursorError,
 )
 from apps.tickets.models import Ticket
 from apps.tickets.models import TicketHistory
@@ -31,14 +42,16 @@ from apps.tickets.schemas import schemas
 from apps.projects.models.model import Project
 from apps.projects.commands.utils.error_messages import DoesNotExistsProject
 
-from apps.utils.pagination.pagination import calculate_start_pagination
+from apps.utils.pagination.pagination import paginate
+from apps.utils.pagination.pagination import paginate_keyset
 from apps.utils.pagination.pagination import PageDefault
 from apps.utils.pagination.pagination import PageSizeDefault
 
-@validate_call
-def command_add_ticket_history(ticket_id: int, state: str = StateTicketHistory.crear.name, infoTicket: Dict[str, str | int ] = None) -> TicketHistory:
-	db = next(get_db())
+# Ids por cada UPDATE de 'command_update_tickets'
+BulkUpdateChunkSize = 10000
 
+@validate_call
+def command_add_ticket_history(db: SessionDB, ticket_id: int, state: str = StateTicketHistory.crear.name, infoTicket: Dict[str, str | int ] = None) -> TicketHistory:
 	if db.query(Ticket).filter(Ticket.id == ticket_id).one_or_none() is None:
 		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
 
@@ -63,9 +76,7 @@ def command_add_ticket_history(ticket_id: int, state: str = StateTicketHistory.c
 
 
 @validate_call
-def command_create_ticket(ticket: schemas.TicketRequest) -> Ticket:
-	db = next(get_db())
-
+def command_create_ticket(db: SessionDB, ticket: schemas.TicketRequest) -> Ticket:
 	project = db.get(Project, ticket.project_id)
 
 	if project is None:
@@ -83,6 +94,8 @@ def command_create_ticket(ticket: schemas.TicketRequest) -> Ticket:
 	)
 
 	db.add(new_ticket)
+	db.flush()
+	counters.apply_deltas(db, counters.ticket_deltas([new_ticket]))
 	db.commit()
 	db.refresh(new_ticket)
 
@@ -90,27 +103,125 @@ def command_create_ticket(ticket: schemas.TicketRequest) -> Ticket:
 
 
 @validate_call
-def command_get_ticket(ticket_id: int) -> Ticket:
-	db = next(get_db())
+def command_create_ticket_with_history(db: SessionDB, ticket: schemas.TicketRequest) -> Ticket:
+	"""
+		Crea el ticket y su historial 'crear' con un solo commit. El
+		id para el mensaje del historial sale del RETURNING del INSERT.
+	"""
+	if db.get(Project, ticket.project_id) is None:
+		raise ValueError(DoesNotExistsProject.get(id = ticket.project_id), 404)
 
-	if db.query(Ticket).filter(Ticket.id == ticket_id).one_or_none() is None:
-		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
+	if not utils.validate_choice(choice = ticket.priority, options = ChoicesPrority):
+		raise ValueError(InvalidPriority.get(), 400)
+
+	new_ticket = db.scalar(
+		insert(Ticket)
+		.values(
+			title = ticket.title,
+			description = ticket.description,
+			priority = ticket.priority,
+			project_id = ticket.project_id,
+		)
+		.returning(Ticket)
+	)
+
+	db.add(TicketHistory(
+		ticket_id = new_ticket.id,
+		state = StateTicketHistory.crear,
+		message = utils.message_create(ticket_id = new_ticket.id)
+	))
+	db.flush()
+	counters.apply_deltas(db, counters.ticket_deltas([new_ticket]))
+
+	# Ya tiene los valores del RETURNING, el commit no debe expirarlo
+	db.expunge(new_ticket)
+	db.commit()
+
+	return new_ticket
+
+
+@validate_call
+def command_create_tickets(db: SessionDB, tickets: List[schemas.TicketRequest]) -> List[Ticket]:
+	"""
+		Crea todos los tickets y su historial 'crear' en una sola
+		transacción: una consulta para los proyectos y un INSERT
+		por lotes (RETURNING) para los tickets y otro para el historial.
+	"""
+	for ticket in tickets:
+		if not utils.validate_choice(choice = ticket.priority, options = ChoicesPrority):
+			raise ValueError(InvalidPriority.get(), 400)
+
+	project_ids = {ticket.project_id for ticket in tickets}
+	projects = set(db.scalars(select(Project.id).where(Project.id.in_(project_ids))))
+
+	if missing := project_ids - projects:
+		raise ValueError(DoesNotExistsProject.get(id = min(missing)), 404)
+
+	new_tickets = db.scalars(
+		insert(Ticket).returning(Ticket, sort_by_parameter_order = True),
+		[
+			{
+				"title": ticket.title,
+				"description": ticket.description,
+				"priority": ticket.priority,
+				"project_id": ticket.project_id,
+			}
+			for ticket in tickets
+		]
+	).all()
+
+	db.execute(
+		insert(TicketHistory),
+		[
+			{
+				"ticket_id": ticket.id,
+				"state": StateTicketHistory.crear,
+				"message": utils.message_create(ticket_id = ticket.id),
+			}
+			for ticket in new_tickets
+		]
+	)
+
+	counters.apply_deltas(db, counters.ticket_deltas(new_tickets))
 
+	# Fuera de la sesión el commit no los expira: no se vuelven a leer uno por uno
+	expunge(db, new_tickets)
+	db.commit()
+
+	return new_tickets
+
+
+def load_ticket(db: SessionDB, ticket_id: int) -> Ticket:
 	sql = (
 		select(Ticket)
 		.options(joinedload(Ticket.project))
 		.where(Ticket.id == ticket_id)
 	)
 
-
 	ticket = db.scalar(sql)
 
+	if ticket is None:
+		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
+
 	return ticket
 
+
+def ticket_tags(ticket: Ticket) -> List[str]:
+	# Cambiar o borrar el proyecto invalida los tickets que lo muestran
+	return [cache_key("project", ticket.project_id)]
+
+
 @validate_call
-def command_get_total_tickets_filter(project_id: int, search: Dict[str, str] = {}) -> int:
-	db = next(get_db())
+def command_get_ticket(db: SessionDB, ticket_id: int) -> Ticket:
+	return detail_cache.load(
+		db,
+		key = cache_key("ticket", ticket_id),
+		loader = lambda: load_ticket(db, ticket_id = ticket_id),
+		tags = ticket_tags
+	)
 
+@validate_call
+def command_get_total_tickets_filter(db: SessionDB, project_id: int, search: Dict[str, str] = {}) -> int:
 	if "type" in search and not utils.validate_choice(choice = search["type"], options = ChoicesType):
 		raise ValueError(InvalidType.get(), 400)
 	if "state" in search and not utils.validate_choice(choice = search["state"], options = ChoicesState):
@@ -118,6 +229,11 @@ def command_get_total_tickets_filter(project_id: int, search: Dict[str, str] = {
 	if "priority" in search and not utils.validate_choice(choice = search["priority"], options = ChoicesPrority):
 		raise ValueError(InvalidPriority.get(), 400)
 
+	total = counters.count_tickets(db, project_id = project_id, search = search)
+
+	if total is not None:
+		return total
+
 	data_search = search.copy()
 
 	data_search.update({
@@ -131,9 +247,20 @@ def command_get_total_tickets_filter(project_id: int, search: Dict[str, str] = {
 	return total
 
 @validate_call
-def command_get_ticket_by_filter(project_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault) -> Optional[List[Ticket]]:
-	db = next(get_db())
+def command_get_ticket_by_filter(db: SessionDB, project_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None) -> Optional[List[Ticket]]:
+	tickets, _ = command_get_page_tickets_filter(
+		db = db,
+		project_id = project_id,
+		search = search,
+		page = page,
+		pageSize = pageSize,
+		cursor = cursor
+	)
 
+	return tickets
+
+@validate_call
+def command_get_page_tickets_filter(db: SessionDB, project_id: int, search: Dict[str, str] = {}, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None, total: Optional[int] = None) -> Tuple[List[Ticket], int | None]:
 	if "type" in search and not utils.validate_choice(choice = search["type"], options = ChoicesType):
 		raise ValueError(InvalidType.get(), 400)
 	if "state" in search and not utils.validate_choice(choice = search["state"], options = ChoicesState):
@@ -146,41 +273,68 @@ def command_get_ticket_by_filter(project_id: int, search: Dict[str, str] = {}, p
 
 	data_search = search.copy()
 
-	start = calculate_start_pagination(page = page, pageSize = pageSize)
-
 	data_search.update({
 		"project_id": project_id
 	})
 
-	tickets = db.query(Ticket).filter_by(
-		**data_search
-	).offset(start).limit(pageSize)
-
-	return tickets.all()
-
-@validate_call
-def command_get_ticket_by_title(project_id: int, ticket: schemas.TicketByTitle) -> Optional[List[Ticket]]:
-	db = next(get_db())
-
 	sql = (
 		select(Ticket)
-		.where(Ticket.project_id == project_id)
-		.where(
-			Ticket.title.ilike(f"%{ticket.title}%")
-		)
+		.filter_by(**data_search)
+		.order_by(Ticket.id)
 	)
 
-	tickets = db.scalars(sql).all()
+	if cursor is not None:
+		return paginate_keyset(db = db, sql = sql, key = Ticket.id, cursor = cursor, pageSize = pageSize), None
+
+	# Con el 'total' ya calculado (ej: para el ETag) no se vuelve a contar
+	if total is None:
+		total = counters.count_tickets(db, project_id = project_id, search = search)
+
+	return paginate(db = db, sql = sql, page = page, pageSize = pageSize, total = total)
+
+@validate_call
+def command_get_ticket_by_title(db: SessionDB, project_id: int, ticket: schemas.TicketByTitle, page: int = PageDefault, pageSize: int = PageSizeDefault) -> Optional[List[Ticket]]:
+	tickets, _ = command_get_page_tickets_by_title(
+		db = db,
+		project_id = project_id,
+		ticket = ticket,
+		page = page,
+		pageSize = pageSize
+	)
 
 	return tickets
 
 @validate_call
-def command_update_ticket(ticket_id: int, infoUpdate: schemas.TicketUpdate) -> Ticket:
-	db = next(get_db())
+def command_get_page_tickets_by_title(db: SessionDB, project_id: int, ticket: schemas.TicketByTitle, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None) -> Tuple[List[Ticket], int]:
+	if page < 0 or pageSize < 0:
+		raise ValueError(PaginationError.get(), 400)
+
+	# Los resultados van ordenados por relevancia, no por ID
+	if cursor is not None:
+		raise ValueError(SearchCursorError.get(), 400)
+
+	return ticket_search.search_tickets(
+		db = db,
+		project_id = project_id,
+		value = ticket.title,
+		page = page,
+		pageSize = pageSize
+	)
+
+@validate_call
+def command_stream_tickets_by_title(db: SessionDB, project_id: int, ticket: schemas.TicketByTitle, chunk_size: int = ticket_search.StreamChunkSize) -> Iterator[Ticket]:
+	if chunk_size < 1:
+		raise ValueError(PaginationError.get(), 400)
 
-	if db.query(Ticket).filter(Ticket.id == ticket_id).one_or_none() is None:
-		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
+	return ticket_search.stream_tickets(
+		db = db,
+		project_id = project_id,
+		value = ticket.title,
+		chunk_size = chunk_size
+	)
 
+@validate_call
+def command_update_ticket(db: SessionDB, ticket_id: int, infoUpdate: schemas.TicketUpdate) -> Ticket:
 	if infoUpdate.type is not None and not utils.validate_choice(choice = infoUpdate.type, options = ChoicesType):
 		raise ValueError(InvalidType.get(), 400)
 	if infoUpdate.state is not None and not utils.validate_choice(choice = infoUpdate.state, options = ChoicesState):
@@ -193,53 +347,200 @@ def command_update_ticket(ticket_id: int, infoUpdate: schemas.TicketUpdate) -> T
 	if not update_values:
 		raise ValueError(EmptyValues.get(), 400)
 
+	old_values = counters.counted_values(db, Ticket.id == ticket_id) if counters.changes_counters(update_values) else []
+
 	sql = (
 		update(Ticket)
 		.where(Ticket.id == ticket_id)
 		.values(**update_values)
 		.returning(Ticket)
+		.execution_options(populate_existing = True)
 	)
 
 	ticket = db.scalar(sql)
+
+	if ticket is None:
+		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
+
+	if old_values:
+		deltas = counters.ticket_deltas(old_values, sign = -1)
+		deltas.update(counters.ticket_deltas([ticket]))
+		counters.apply_deltas(db, deltas)
 	
-	db.close()
+	db.commit()
+	detail_cache.invalidate(cache_key("ticket", ticket_id))
+
 	return ticket
 
 @validate_call
-def command_delete_ticket(ticket_id: int) -> None:
-	db = next(get_db())
+def command_update_ticket_with_history(db: SessionDB, ticket_id: int, infoUpdate: schemas.TicketUpdate) -> Ticket:
+	"""
+		Actualiza el ticket y agrega su historial 'actualizar' con un solo
+		commit. El mensaje del historial usa los valores del RETURNING.
+	"""
+	if infoUpdate.type is not None and not utils.validate_choice(choice = infoUpdate.type, options = ChoicesType):
+		raise ValueError(InvalidType.get(), 400)
+	if infoUpdate.state is not None and not utils.validate_choice(choice = infoUpdate.state, options = ChoicesState):
+		raise ValueError(InvalidState.get(), 400)
+	if infoUpdate.priority is not None and not utils.validate_choice(choice = infoUpdate.priority, options = ChoicesPrority):
+		raise ValueError(InvalidPriority.get(), 400)
 
-	ticket = db.get(Ticket, ticket_id)
+	update_values = infoUpdate.model_dump(exclude_defaults = True)
+
+	if not update_values:
+		raise ValueError(EmptyValues.get(), 400)
+
+	old_values = counters.counted_values(db, Ticket.id == ticket_id) if counters.changes_counters(update_values) else []
+
+	ticket = db.scalar(
+		update(Ticket)
+		.where(Ticket.id == ticket_id)
+		.values(**update_values)
+		.returning(Ticket)
+		# Si ya estaba en la sesión, toma los valores del RETURNING (Enums, 'updated')
+		.execution_options(populate_existing = True)
+	)
 
 	if ticket is None:
 		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
 
-	db.delete(ticket)
+	if old_values:
+		deltas = counters.ticket_deltas(old_values, sign = -1)
+		deltas.update(counters.ticket_deltas([ticket]))
+		counters.apply_deltas(db, deltas)
+
+	saved_values = {}
+
+	for field in update_values:
+		value = getattr(ticket, field)
+		saved_values[field] = value.name if isinstance(value, Enum) else value
+
+	db.add(TicketHistory(
+		ticket_id = ticket.id,
+		state = StateTicketHistory.actualizar,
+		message = utils.message_update(ticket_id = ticket.id, data = saved_values)
+	))
+	db.flush()
+
+	db.expunge(ticket)
 	db.commit()
+	detail_cache.invalidate(cache_key("ticket", ticket_id))
+
+	return ticket
+
 
 @validate_call
-def command_get_tickets_by_project(project_id: int, page: int = PageDefault, pageSize: int = PageSizeDefault) -> Optional[List[Ticket]]:
-	db = next(get_db())
+def command_update_tickets(db: SessionDB, infoUpdate: schemas.TicketUpdate, ticket_ids: Optional[List[int]] = None, project_id: Optional[int] = None, search: Dict[str, str] = {}) -> List[Ticket]:
+	"""
+		Aplica 'infoUpdate' a los tickets de 'ticket_ids' o a los del proyecto
+		que cumplan 'search', y agrega su historial 'actualizar', todo en una
+		transacción: UPDATE ... WHERE ... RETURNING y un INSERT por lotes.
+	"""
+	if infoUpdate.type is not None and not utils.validate_choice(choice = infoUpdate.type, options = ChoicesType):
+		raise ValueError(InvalidType.get(), 400)
+	if infoUpdate.state is not None and not utils.validate_choice(choice = infoUpdate.state, options = ChoicesState):
+		raise ValueError(InvalidState.get(), 400)
+	if infoUpdate.priority is not None and not utils.validate_choice(choice = infoUpdate.priority, options = ChoicesPrority):
+		raise ValueError(InvalidPriority.get(), 400)
 
-	if page < 0 or pageSize < 0:
-		raise ValueError(PaginationError.get(), 400)
+	update_values = infoUpdate.model_dump(exclude_defaults = True)
 
-	start = calculate_start_pagination(page = page, pageSize = pageSize)
+	if not update_values:
+		raise ValueError(EmptyValues.get(), 400)
 
 	sql = (
-		select(Ticket)
-		.where(Ticket.project_id == project_id)
-		.offset(start)
-		.limit(pageSize)
+		update(Ticket)
+		.values(**update_values)
+		.returning(Ticket)
+		.execution_options(populate_existing = True)
 	)
 
-	tickets = db.scalars(sql).all()
+	count = counters.changes_counters(update_values)
+	old_values = []
+
+	if ticket_ids is not None:
+		ids = list(dict.fromkeys(ticket_ids))
+		tickets = []
+
+		# Por partes para no pasar el límite de parámetros de la DB (SQLite: 32766)
+		for start in range(0, len(ids), BulkUpdateChunkSize):
+			criteria = Ticket.id.in_(ids[start:start + BulkUpdateChunkSize])
+
+			if count:
+				old_values.extend(counters.counted_values(db, criteria))
+
+			tickets.extend(db.scalars(sql.where(criteria)))
+
+		if missing := set(ids) - {ticket.id for ticket in tickets}:
+			db.rollback()
+			raise ValueError(DoesNotExistsTicket.get(id = min(missing)), 404)
+	else:
+		if db.get(Project, project_id) is None:
+			raise ValueError(DoesNotExistsProject.get(id = project_id), 404)
+
+		criteria = [Ticket.project_id == project_id, *(getattr(Ticket, field) == value for field, value in search.items())]
+
+		if count:
+			old_values = counters.counted_values(db, *criteria)
+
+		tickets = db.scalars(sql.where(*criteria)).all()
+
+	if old_values:
+		deltas = counters.ticket_deltas(old_values, sign = -1)
+		deltas.update(counters.ticket_deltas(tickets))
+		counters.apply_deltas(db, deltas)
+
+	if tickets:
+		db.execute(
+			insert(TicketHistory),
+			[
+				{
+					"ticket_id": ticket.id,
+					"state": StateTicketHistory.actualizar,
+					"message": utils.message_update(ticket_id = ticket.id, data = update_values),
+				}
+				for ticket in tickets
+			]
+		)
+
+	expunge(db, tickets)
+
+	db.commit()
+	detail_cache.invalidate(*(cache_key("ticket", ticket.id) for ticket in tickets))
+
+	return tickets
+
+
+@validate_call
+def command_delete_ticket(db: SessionDB, ticket_id: int) -> None:
+	ticket = db.get(Ticket, ticket_id)
+
+	if ticket is None:
+		raise ValueError(DoesNotExistsTicket.get(id = ticket_id), 404)
+
+	counters.apply_deltas(db, counters.ticket_deltas([ticket], sign = -1))
+	db.delete(ticket)
+	db.commit()
+	detail_cache.invalidate(cache_key("ticket", ticket_id))
+
+@validate_call
+def command_get_tickets_by_project(db: SessionDB, project_id: int, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None) -> Optional[List[Ticket]]:
+	tickets, _ = command_get_page_tickets_filter(
+		db = db,
+		project_id = project_id,
+		page = page,
+		pageSize = pageSize,
+		cursor = cursor
+	)
 
 	return tickets
 
 @validate_call
-def command_get_total_tickets_project(project_id: int) -> int:
-	db = next(get_db())
+def command_get_total_tickets_project(db: SessionDB, project_id: int) -> int:
+	total = counters.count_tickets(db, project_id = project_id)
+
+	if total is not None:
+		return total
 	
 	sql = (
 		select(func.count())
@@ -252,9 +553,34 @@ def command_get_total_tickets_project(project_id: int) -> int:
 	return total
 
 @validate_call
-def command_get_total_ticket_histories(ticket_id: int) -> int:
-	db = next(get_db())
+def command_get_tickets_validators(db: SessionDB, project_id: int, search: Dict[str, str] = {}) -> Tuple[Optional[datetime], int]:
+	"""
+		Último 'updated' y total de los tickets del proyecto que cumplen
+		'search', para el ETag de un listado. Con el total de los contadores
+		solo queda max(updated), por el índice (project_id, updated).
+	"""
+	criteria = [Ticket.project_id == project_id, *(getattr(Ticket, field) == value for field, value in search.items())]
+	total = counters.count_tickets(db, project_id = project_id, search = search)
+
+	if total is not None:
+		return db.scalar(select(func.max(Ticket.updated)).where(*criteria)), total
+
+	updated, total = db.execute(select(func.max(Ticket.updated), func.count()).where(*criteria)).one()
+
+	return updated, total
+
+@validate_call
+def command_get_ticket_histories_validators(db: SessionDB, ticket_id: int) -> Tuple[Optional[datetime], int]:
+	# El historial no se modifica: alcanza con el último creado y el total
+	created, total = db.execute(
+		select(func.max(TicketHistory.created), func.count())
+		.where(TicketHistory.ticket_id == ticket_id)
+	).one()
+
+	return created, total
 
+@validate_call
+def command_get_total_ticket_histories(db: SessionDB, ticket_id: int) -> int:
 	sql = (
 		select(func.count())
 		.select_from(TicketHistory)
@@ -266,39 +592,45 @@ def command_get_total_ticket_histories(ticket_id: int) -> int:
 	return total
 
 @validate_call
-def command_get_ticket_histories(ticket_id: int, page: int = PageDefault, pageSize: int = PageSizeDefault) -> Optional[TicketHistory]:
-	db = next(get_db())
+def command_get_ticket_histories(db: SessionDB, ticket_id: int, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None) -> Optional[TicketHistory]:
+	histories, _ = command_get_page_ticket_histories(
+		db = db,
+		ticket_id = ticket_id,
+		page = page,
+		pageSize = pageSize,
+		cursor = cursor
+	)
 
-	if page < 0 or pageSize < 0:
-		raise ValueError(PaginationError.get(), 400)
+	return histories
 
-	start = calculate_start_pagination(page = page, pageSize = pageSize)
 
+@validate_call
+def command_get_detail_ticket_history(db: SessionDB, history_id: int) -> TicketHistory:
 	sql = (
 		select(TicketHistory)
-		.where(TicketHistory.ticket_id == ticket_id)
-		.offset(start)
-		.limit(pageSize)
+		.options(joinedload(TicketHistory.ticket))
+		.where(TicketHistory.id == history_id)
 	)
 
-	histories = db.scalars(sql).all()
+	history = db.scalar(sql)
 
-	return histories
+	if history is None:
+		raise ValueError(DoesNotExistsTicketHistory.get(id = history_id), 404)
 
+	return history
 
 @validate_call
-def command_get_detail_ticket_history(history_id: int) -> TicketHistory:
-	db = next(get_db())
-
-	if db.query(TicketHistory).filter(TicketHistory.id == history_id).one_or_none() is None:
-		raise ValueError(DoesNotExistsTicketHistory.get(id = history_id), 404)
+def command_get_page_ticket_histories(db: SessionDB, ticket_id: int, page: int = PageDefault, pageSize: int = PageSizeDefault, cursor: Optional[str] = None, total: Optional[int] = None) -> Tuple[List[TicketHistory], int | None]:
+	if page < 0 or pageSize < 0:
+		raise ValueError(PaginationError.get(), 400)
 
 	sql = (
 		select(TicketHistory)
-		.options(joinedload(TicketHistory.ticket))
-		.where(TicketHistory.id == history_id)
+		.where(TicketHistory.ticket_id == ticket_id)
+		.order_by(TicketHistory.id)
 	)
 
-	history = db.scalar(sql)
+	if cursor is not None:
+		return paginate_keyset(db = db, sql = sql, key = TicketHistory.id, cursor = cursor, pageSize = pageSize), None
 
-	return history
\ No newline at end of file
+	return paginate(db = db, sql = sql, page = page, pageSize = pageSize, total = total)
@@ -0,0 +1,273 @@
+from enum import Enum
+from collections import Counter
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy import Engine
+from sqlalchemy import bindparam
+from sqlalchemy import or_
+from sqlalchemy import and_
+from sqlalchemy import cast
+from sqlalchemy import String
+from sqlalchemy import Insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from apps.tickets.models import Ticket
+from apps.tickets.models import TicketCounter
+from apps.tickets.models import ChoicesType
+from apps.tickets.models import ChoicesState
+from apps.tickets.models import ChoicesPrority
+
+
+CounterTotal = "total"
+
+CountedFields = {
+	"state": ChoicesState,
+	"type": ChoicesType,
+	"priority": ChoicesPrority,
+}
+
+
+def counter_keys() -> List[Tuple[str, str]]:
+	keys = [(CounterTotal, "")]
+
+	for field, choices in CountedFields.items():
+		keys.extend((field, choice.name) for choice in choices)
+
+	return keys
+
+
+def value_name(value: Any) -> str:
+	return value.name if isinstance(value, Enum) else value
+
+
+def ticket_deltas(tickets: Iterable[Any], sign: int = 1) -> Counter:
+	"""
+		Cambios en los contadores al agregar ('sign' 1) o quitar ('sign' -1)
+		los tickets. Sirve cualquier objeto con 'project_id', 'state',
+		'type' y 'priority': tickets del ORM o filas de una consulta.
+	"""
+	deltas = Counter()
+
+	for ticket in tickets:
+		if ticket.project_id is None:
+			continue
+
+		deltas[(ticket.project_id, CounterTotal, "")] += sign
+
+		for field in CountedFields:
+			deltas[(ticket.project_id, field, value_name(getattr(ticket, field)))] += sign
+
+	return deltas
+
+
+def changes_counters(values: Dict[str, Any]) -> bool:
+	return any(field in values for field in CountedFields)
+
+
+def counted_values(db: Session, *criteria: Any) -> List[Any]:
+	"""
+		Valores actuales de los tickets que se van a modificar, bloqueando
+		sus filas hasta el commit para que la resta sea la correcta.
+	"""
+	return db.execute(
+		select(Ticket.project_id, Ticket.state, Ticket.type, Ticket.priority)
+		.where(*criteria)
+		.with_for_update()
+	).all()
+
+
+def apply_deltas(db: Session, deltas: Counter) -> None:
+	"""
+		Suma los cambios en un UPDATE por lotes, sin commit. Los proyectos
+		sin contadores (anteriores a la tabla) no se tocan: sus totales se
+		siguen contando hasta que 'create_missing_counters' los crea.
+	"""
+	params = [
+		{"p_project_id": project_id, "p_dimension": dimension, "p_value": value, "p_delta": delta}
+		for (project_id, dimension, value), delta in deltas.items()
+		if delta
+	]
+
+	if not params:
+		return
+
+	table = TicketCounter.__table__
+
+	db.connection().execute(
+		update(table)
+		.where(
+			table.c.project_id == bindparam("p_project_id"),
+			table.c.dimension == bindparam("p_dimension"),
+			table.c.value == bindparam("p_value")
+		)
+		.values(total = table.c.total + bindparam("p_delta")),
+		params
+	)
+
+
+def insert_ignore(db: Session) -> Insert:
+	"""
+		INSERT que no falla si el contador ya existe: varios workers
+		pueden crear los mismos contadores al iniciar.
+	"""
+	dialect = db.get_bind().dialect.name
+
+	if dialect == "postgresql":
+		return postgresql.insert(TicketCounter).on_conflict_do_nothing()
+
+	if dialect == "sqlite":
+		return sqlite.insert(TicketCounter).on_conflict_do_nothing()
+
+	return insert(TicketCounter)
+
+
+def create_counters(db: Session, project_id: int) -> None:
+	# En 0: para un proyecto con tickets, 'rebuild_counters' los cuenta
+	db.execute(
+		insert_ignore(db),
+		[
+			{"project_id": project_id, "dimension": dimension, "value": value, "total": 0}
+			for dimension, value in counter_keys()
+		]
+	)
+
+
+def delete_counters(db: Session, project_id: int) -> None:
+	db.execute(delete(TicketCounter).where(TicketCounter.project_id == project_id))
+
+
+def rebuild_counters(db: Session, project_id: int) -> None:
+	"""
+		Vuelve a contar los tickets del proyecto, sin commit. Para un
+		proyecto anterior a la tabla o si se modificaron tickets sin
+		pasar por los 'commands'.
+
+		Primero bloquea los contadores: espera a las escrituras que ya
+		sumaron su cambio y las siguientes esperan al commit, así el
+		conteo no pisa ningún cambio. Después cuenta todo en un UPDATE.
+	"""
+	create_counters(db, project_id = project_id)
+
+	db.execute(
+		select(TicketCounter.dimension)
+		.where(TicketCounter.project_id == project_id)
+		.with_for_update()
+	).all()
+
+	table = TicketCounter.__table__
+
+	# Fila del contador contra cada ticket: el total o un valor de 'state', 'type' o 'priority'
+	matches = or_(
+		table.c.dimension == CounterTotal,
+		*(
+			and_(table.c.dimension == field, cast(getattr(Ticket, field), String) == table.c.value)
+			for field in CountedFields
+		)
+	)
+
+	total = (
+		select(func.count())
+		.select_from(Ticket)
+		.where(Ticket.project_id == table.c.project_id, matches)
+		.scalar_subquery()
+	)
+
+	db.execute(
+		update(table)
+		.where(table.c.project_id == project_id)
+		.values(total = total)
+	)
+
+
+def group_counts(db: Session, project_id: int) -> Counter:
+	"""
+		Los mismos totales que los contadores, con un solo GROUP BY por
+		(state, type, priority): como mucho 60 filas por proyecto.
+	"""
+	rows = db.execute(
+		select(Ticket.project_id, Ticket.state, Ticket.type, Ticket.priority, func.count().label("total"))
+		.where(Ticket.project_id == project_id)
+		.group_by(Ticket.project_id, Ticket.state, Ticket.type, Ticket.priority)
+	).all()
+
+	counts = Counter()
+
+	for row in rows:
+		for key, delta in ticket_deltas([row]).items():
+			counts[key] += delta * row.total
+
+	return counts
+
+
+def project_counts(db: Session, project_id: int) -> Counter:
+	"""
+		Todos los totales del proyecto, de los contadores si los tiene.
+		Las claves son (project_id, dimension, value) como en 'ticket_deltas'.
+	"""
+	rows = db.execute(
+		select(TicketCounter.dimension, TicketCounter.value, TicketCounter.total)
+		.where(TicketCounter.project_id == project_id)
+	).all()
+
+	if not rows:
+		return group_counts(db, project_id = project_id)
+
+	return Counter({(project_id, row.dimension, row.value): row.total for row in rows})
+
+
+def count_tickets(db: Session, project_id: int, search: Dict[str, str] = {}) -> Optional[int]:
+	"""
+		Total del proyecto sin filtros o con un solo filtro de 'state',
+		'type' o 'priority', leído de los contadores. None si hay más
+		filtros o el proyecto todavía no tiene contadores.
+	"""
+	if len(search) > 1 or not set(search) <= set(CountedFields):
+		return None
+
+	dimension, value = next(iter(search.items()), (CounterTotal, ""))
+
+	return db.scalar(
+		select(TicketCounter.total)
+		.where(
+			TicketCounter.project_id == project_id,
+			TicketCounter.dimension == dimension,
+			TicketCounter.value == value_name(value)
+		)
+	)
+
+
+def create_missing_counters(engine: Engine) -> List[int]:
+	"""
+		Crea los contadores de los proyectos que no los tienen (los
+		anteriores a la tabla) y devuelve sus ids.
+	"""
+	from apps.projects.models import Project
+
+	with Session(engine) as db:
+		project_ids = db.scalars(
+			select(Project.id)
+			.where(~select(TicketCounter.project_id).where(TicketCounter.project_id == Project.id).exists())
+		).all()
+
+		for project_id in project_ids:
+			try:
+				rebuild_counters(db, project_id = project_id)
+				db.commit()
+			except IntegrityError:
+				# Otro worker los creó primero (bases sin INSERT ... ON CONFLICT)
+				db.rollback()
+
+	return list(project_ids)
@@ -1,6 +1,7 @@
-from pydantic import validate_call
 from pydantic import ConfigDict
 
+from apps.utils.validation.validation import validate_call
+
 
 class InvalidPriority:
 	@classmethod
@@ -55,4 +56,11 @@ class EmptyValues:
 	@classmethod
 	@validate_call(config = ConfigDict(hide_input_in_errors = True))
 	def get(cls) -> str:
-		return "No puede enviar valores vacios para la actualización"
\ No newline at end of file
+		return "No puede enviar valores vacios para la actualización"
+
+
+class SearchCursorError:
+	@classmethod
+	@validate_call(config = ConfigDict(hide_input_in_errors = True))
+	def get(cls) -> str:
+		return "La búsqueda ordena por relevancia y no admite paginación por cursor"
\ No newline at end of file
@@ -0,0 +1,644 @@
+import threading
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterable
+from typing import Iterator
+from typing import AsyncIterator
+from itertools import count
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import or_
+from sqlalchemy import case
+from sqlalchemy import func
+from sqlalchemy import text
+from sqlalchemy import event
+from sqlalchemy import table
+from sqlalchemy import column
+from sqlalchemy import select
+from sqlalchemy import Select
+from sqlalchemy import Engine
+from sqlalchemy import literal_column
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.elements import BooleanClauseList
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import DBAPIError
+
+from apps import SEARCH_BACKEND
+from apps.tickets.models import Ticket
+
+from apps.utils.database.database import expunge
+from apps.utils.pagination.pagination import paginate
+from apps.utils.pagination.pagination import calculate_start_pagination
+from apps.utils.pagination.pagination import PageDefault
+from apps.utils.pagination.pagination import PageSizeDefault
+
+
+SearchAuto = "auto"
+SearchPostgres = "postgres"
+SearchFTS = "fts5"
+SearchMemory = "memory"
+SearchLike = "like"
+
+SearchBackends = (SearchAuto, SearchPostgres, SearchFTS, SearchMemory, SearchLike)
+
+FTSTable = "ticket_fts"
+# Los tokenizadores de trigramas no indexan búsquedas más cortas
+MinLengthTrigram = 3
+# Filas por bloque al transmitir resultados con 'yield_per'
+StreamChunkSize = 500
+
+
+def escape_like(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def condition_search(value: str) -> Any:
+	pattern = f"%{escape_like(value)}%"
+
+	return or_(
+		Ticket.title.ilike(pattern, escape = "\\"),
+		Ticket.description.ilike(pattern, escape = "\\"),
+	)
+
+
+def sql_like(project_id: int, value: str) -> Select:
+	"""
+		Búsqueda portable con LIKE: primero las coincidencias en el titulo
+		y entre ellas los titulos más cortos.
+	"""
+	pattern = f"%{escape_like(value)}%"
+
+	rank = case((Ticket.title.ilike(pattern, escape = "\\"), 0), else_ = 1)
+
+	return (
+		select(Ticket)
+		.where(Ticket.project_id == project_id)
+		.where(condition_search(value))
+		.order_by(rank, func.length(Ticket.title), Ticket.id)
+	)
+
+
+def sql_postgres(project_id: int, value: str) -> Select:
+	"""
+		ILIKE usa los índices GIN 'gin_trgm_ops' y 'similarity' (pg_trgm)
+		ordena por parecido, el titulo pesa el doble que la descripción.
+	"""
+	rank = func.greatest(
+		func.similarity(Ticket.title, value),
+		func.similarity(func.coalesce(Ticket.description, ""), value) * 0.5
+	)
+
+	return (
+		select(Ticket)
+		.where(Ticket.project_id == project_id)
+		.where(condition_search(value))
+		.order_by(rank.desc(), Ticket.id)
+	)
+
+
+def sql_fts(project_id: int, value: str) -> Select:
+	"""
+		FTS5 con el tokenizador 'trigram' mantiene la búsqueda por
+		subcadena; 'bm25' ordena con más peso en el titulo.
+	"""
+	if len(value) < MinLengthTrigram:
+		return sql_like(project_id = project_id, value = value)
+
+	fts = table(FTSTable, column("rowid"))
+	fts_match = literal_column(FTSTable).op("MATCH")
+	query = '"' + value.replace('"', '""') + '"'
+
+	# 'bm25' solo se puede usar en la consulta directa sobre la tabla FTS5
+	matches = (
+		select(
+			fts.c.rowid.label("id"),
+			func.bm25(literal_column(FTSTable), 10.0, 1.0).label("rank")
+		)
+		.where(fts_match(query))
+		.subquery()
+	)
+
+	return (
+		select(Ticket)
+		.join(matches, matches.c.id == Ticket.id)
+		.where(Ticket.project_id == project_id)
+		.order_by(matches.c.rank, Ticket.id)
+	)
+
+
+def trigrams(value: str) -> set:
+	return {value[i:i + MinLengthTrigram] for i in range(len(value) - MinLengthTrigram + 1)}
+
+
+class TrigramIndex:
+	"""
+		Índice invertido en memoria (trigrama -> IDs de tickets) por proyecto.
+		Se compara con la huella del proyecto (total, último ID y última
+		actualización): los tickets nuevos y los que cambiaron en este
+		proceso se vuelven a leer uno por uno sobre una copia del índice,
+		solo un cambio que no se puede ubicar reconstruye el proyecto.
+	"""
+
+	def __init__(self, max_projects: int = 128) -> None:
+		self.max_projects = max_projects
+		self.projects = OrderedDict()
+		self.lock = threading.Lock()
+		self.builds = 0
+		self.refreshes = 0
+		# Un número por engine: dos bases con la misma URL (ej: 'sqlite://') no comparten índice
+		self.engines = WeakKeyDictionary()
+		self.engine_ids = count()
+
+	def invalidate(self, project_id: int | None = None, ids: Iterable[int] | None = None) -> None:
+		"""
+			Marca los tickets 'ids' del proyecto para volver a leerlos. Sin
+			'ids' el proyecto (o todos, sin 'project_id') se reconstruye.
+		"""
+		ids = None if ids is None else set(ids)
+
+		with self.lock:
+			for key, cached in self.projects.items():
+				if project_id is not None and key[1] != project_id:
+					continue
+
+				if ids is None:
+					cached["rebuild"] = True
+				else:
+					cached["changed"] |= ids
+
+	def invalidate_tickets(self, ids: Iterable[int]) -> None:
+		""" Marca los tickets 'ids' en los proyectos que los tienen """
+		ids = set(ids)
+
+		with self.lock:
+			for cached in self.projects.values():
+				if found := ids & cached["index"]["documents"].keys():
+					cached["changed"] |= found
+
+	def key(self, db: Session, project_id: int) -> Tuple[int, int]:
+		engine = db.get_bind().engine
+
+		with self.lock:
+			if engine not in self.engines:
+				self.engines[engine] = next(self.engine_ids)
+
+			return self.engines[engine], project_id
+
+	def fingerprint(self, db: Session, project_id: int) -> Tuple[Any, ...]:
+		sql = (
+			select(func.count(), func.max(Ticket.id), func.max(Ticket.updated))
+			.where(Ticket.project_id == project_id)
+		)
+
+		return tuple(db.execute(sql).one())
+
+	@staticmethod
+	def document(title: str | None, description: str | None) -> Tuple[str, str]:
+		return (title or "").lower(), (description or "").lower()
+
+	def build(self, db: Session, project_id: int) -> Dict[str, Any]:
+		sql = (
+			select(Ticket.id, Ticket.title, Ticket.description)
+			.where(Ticket.project_id == project_id)
+			.execution_options(yield_per = 1000)
+		)
+
+		documents = {}
+		grams = {}
+
+		for id, title, description in db.execute(sql):
+			documents[id] = self.document(title, description)
+
+			for gram in trigrams(documents[id][0]) | trigrams(documents[id][1]):
+				grams.setdefault(gram, set()).add(id)
+
+		self.builds += 1
+
+		return {"documents": documents, "grams": grams}
+
+	@staticmethod
+	def patch(index: Dict[str, Any], rows: Dict[int, Tuple[str, str]], removed: Iterable[int]) -> Dict[str, Any]:
+		"""
+			Devuelve una copia del índice con 'rows' agregados o reemplazados
+			y sin 'removed'. Solo se copian los trigramas que cambian: una
+			búsqueda en curso sigue leyendo el índice anterior sin bloqueos.
+		"""
+		documents = dict(index["documents"])
+		grams = dict(index["grams"])
+		copied = {}
+
+		def edit(gram: str) -> set:
+			if gram not in copied:
+				copied[gram] = grams[gram] = set(grams.get(gram, ()))
+
+			return copied[gram]
+
+		for id in set(removed) | rows.keys():
+			if id not in documents:
+				continue
+
+			title, description = documents.pop(id)
+
+			for gram in trigrams(title) | trigrams(description):
+				edit(gram).discard(id)
+
+		for id, (title, description) in rows.items():
+			documents[id] = (title, description)
+
+			for gram in trigrams(title) | trigrams(description):
+				edit(gram).add(id)
+
+		for gram, ids in copied.items():
+			if not ids:
+				del grams[gram]
+
+		return {"documents": documents, "grams": grams}
+
+	def refresh(self, db: Session, project_id: int, cached: Dict[str, Any], changed: set, fingerprint: Tuple[Any, ...]) -> Dict[str, Any] | None:
+		"""
+			Vuelve a leer los tickets marcados y los creados después del
+			índice. Devuelve None si la huella muestra cambios que no se
+			pueden ubicar (otro proceso actualizó o eliminó algún ticket).
+		"""
+		total, _, updated = fingerprint
+		_, last_id, last_updated = cached["fingerprint"]
+
+		sql = (
+			select(Ticket.id, Ticket.title, Ticket.description, Ticket.updated)
+			.where(Ticket.project_id == project_id)
+			.where(or_(Ticket.id > (last_id or 0), Ticket.id.in_(changed)))
+		)
+
+		rows = {}
+		read_updated = set()
+
+		for id, title, description, ticket_updated in db.execute(sql):
+			rows[id] = self.document(title, description)
+			read_updated.add(ticket_updated)
+
+		if updated != last_updated and updated not in read_updated:
+			return None
+
+		index = self.patch(cached["index"], rows, changed - rows.keys())
+
+		# Tickets eliminados por otro proceso (SQLite puede reusar sus IDs)
+		if len(index["documents"]) != total:
+			return None
+
+		self.refreshes += 1
+
+		return index
+
+	def get(self, db: Session, project_id: int) -> Dict[str, Any]:
+		key = self.key(db = db, project_id = project_id)
+		fingerprint = self.fingerprint(db = db, project_id = project_id)
+		changed, rebuild = set(), True
+
+		with self.lock:
+			cached = self.projects.get(key)
+
+			if cached is not None:
+				if cached["fingerprint"] == fingerprint and not cached["changed"] and not cached["rebuild"]:
+					self.projects.move_to_end(key)
+					return cached["index"]
+
+				# Lo que se marque mientras se lee queda para la próxima búsqueda
+				changed, rebuild = cached["changed"], cached["rebuild"]
+				cached["changed"], cached["rebuild"] = set(), False
+
+		try:
+			index = None
+
+			if not rebuild:
+				index = self.refresh(db = db, project_id = project_id, cached = cached, changed = changed, fingerprint = fingerprint)
+
+			if index is None:
+				index = self.build(db = db, project_id = project_id)
+		except BaseException:
+			if cached is not None:
+				with self.lock:
+					cached["changed"] |= changed
+					cached["rebuild"] = cached["rebuild"] or rebuild
+
+			raise
+
+		with self.lock:
+			current = self.projects.get(key)
+
+			self.projects[key] = {
+				"fingerprint": fingerprint,
+				"index": index,
+				"changed": current["changed"] if current else set(),
+				"rebuild": current["rebuild"] if current else False,
+			}
+			self.projects.move_to_end(key)
+
+			while len(self.projects) > self.max_projects:
+				self.projects.popitem(last = False)
+
+		return index
+
+	def search(self, db: Session, project_id: int, value: str) -> List[int]:
+		index = self.get(db = db, project_id = project_id)
+		documents = index["documents"]
+		value = value.lower()
+
+		candidates = documents.keys()
+
+		if len(value) >= MinLengthTrigram:
+			sets = [index["grams"].get(gram, set()) for gram in trigrams(value)]
+			candidates = set.intersection(*sorted(sets, key = len))
+
+		ranked = []
+
+		for id in candidates:
+			title, description = documents[id]
+			position = title.find(value)
+
+			if position >= 0:
+				ranked.append(((0, position, len(title), id), id))
+			elif value in description:
+				ranked.append(((1, description.find(value), 0, id), id))
+
+		return [id for _, id in sorted(ranked)]
+
+
+trigram_index = TrigramIndex()
+
+
+@event.listens_for(Ticket, "after_insert")
+@event.listens_for(Ticket, "after_update")
+@event.listens_for(Ticket, "after_delete")
+def invalidate_ticket(mapper, connection, target):
+	trigram_index.invalidate(project_id = target.project_id, ids = [target.id])
+
+
+def criteria_values(statement: Any, column: Any) -> set | None:
+	"""
+		Valores de 'column' en el WHERE (igualdad o IN), solo si es una
+		condición obligatoria: una unida con AND y no dentro de un OR.
+	"""
+	whereclause = statement.whereclause
+
+	if whereclause is None:
+		return None
+
+	clauses = [whereclause]
+
+	if isinstance(whereclause, BooleanClauseList) and whereclause.operator is operators.and_:
+		clauses = whereclause.clauses
+
+	for clause in clauses:
+		if not isinstance(clause, BinaryExpression) or not isinstance(clause.right, BindParameter):
+			continue
+
+		if not clause.left.compare(column):
+			continue
+
+		if clause.operator is operators.eq:
+			return {clause.right.value}
+
+		if clause.operator is operators.in_op:
+			return set(clause.right.value)
+
+	return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_bulk(orm_execute_state):
+	"""
+		UPDATE y DELETE por lotes: marca los tickets si el WHERE tiene sus
+		IDs, si no reconstruye sus proyectos (o todos si tampoco los tiene).
+		Los INSERT no hacen falta, la huella ya muestra los IDs nuevos.
+	"""
+	if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+		return
+
+	mapper = orm_execute_state.bind_mapper
+
+	if mapper is None or mapper.class_ is not Ticket:
+		return
+
+	statement = orm_execute_state.statement
+
+	if (ids := criteria_values(statement, Ticket.__table__.c.id)) is not None:
+		trigram_index.invalidate_tickets(ids)
+		return
+
+	project_ids = criteria_values(statement, Ticket.__table__.c.project_id)
+
+	for project_id in project_ids or [None]:
+		trigram_index.invalidate(project_id = project_id)
+
+
+# Se detecta una vez por engine; 'create_search_index' actualiza el valor
+_postgres_trgm = WeakKeyDictionary()
+_sqlite_fts = WeakKeyDictionary()
+
+def has_pg_trgm(db: Session) -> bool:
+	bind = db.get_bind()
+
+	if bind not in _postgres_trgm:
+		sql = text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+		_postgres_trgm[bind] = db.execute(sql).first() is not None
+
+	return _postgres_trgm[bind]
+
+
+def has_fts(db: Session) -> bool:
+	bind = db.get_bind()
+
+	if bind not in _sqlite_fts:
+		sql = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+		_sqlite_fts[bind] = db.execute(sql, {"name": FTSTable}).first() is not None
+
+	return _sqlite_fts[bind]
+
+
+def get_search_backend(db: Session, backend: str = SEARCH_BACKEND) -> str:
+	if backend not in SearchBackends:
+		raise ValueError(f"Motor de búsqueda desconocido: {backend}")
+
+	if backend != SearchAuto:
+		return backend
+
+	dialect = db.get_bind().dialect.name
+
+	if dialect == "postgresql" and has_pg_trgm(db = db):
+		return SearchPostgres
+
+	if dialect == "sqlite" and has_fts(db = db):
+		return SearchFTS
+
+	return SearchMemory
+
+
+def sql_search(backend: str, project_id: int, value: str) -> Select:
+	build_sql = {
+		SearchPostgres: sql_postgres,
+		SearchFTS: sql_fts,
+		SearchLike: sql_like,
+	}
+
+	return build_sql[backend](project_id = project_id, value = value)
+
+
+def sort_by_ids(tickets: List[Ticket], ids: List[int]) -> List[Ticket]:
+	position = {id: i for i, id in enumerate(ids)}
+
+	return sorted(tickets, key = lambda ticket: position[ticket.id])
+
+
+def search_tickets(db: Session, project_id: int, value: str, page: int = PageDefault, pageSize: int = PageSizeDefault, backend: str = SEARCH_BACKEND) -> Tuple[List[Ticket], int]:
+	"""
+		Busca 'value' en el titulo y la descripción de los tickets del
+		proyecto. Devuelve la página ordenada por relevancia y el total.
+	"""
+	backend = get_search_backend(db = db, backend = backend)
+
+	if backend != SearchMemory:
+		sql = sql_search(backend = backend, project_id = project_id, value = value)
+
+		return paginate(db = db, sql = sql, page = page, pageSize = pageSize)
+
+	start = calculate_start_pagination(page = page, pageSize = pageSize)
+
+	ids = trigram_index.search(db = db, project_id = project_id, value = value)
+	page_ids = ids[start:start + pageSize]
+
+	if not page_ids:
+		return [], len(ids)
+
+	tickets = db.scalars(select(Ticket).where(Ticket.id.in_(page_ids))).all()
+
+	return sort_by_ids(tickets = tickets, ids = page_ids), len(ids)
+
+
+def stream_tickets(db: Session, project_id: int, value: str, chunk_size: int = StreamChunkSize, backend: str = SEARCH_BACKEND) -> Iterator[Ticket]:
+	"""
+		Recorre todos los resultados de la búsqueda por bloques de 'chunk_size'
+		con un cursor del servidor ('yield_per'). Cada bloque se saca de la 
+		sesión después de entregarlo para que la memoria no crezca.
+	"""
+	backend = get_search_backend(db = db, backend = backend)
+
+	if backend == SearchMemory:
+		ids = trigram_index.search(db = db, project_id = project_id, value = value)
+
+		for start in range(0, len(ids), chunk_size):
+			chunk = ids[start:start + chunk_size]
+			tickets = db.scalars(select(Ticket).where(Ticket.id.in_(chunk))).all()
+
+			yield from sort_by_ids(tickets = tickets, ids = chunk)
+
+			expunge(db = db, instances = tickets)
+
+		return
+
+	sql = sql_search(backend = backend, project_id = project_id, value = value)
+	result = db.scalars(sql.execution_options(yield_per = chunk_size))
+
+	for partition in result.partitions():
+		yield from partition
+
+		expunge(db = db, instances = partition)
+
+
+async def astream_tickets(db: AsyncSession, project_id: int, value: str, chunk_size: int = StreamChunkSize, backend: str = SEARCH_BACKEND) -> AsyncIterator[Ticket]:
+	"""
+		Versión de 'stream_tickets' para una 'AsyncSession'.
+	"""
+	backend = await db.run_sync(
+		lambda sync_db: get_search_backend(db = sync_db, backend = backend)
+	)
+
+	if backend == SearchMemory:
+		ids = await db.run_sync(
+			lambda sync_db: trigram_index.search(db = sync_db, project_id = project_id, value = value)
+		)
+
+		for start in range(0, len(ids), chunk_size):
+			chunk = ids[start:start + chunk_size]
+			tickets = (await db.scalars(select(Ticket).where(Ticket.id.in_(chunk)))).all()
+
+			for ticket in sort_by_ids(tickets = tickets, ids = chunk):
+				yield ticket
+
+			expunge(db = db, instances = tickets)
+
+		return
+
+	sql = sql_search(backend = backend, project_id = project_id, value = value)
+	result = await db.stream_scalars(sql.execution_options(yield_per = chunk_size))
+
+	async for partition in result.partitions():
+		for ticket in partition:
+			yield ticket
+
+		expunge(db = db, instances = partition)
+
+
+def create_search_index(engine: Engine) -> str | None:
+	"""
+		Crea la estructura de búsqueda según el motor de la base de datos:
+		índices GIN de pg_trgm en PostgreSQL o la tabla FTS5 (con sus
+		triggers) en SQLite. Devuelve el motor creado o None si no es posible.
+	"""
+	dialect = engine.dialect.name
+
+	try:
+		with engine.begin() as connection:
+			if dialect == "postgresql":
+				connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+				connection.execute(text("CREATE INDEX IF NOT EXISTS ix_ticket_title_trgm ON ticket USING gin (title gin_trgm_ops)"))
+				connection.execute(text("CREATE INDEX IF NOT EXISTS ix_ticket_description_trgm ON ticket USING gin (description gin_trgm_ops)"))
+
+				_postgres_trgm[engine] = True
+
+				return SearchPostgres
+
+			if dialect != "sqlite":
+				return None
+
+			sql = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+			exists = connection.execute(sql, {"name": FTSTable}).first() is not None
+
+			connection.execute(text(
+				f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTSTable} USING fts5("
+				"title, description, content='ticket', content_rowid='id', tokenize='trigram')"
+			))
+			connection.execute(text(
+				f"CREATE TRIGGER IF NOT EXISTS {FTSTable}_ai AFTER INSERT ON ticket BEGIN "
+				f"INSERT INTO {FTSTable}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+				"END"
+			))
+			connection.execute(text(
+				f"CREATE TRIGGER IF NOT EXISTS {FTSTable}_ad AFTER DELETE ON ticket BEGIN "
+				f"INSERT INTO {FTSTable}({FTSTable}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+				"END"
+			))
+			connection.execute(text(
+				f"CREATE TRIGGER IF NOT EXISTS {FTSTable}_au AFTER UPDATE OF title, description ON ticket BEGIN "
+				f"INSERT INTO {FTSTable}({FTSTable}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+				f"INSERT INTO {FTSTable}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+				"END"
+			))
+
+			if not exists:
+				connection.execute(text(f"INSERT INTO {FTSTable}({FTSTable}) VALUES ('rebuild')"))
+	except DBAPIError:
+		# Sin permisos para la extensión o SQLite sin FTS5/trigram:
+		# se usa el índice en memoria.
+		_postgres_trgm.pop(engine, None)
+
+		return None
+
+	_sqlite_fts[engine] = True
+
+	return SearchFTS
@@ -1,11 +1,12 @@
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 from typing import Dict
 from typing_extensions import Annotated
 
-from pydantic import validate_call
 from pydantic import BeforeValidator
 
+from apps.utils.validation.validation import validate_call
 from apps.tickets.models import StateTicketHistory 
 
 def is_enum(value: Enum) -> Enum:
@@ -16,11 +17,13 @@ def is_enum(value: Enum) -> Enum:
 
 IsEnum = Annotated[Any, BeforeValidator(is_enum)]
 
+@lru_cache(maxsize = None)
+def choice_names(options: type[Enum]) -> frozenset:
+	return frozenset(option.name for option in options)
+
 @validate_call
 def validate_choice(choice: str, options: IsEnum) -> bool:
-	str_choices = [option.name for option in options]
-
-	if choice not in str_choices:
+	if choice not in choice_names(options):
 		return False
 
 	return True
@@ -1,4 +1,5 @@
 from .model import Ticket
+from .model import TicketCounter
 from .model import ChoicesType
 from .model import ChoicesState
 from .model import ChoicesPrority
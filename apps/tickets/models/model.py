@@ -3,6 +3,7 @@ from datetime import datetime
 
 from sqlalchemy import Enum
 from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy  import String
 from sqlalchemy  import ForeignKey
 from sqlalchemy.orm  import Mapped 
@@ -37,6 +38,12 @@ class StateTicketHistory(enum.Enum):
 
 class Ticket(Model):
 	__tablename__ = "ticket"
+	__table_args__ = (
+		Index("ix_ticket_project_id_id", "project_id", "id"),
+		Index("ix_ticket_project_filter", "project_id", "state", "type", "priority", "id"),
+		# max(updated) para el ETag de los listados
+		Index("ix_ticket_project_updated", "project_id", "updated"),
+	)
 	
 	id: Mapped[int] = mapped_column(primary_key = True, index = True, nullable=False, unique=True)
 	title: Mapped[str] = mapped_column(String(30))
@@ -72,6 +79,9 @@ class Ticket(Model):
 
 class TicketHistory(Model):
 	__tablename__ = "ticket_history"
+	__table_args__ = (
+		Index("ix_ticket_history_ticket_id", "ticket_id", "id"),
+	)
 	
 	id: Mapped[int] = mapped_column(primary_key = True, index = True, nullable=False, unique=True)
 	created: Mapped[datetime] = mapped_column(insert_default = func.now())
@@ -91,4 +101,28 @@ class TicketHistory(Model):
 	ticket: Mapped[Ticket] = relationship(back_populates = 'history')
 	
 	def __repr__(self):
-		return f"TicketHistory(id={self.id}, title={self.title}, priority={self.priority}, state={self.state}, type={self.type})"
\ No newline at end of file
+		return f"TicketHistory(id={self.id}, title={self.title}, priority={self.priority}, state={self.state}, type={self.type})"
+
+
+class TicketCounter(Model):
+	"""
+		Tickets de cada proyecto por valor de 'state', 'type' y 'priority'
+		(más el total, dimension 'total'). Los 'commands' que crean,
+		actualizan o borran tickets lo mantienen en la misma transacción.
+	"""
+	__tablename__ = "ticket_counter"
+
+	project_id: Mapped[int] = mapped_column(
+		ForeignKey(
+			'project.id',
+			ondelete = "CASCADE",
+			onupdate = "CASCADE"
+		),
+		primary_key = True
+	)
+	dimension: Mapped[str] = mapped_column(String(10), primary_key = True)
+	value: Mapped[str] = mapped_column(String(20), primary_key = True)
+	total: Mapped[int] = mapped_column(default = 0)
+
+	def __repr__(self):
+		return f"TicketCounter(project_id={self.project_id}, dimension={self.dimension}, value={self.value}, total={self.total})"
@@ -1,21 +1,36 @@
 from typing import Optional
+from typing import Iterator
+from typing import AsyncIterator
 from typing_extensions import Annotated
 
 from fastapi import status
 from fastapi import Request
+from fastapi import Response
 from fastapi import APIRouter
 from fastapi import Query
 from fastapi import Depends
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps import run_command
+from apps import get_async_db
 from apps.tickets.schemas import schemas
 from apps.tickets.commands import commands
-from apps.tickets.models import StateTicketHistory
+from apps.tickets.commands.utils import search
 
 from apps.projects.commands import commands as c_projects
 
 from apps.utils.pagination import pagination as pg
-from apps.utils.token.token import validate_authorization
+from apps.utils.conditional.conditional import latest
+from apps.utils.conditional.conditional import make_etag
+from apps.utils.conditional.conditional import row_values
+from apps.utils.conditional.conditional import conditional_response
+from apps.utils.responses.responses import ModelResponse
+from apps.utils.token.token import Principal
+from apps.utils.token.token import get_principal
 
 
 router = APIRouter(prefix = "/ticket")
@@ -31,15 +46,35 @@ STATUS_CODE_ERRORS = {
 	status_code = status.HTTP_201_CREATED,
 	response_model = schemas.TicketSimpleResponse
 )
-def create_ticket(ticket: schemas.TicketRequest, token: str = Depends(validate_authorization)) -> schemas.TicketSimpleResponse:
+async def create_ticket(ticket: schemas.TicketRequest, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketSimpleResponse:
 	try:
-		new_ticket = commands.command_create_ticket(
+		new_ticket = await run_command(
+			db,
+			commands.command_create_ticket_with_history,
 			ticket = ticket
 		)
+	except ValueError as e:
+		message, status_code = e.args
+		
+		return JSONResponse(
+			content = {"message": message},
+			status_code = STATUS_CODE_ERRORS[status_code]
+		)
+
+	return new_ticket
+
 
-		commands.command_add_ticket_history(
-			ticket_id = new_ticket.id, 
-			state = StateTicketHistory.crear.name
+@router.post(
+	"/bulk",
+	status_code = status.HTTP_201_CREATED,
+	response_model = schemas.ListTickets
+)
+async def create_tickets(bulk: schemas.TicketBulkRequest, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ListTickets:
+	try:
+		tickets = await run_command(
+			db,
+			commands.command_create_tickets,
+			tickets = bulk.tickets
 		)
 	except ValueError as e:
 		message, status_code = e.args
@@ -49,7 +84,7 @@ def create_ticket(ticket: schemas.TicketRequest, token: str = Depends(validate_a
 			status_code = STATUS_CODE_ERRORS[status_code]
 		)
 
-	return new_ticket
+	return {"total": len(tickets), "tickets": tickets}
 
 
 @router.get(
@@ -57,9 +92,11 @@ def create_ticket(ticket: schemas.TicketRequest, token: str = Depends(validate_a
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TicketResponse
 )
-def get_ticket(id: int, token: str = Depends(validate_authorization)) -> schemas.TicketResponse:
+async def get_ticket(request: Request, response: Response, id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketResponse:
 	try:
-		ticket = commands.command_get_ticket(
+		ticket = await run_command(
+			db,
+			commands.command_get_ticket,
 			ticket_id = id
 		)
 	except ValueError as e:
@@ -70,6 +107,12 @@ def get_ticket(id: int, token: str = Depends(validate_authorization)) -> schemas
 			status_code = STATUS_CODE_ERRORS[status_code]
 		)
 
+	etag = make_etag(row_values(ticket), row_values(ticket.project))
+	last_modified = latest(ticket.updated, ticket.project.updated)
+
+	if (cached := conditional_response(request, response, etag = etag, last_modified = last_modified)) is not None:
+		return cached
+
 	return ticket
 
 
@@ -78,33 +121,45 @@ def get_ticket(id: int, token: str = Depends(validate_authorization)) -> schemas
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TicketsByProjectResponse
 )
-def get_ticket_by_filter(request: Request, project_id: int, ticket_filter: Annotated[schemas.TicketFilterPagination, Query()], token: str = Depends(validate_authorization)) -> schemas.TicketsByProjectResponse:
+async def get_ticket_by_filter(request: Request, response: Response, project_id: int, ticket_filter: Annotated[schemas.TicketFilterPagination, Query()], principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketsByProjectResponse:
 	
 	try:
 
-		project = c_projects.command_get_project(
+		project = await run_command(
+			db,
+			c_projects.command_get_project,
 			project_id = project_id
 		)
 
-		search_total = ticket_filter.model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
-
-		total_tickets = commands.command_get_total_tickets_filter(
-			search = search_total,
-			project_id = project_id
-		)
-		
 		search_filter = ticket_filter.model_dump(
 			exclude_defaults = True, 
-			exclude=['page', 'pageSize']
+			exclude=['page', 'pageSize', 'cursor']
 		)
 		
-		data_pagination = ticket_filter.model_dump(include=['page', 'pageSize'])
+		data_pagination = ticket_filter.model_dump(include=['page', 'pageSize', 'cursor'])
+
+		updated, total_tickets = await run_command(
+			db,
+			commands.command_get_tickets_validators,
+			project_id = project_id,
+			search = search_filter
+		)
+
+		etag = make_etag(row_values(project), updated, total_tickets, request.url.query)
+		last_modified = latest(project.updated, updated)
+
+		if (cached := conditional_response(request, response, etag = etag, last_modified = last_modified)) is not None:
+			return cached
 		
-		tickets = commands.command_get_ticket_by_filter(
+		tickets, total_tickets = await run_command(
+			db,
+			commands.command_get_page_tickets_filter,
 			project_id = project_id,
 			search = search_filter,
 			page = data_pagination['page'],
 			pageSize = data_pagination['pageSize'],
+			cursor = data_pagination['cursor'],
+			total = total_tickets
 		)
 	except ValueError as e:
 		message, status_code = e.args
@@ -120,13 +175,15 @@ def get_ticket_by_filter(request: Request, project_id: int, ticket_filter: Annot
 		total_elements = total_tickets,
 		page = ticket_filter.page,
 		pageSize = ticket_filter.pageSize,
-		params = search_filter 
+		params = search_filter,
+		cursor = ticket_filter.cursor
 	)
 
-	response = {
+	content = {
 		"previous": pagination.get('previous'),
 		"current": ticket_filter.page,
 		"next": pagination.get("next"),
+		"cursor": pagination.get("cursor"),
 		"project": project,
 		"content": {
 			"total": total_tickets,
@@ -134,19 +191,74 @@ def get_ticket_by_filter(request: Request, project_id: int, ticket_filter: Annot
 		}	
 	}
 	
-	return response
+	return ModelResponse(schemas.TicketsByProjectResponse, content, headers = response.headers)
+
+
+def stream_ndjson(db: Session, project_id: int, ticket: schemas.TicketByTitle) -> Iterator[str]:
+	# La dependencia ya cerró la sesión, la reabre el cursor y se cierra al terminar
+	try:
+		tickets = commands.command_stream_tickets_by_title(
+			db = db,
+			project_id = project_id,
+			ticket = ticket
+		)
+
+		for element in tickets:
+			yield schemas.TicketSimpleResponse.model_validate(element, from_attributes = True).model_dump_json() + "\n"
+	finally:
+		db.close()
+
+
+async def astream_ndjson(db: AsyncSession, project_id: int, ticket: schemas.TicketByTitle) -> AsyncIterator[str]:
+	try:
+		tickets = search.astream_tickets(
+			db = db,
+			project_id = project_id,
+			value = ticket.title
+		)
+
+		async for element in tickets:
+			yield schemas.TicketSimpleResponse.model_validate(element, from_attributes = True).model_dump_json() + "\n"
+	finally:
+		await db.close()
 
 
 @router.get(
 	"/project/{project_id}/ticket",
 	status_code = status.HTTP_200_OK,
-	response_model = schemas.SimpleListTickets
+	response_model = schemas.TicketsByTitleResponse
 )
-def get_ticket_by_title(project_id: int, ticket: Annotated[schemas.TicketByTitle, Query()], token: str = Depends(validate_authorization)) ->  schemas.SimpleListTickets:
+async def get_ticket_by_title(request: Request, response: Response, project_id: int, ticket: Annotated[schemas.TicketByTitlePagination, Query()], principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) ->  schemas.TicketsByTitleResponse:
+	if ticket.stream:
+		content = (
+			astream_ndjson(db = db, project_id = project_id, ticket = ticket)
+			if isinstance(db, AsyncSession) else
+			stream_ndjson(db = db, project_id = project_id, ticket = ticket)
+		)
+
+		return StreamingResponse(content, media_type = "application/x-ndjson")
+
 	try:
-		tickets = commands.command_get_ticket_by_title(
+		# Cualquier cambio en los tickets del proyecto puede cambiar el resultado
+		updated, total = await run_command(
+			db,
+			commands.command_get_tickets_validators,
+			project_id = project_id
+		)
+
+		etag = make_etag(updated, total, request.url.query)
+
+		if (cached := conditional_response(request, response, etag = etag, last_modified = updated)) is not None:
+			return cached
+
+		tickets, total_tickets = await run_command(
+			db,
+			commands.command_get_page_tickets_by_title,
 			project_id = project_id,
-			ticket = ticket
+			ticket = ticket,
+			page = ticket.page,
+			pageSize = ticket.pageSize,
+			cursor = ticket.cursor
 		)
 	except ValueError as e:
 		message, status_code = e.args
@@ -156,11 +268,52 @@ def get_ticket_by_title(project_id: int, ticket: Annotated[schemas.TicketByTitle
 			status_code = STATUS_CODE_ERRORS[status_code]
 		)
 
-	response = {
-		"tickets": tickets
+	pagination = pg.set_url_pagination(
+		request = pg.get_url_from_request(request = request),
+		elements = tickets,
+		total_elements = total_tickets,
+		page = ticket.page,
+		pageSize = ticket.pageSize,
+		params = {"title": ticket.title}
+	)
+
+	content = {
+		"previous": pagination.get('previous'),
+		"current": ticket.page,
+		"next": pagination.get('next'),
+		"content": {
+			"total": total_tickets,
+			"tickets": tickets
+		}
 	}
 
-	return response
+	return ModelResponse(schemas.TicketsByTitleResponse, content, headers = response.headers)
+
+
+@router.put(
+	"/bulk",
+	status_code = status.HTTP_200_OK,
+	response_model = schemas.ListTickets
+)
+async def update_tickets(bulk: schemas.TicketBulkUpdate, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.ListTickets:
+	try:
+		tickets = await run_command(
+			db,
+			commands.command_update_tickets,
+			infoUpdate = bulk.update,
+			ticket_ids = bulk.ids,
+			project_id = bulk.project_id,
+			search = bulk.filter.model_dump(exclude_defaults = True)
+		)
+	except ValueError as e:
+		message, status_code = e.args
+		
+		return JSONResponse(
+			content = {"message": message},
+			status_code = STATUS_CODE_ERRORS[status_code]
+		)
+
+	return {"total": len(tickets), "tickets": tickets}
 
 
 @router.put(
@@ -168,20 +321,14 @@ def get_ticket_by_title(project_id: int, ticket: Annotated[schemas.TicketByTitle
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TicketSimpleResponse
 )
-def update_ticket(id: int, ticket: schemas.TicketUpdate, token: str = Depends(validate_authorization)) -> schemas.TicketSimpleResponse:
+async def update_ticket(id: int, ticket: schemas.TicketUpdate, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketSimpleResponse:
 	try:
-		ticket_update = ticket.model_dump(exclude_defaults = True)
-
-		ticket = commands.command_update_ticket(
+		ticket = await run_command(
+			db,
+			commands.command_update_ticket_with_history,
 			ticket_id = id,
 			infoUpdate = ticket
 		)
-		
-		commands.command_add_ticket_history(
-			ticket_id = id, 
-			state = StateTicketHistory.actualizar.name,
-			infoTicket = ticket_update
-		)
 
 	except ValueError as e:
 		message, status_code = e.args
@@ -198,9 +345,11 @@ def update_ticket(id: int, ticket: schemas.TicketUpdate, token: str = Depends(va
 	"/{id}",
 	status_code = status.HTTP_204_NO_CONTENT,
 )
-def delete_ticket(id: int, token: str = Depends(validate_authorization)) -> None:
+async def delete_ticket(id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> None:
 	try:
-		commands.command_delete_ticket(
+		await run_command(
+			db,
+			commands.command_delete_ticket,
 			ticket_id = id
 		)
 	except ValueError as e:
@@ -217,20 +366,34 @@ def delete_ticket(id: int, token: str = Depends(validate_authorization)) -> None
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TicketsHistoryByTicketResponse
 )
-def get_ticket_history_by_ticket(request: Request, id: int, query: Annotated[pg.ListPagination, Query()], token: str = Depends(validate_authorization)) -> schemas.TicketsHistoryByTicketResponse:
+async def get_ticket_history_by_ticket(request: Request, response: Response, id: int, query: Annotated[pg.ListPagination, Query()], principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketsHistoryByTicketResponse:
 	try:
-		ticket = commands.command_get_ticket(
+		ticket = await run_command(
+			db,
+			commands.command_get_ticket,
 			ticket_id = id
 		)
 
-		total_tickets_history = commands.command_get_total_ticket_histories(
+		created, total = await run_command(
+			db,
+			commands.command_get_ticket_histories_validators,
 			ticket_id = id
 		)
 
-		histories = commands.command_get_ticket_histories(
+		etag = make_etag(row_values(ticket), created, total, request.url.query)
+		last_modified = latest(ticket.updated, created)
+
+		if (cached := conditional_response(request, response, etag = etag, last_modified = last_modified)) is not None:
+			return cached
+
+		histories, total_tickets_history = await run_command(
+			db,
+			commands.command_get_page_ticket_histories,
 			ticket_id = id,
 			page = query.page,
 			pageSize = query.pageSize,
+			cursor = query.cursor,
+			total = total
 		)
 	except ValueError as e:
 		message, status_code = e.args
@@ -246,14 +409,16 @@ def get_ticket_history_by_ticket(request: Request, id: int, query: Annotated[pg.
 		elements = histories,
 		total_elements = total_tickets_history,
 		page = query.page,
-		pageSize = query.pageSize
+		pageSize = query.pageSize,
+		cursor = query.cursor
 	)
 
 
-	response = {
+	content = {
 		"previous": pagination.get('previous'),
 		"current": query.page,
 		"next": pagination.get('next'),
+		"cursor": pagination.get('cursor'),
 		"ticket": ticket,
 		"content": {
 			"total": total_tickets_history,
@@ -261,7 +426,7 @@ def get_ticket_history_by_ticket(request: Request, id: int, query: Annotated[pg.
 		}
 	}
 
-	return response
+	return ModelResponse(schemas.TicketsHistoryByTicketResponse, content, headers = response.headers)
 
 
 @router.get(
@@ -269,9 +434,11 @@ def get_ticket_history_by_ticket(request: Request, id: int, query: Annotated[pg.
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TicketsHistoryResponse
 )
-def get_ticket_history(id: int, token: str = Depends(validate_authorization)) -> schemas.TicketsHistoryResponse:
+async def get_ticket_history(id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TicketsHistoryResponse:
 	try:
-		history = commands.command_get_detail_ticket_history(
+		history = await run_command(
+			db,
+			commands.command_get_detail_ticket_history,
 			history_id = id
 		)
 	except ValueError as e:
@@ -8,6 +8,7 @@ from pydantic import Field
 from pydantic import BaseModel
 from pydantic import AfterValidator
 from pydantic import PlainValidator
+from pydantic import model_validator
 from pydantic import ValidationInfo
 from pydantic import PlainSerializer
 
@@ -24,6 +25,9 @@ MAX_LENGTH_TITLE = 30
 MIN_LENGTH_DESCRIPTION = 5
 MAX_LENGTH_DESCRIPTION = 200
 
+# Tickets por petición en POST /ticket/bulk
+MAX_BULK_TICKETS = 50000
+
 def set_choice_priority(value: str) -> str:
 	str_choices = [choice.name for choice in ChoicesPrority]
 	if value not in str_choices:
@@ -119,6 +123,10 @@ class TicketRequest(BaseModel):
 	description: Optional[LenValidationField] = None
 
 
+class TicketBulkRequest(BaseModel):
+	tickets: List[TicketRequest] = Field(min_length = 1, max_length = MAX_BULK_TICKETS)
+
+
 class TicketFilter(BaseModel):
 	state: Optional[StateField] = None
 	priority: Optional[PriorityField] = None
@@ -133,6 +141,11 @@ class TicketByTitle(BaseModel):
 	title: str = Field(max_length = MAX_LENGTH_TITLE)
 
 
+class TicketByTitlePagination(pg.ListPagination, TicketByTitle):
+	# Devuelve todos los resultados como NDJSON en lugar de una página
+	stream: bool = False
+
+
 class TicketUpdate(BaseModel):
 	title: Optional[LenValidationField] = None
 	description: Optional[LenValidationField] = None
@@ -141,6 +154,24 @@ class TicketUpdate(BaseModel):
 	priority: Optional[PriorityField] = None
 
 
+class TicketBulkUpdate(BaseModel):
+	"""
+		Cambios para varios tickets: los de 'ids' o, si no se envían,
+		todos los del proyecto 'project_id' que cumplan 'filter'.
+	"""
+	update: TicketUpdate
+	ids: Optional[List[int]] = Field(default = None, min_length = 1, max_length = MAX_BULK_TICKETS)
+	project_id: Optional[int] = None
+	filter: TicketFilter = TicketFilter()
+
+	@model_validator(mode = "after")
+	def check_target(self) -> "TicketBulkUpdate":
+		if (self.ids is None) == (self.project_id is None):
+			raise ValueError("Debe enviar 'ids' o 'project_id' (con 'filter'), pero no ambos")
+
+		return self
+
+
 class TicketResponse(TicketSchema):
 	id: int
 	created: datetime
@@ -165,7 +196,7 @@ class TicketBasicResponse(TicketSchema):
 
 
 class ListTickets(BaseModel):
-	total: int
+	total: Optional[int]
 	tickets: Optional[List[TicketSimpleResponse]]
 
 
@@ -173,6 +204,10 @@ class SimpleListTickets(BaseModel):
 	tickets: Optional[List[TicketSimpleResponse]]
 
 
+class TicketsByTitleResponse(pg.ResponsePagination):
+	content: ListTickets
+
+
 class TicketsByProjectResponse(pg.ResponsePagination):
 	project: ProjectSimpleResponse
 	content: ListTickets
@@ -201,7 +236,7 @@ class TicketsHistoryResponse(TicketsHistorySchema):
 
 
 class ListTicketsHistory(BaseModel):
-	total: int
+	total: Optional[int]
 	histories: Optional[List[TicketsHistorySimpleResponse]]
 
 class TicketsHistoryByTicketResponse(pg.ResponsePagination):
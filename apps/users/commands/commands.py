@@ -4,16 +4,23 @@ from typing import Dict
 from typing import Optional
 
 from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy import or_
 
-from pydantic import validate_call
+from apps.utils.validation.validation import validate_call
+from apps.utils.cache.cache import cache_key
+from apps.utils.cache.cache import detail_cache
 
-from apps import get_db
+from apps import SessionDB
 from apps.users.schemas import schemas
 from apps.users.models import User
 from .utils.password import HashPassword
 from .utils.password import ValidateHashedPassword
+from .utils.password import needs_rehash
 from .utils.utils import user_serializer
+from .utils.refresh import issue_tokens
+from .utils.refresh import revoke_family
+from .utils.refresh import rotate_refresh_token
 from .utils.error_messages import (
 	EmailORUsernameInvalid,
 	DoesNotExistsUser,
@@ -23,22 +30,19 @@ from .utils.error_messages import (
 	UsernamelUnchanged,
 	InvalidCredentials,
 	InvalidCredentialsNoEmail,
-	SerializerUser
+	SerializerUser,
+	RefreshTokenInvalid
 )
 
 from apps.utils.token.token import create_token
 from apps.utils.token.token import verify_token
 from apps.utils.token.token import decode_token
 from apps.utils.token.token import create_refresh_token
-from apps.utils.token.token import TokenDecode
-from apps.utils.token.token import TokenCreate
-from apps.utils.token.token import TokenRefresh
+from apps.utils.token.token import RefreshTokenType
 
 
 @validate_call
-def command_create_user(user: schemas.UserRequest)-> User:
-	db = next(get_db())
-
+def command_create_user(db: SessionDB, user: schemas.UserRequest)-> User:
 	validate_user = db.query(
 		User
 	).filter(or_(
@@ -64,10 +68,8 @@ def command_create_user(user: schemas.UserRequest)-> User:
 	return new_user
 
 @validate_call
-def command_get_user(user_id: int) -> User:
+def command_get_user(db: SessionDB, user_id: int) -> User:
 	
-	db = next(get_db())
-
 	user = db.get(User, user_id)
 
 	if user is None:
@@ -76,9 +78,7 @@ def command_get_user(user_id: int) -> User:
 	return user
 
 @validate_call
-def command_delete_user(user_id: int) -> None:
-	db = next(get_db())
-
+def command_delete_user(db: SessionDB, user_id: int) -> None:
 	user = db.get(User, user_id)
 
 	if user is None:
@@ -86,11 +86,11 @@ def command_delete_user(user_id: int) -> None:
 
 	db.delete(user)
 	db.commit()
+	# Los proyectos en cache muestran a su usuario
+	detail_cache.invalidate_tag(cache_key("user", user_id))
 
 @validate_call
-def command_update_email_user(user_id: int, infoUpdate: schemas.UserEmail) -> User:
-	db = next(get_db())
-
+def command_update_email_user(db: SessionDB, user_id: int, infoUpdate: schemas.UserEmail) -> User:
 	user = db.get(User, user_id)
 
 	if user is None:
@@ -112,13 +112,12 @@ def command_update_email_user(user_id: int, infoUpdate: schemas.UserEmail) -> Us
 
 	db.commit()
 	db.refresh(user)
+	detail_cache.invalidate_tag(cache_key("user", user_id))
 
 	return user
 
 @validate_call
-def command_update_password_user(user_id: int, infoUpdate: schemas.UserPassword) -> User:
-	db = next(get_db())
-
+def command_update_password_user(db: SessionDB, user_id: int, infoUpdate: schemas.UserPassword) -> User:
 	user = db.get(User, user_id)
 
 	if user is None:
@@ -134,9 +133,7 @@ def command_update_password_user(user_id: int, infoUpdate: schemas.UserPassword)
 
 
 @validate_call
-def command_update_username_user(user_id: int, infoUpdate: schemas.UserUsername) -> User:
-	db = next(get_db())
-
+def command_update_username_user(db: SessionDB, user_id: int, infoUpdate: schemas.UserUsername) -> User:
 	user = db.get(User, user_id)
 
 	if user is None:
@@ -158,14 +155,13 @@ def command_update_username_user(user_id: int, infoUpdate: schemas.UserUsername)
 
 	db.commit()
 	db.refresh(user)
+	detail_cache.invalidate_tag(cache_key("user", user_id))
 
 	return user
 
 
 @validate_call
-def command_login(infoLogin: schemas.UserLogin) -> Dict[str, str | int]:
-	db = next(get_db())
-
+def command_login(db: SessionDB, infoLogin: schemas.UserLogin) -> Dict[str, str | int]:
 	userResult = db.scalar(
 		select(User)
 		.where(User.email == infoLogin.email)
@@ -185,37 +181,79 @@ def command_login(infoLogin: schemas.UserLogin) -> Dict[str, str | int]:
 	if user is None:
 		raise TypeError(SerializerUser.get())
 	
-	token = TokenCreate.main(data = user)
-	refresh_token = TokenRefresh.main(data = user)
+	# Empieza una familia de refresh tokens
+	auth = issue_tokens(db, user_id = userResult.id)
+	db.commit()
+
+	# 'rehash': el hash no tiene el costo configurado, la ruta lo actualiza en segundo plano
+	return {"user": user, "auth": auth, "rehash": needs_rehash(passwordHashed)}
 
-	auth = {
-		"token": token,
-		"refresh": refresh_token
-	}
 
-	return {"user": user, "auth": auth}
+@validate_call
+def command_rehash_password(db: SessionDB, user_id: int, infoLogin: schemas.UserLogin) -> bool:
+	"""
+		Vuelve a generar el hash si su costo no es el configurado.
+		Se ejecuta después del login, fuera del tiempo de respuesta.
+	"""
+	user = db.get(User, user_id)
+
+	if user is None:
+		raise ValueError(DoesNotExistsUser.get(id = user_id), 404)
+
+	passwordHashed = user.password
+
+	if not needs_rehash(passwordHashed):
+		return False
+
+	# La contraseña pudo cambiar entre el login y esta tarea
+	if not ValidateHashedPassword.is_validate(infoLogin.password, passwordHashed):
+		return False
+
+	sql = (
+		update(User)
+		.where(User.id == user_id)
+		.where(User.password == passwordHashed)
+		.values(password = HashPassword.getHash(password = infoLogin.password))
+	)
+
+	result = db.execute(sql)
+	db.commit()
+
+	return result.rowcount == 1
 
 
 @validate_call
-def command_refresh_token(token: str)-> Dict[str, str | bool]:
+def command_refresh_token(db: SessionDB, token: str)-> Dict[str, str | bool]:
 	token_validation = verify_token(token)
 
 	if not token_validation.state:
-		return token_validation.model_dump()
+		return token_validation.model_dump(exclude = ["data"])
 
-	user = TokenDecode.main(token = token)
+	# 'verify_token' ya devuelve los claims, no se decodifica otra vez
+	try:
+		auth = rotate_refresh_token(db, claims = token_validation.data)
+	except ValueError as e:
+		message, _ = e.args
+		return {"message": message, "state": False}
 
-	if not user.state:
-		return user.model_dump()
+	db.commit()
 
-	token = TokenCreate.main(data = user.data)
-	refresh_token = TokenRefresh.main(data = user.data)
-	
-	tokens =  {
-		'auth': {
-			"token": token,
-			"refresh": refresh_token
-		}
-	}
-
-	return tokens
\ No newline at end of file
+	return {"auth": auth}
+
+
+@validate_call
+def command_logout(db: SessionDB, token: str) -> int:
+	"""
+		Revoca la familia del refresh token: deja de servir
+		él y todos los tokens emitidos desde el mismo login.
+	"""
+	token_validation = verify_token(token)
+	claims = token_validation.data or {}
+
+	if not token_validation.state or claims.get("typ") != RefreshTokenType:
+		raise ValueError(RefreshTokenInvalid.get(), 400)
+
+	revoked = revoke_family(db, family = claims["fam"])
+	db.commit()
+
+	return revoked
@@ -0,0 +1,57 @@
+import time
+import statistics
+from typing import Dict
+from typing import Iterable
+
+import bcrypt
+
+
+def benchmark_hash(rounds: Iterable[int] = range(8, 15), samples: int = 5, password: bytes = b"benchmark-password") -> Dict[int, Dict[str, float]]:
+	"""
+		Mide en este equipo el tiempo (ms) de 'bcrypt.hashpw' por cada costo.
+		'checkpw' cuesta lo mismo, así que también es el tiempo del login.
+	"""
+	result = {}
+
+	for cost in rounds:
+		salt = bcrypt.gensalt(cost)
+		times = []
+
+		for _ in range(samples):
+			start = time.perf_counter()
+			bcrypt.hashpw(password, salt)
+			times.append((time.perf_counter() - start) * 1000)
+
+		result[cost] = {
+			"median_ms": round(statistics.median(times), 2),
+			"max_ms": round(max(times), 2),
+		}
+
+	return result
+
+
+def choose_rounds(budget_ms: float, rounds: Iterable[int] = range(8, 15), samples: int = 5) -> int | None:
+	"""
+		Mayor costo cuyo peor tiempo medido cabe en 'budget_ms'.
+		Devuelve None si ni el menor costo lo cumple.
+	"""
+	chosen = None
+
+	for cost, times in benchmark_hash(rounds = rounds, samples = samples).items():
+		if times["max_ms"] > budget_ms:
+			break
+
+		chosen = cost
+
+	return chosen
+
+
+if __name__ == "__main__":
+	# python -m apps.users.commands.utils.benchmark [presupuesto_ms]
+	import sys
+
+	for cost, times in benchmark_hash().items():
+		print(f"PASSWORD_BCRYPT_ROUNDS={cost}: mediana {times['median_ms']} ms, máximo {times['max_ms']} ms")
+
+	if len(sys.argv) > 1:
+		print(f"Costo recomendado: {choose_rounds(budget_ms = float(sys.argv[1]))}")
@@ -1,5 +1,6 @@
 from pydantic import ConfigDict
-from pydantic import validate_call
+
+from apps.utils.validation.validation import validate_call
 
 
 class EmailORUsernameInvalid:
@@ -57,4 +58,22 @@ class InvalidCredentialsNoEmail:
 class SerializerUser:
 	@classmethod
 	def get(cls):
-		return f"Ha ocurrido un error interno al momento de serializar User"
\ No newline at end of file
+		return f"Ha ocurrido un error interno al momento de serializar User"
+
+
+class PasswordServiceBusy:
+	@classmethod
+	def get(cls) -> str:
+		return "El servicio de contraseñas está saturado, intente de nuevo en unos segundos"
+
+
+class RefreshTokenInvalid:
+	@classmethod
+	def get(cls) -> str:
+		return "El token enviado no es un refresh token valido"
+
+
+class RefreshTokenRevoked:
+	@classmethod
+	def get(cls) -> str:
+		return "El refresh token fue revocado, debe iniciar sesión otra vez"
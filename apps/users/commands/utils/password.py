@@ -1,18 +1,32 @@
+import asyncio
+import threading
 from abc import ABC
 from abc import abstractmethod
+from typing import Any
+from typing import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 
 from typing_extensions import Annotated
 
 import bcrypt
 
+from sqlalchemy.util.concurrency import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
 from pydantic import Field
 from pydantic import ConfigDict
-from pydantic import validate_call
 from pydantic import PlainSerializer
 from pydantic import BeforeValidator
 
 from pydantic.type_adapter import TypeAdapter
 
+from apps import PASSWORD_WORKERS
+from apps import PASSWORD_QUEUE_SIZE
+from apps import PASSWORD_BCRYPT_ROUNDS
+from apps.utils.validation.validation import validate_call
+from .error_messages import PasswordServiceBusy
+
 def is_byte(value: bytes) -> bytes:
 
 	if not isinstance(value, bytes):
@@ -43,6 +57,63 @@ TypeDecodePassword = Annotated[
 hashPassword = TypeAdapter(TypePassword)
 decodePassword = TypeAdapter(TypeDecodePassword)
 
+
+class PasswordExecutor:
+	"""
+		Límite para bcrypt (libera el GIL, por eso bastan hilos): hasta
+		'workers' hashes a la vez y 'queue_size' esperando. Con todo
+		ocupado rechaza de inmediato con un error 503 en lugar de encolar
+		sin límite.
+	"""
+
+	def __init__(self, workers: int, queue_size: int) -> None:
+		self.workers = workers
+		self.queue_size = queue_size
+		self.slots = threading.BoundedSemaphore(workers + queue_size)
+		self.running = threading.BoundedSemaphore(workers)
+		self.executor = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = "password")
+		self.rejected = 0
+
+	def acquire(self) -> None:
+		if not self.slots.acquire(blocking = False):
+			self.rejected += 1
+			raise ValueError(PasswordServiceBusy.get(), 503)
+
+	def call(self, function: Callable, *args: Any) -> Any:
+		try:
+			with self.running:
+				return function(*args)
+		finally:
+			self.slots.release()
+
+	def submit(self, function: Callable, *args: Any) -> Future:
+		self.acquire()
+
+		try:
+			return self.executor.submit(self.call, function, *args)
+		except BaseException:
+			self.slots.release()
+			raise
+
+	async def arun(self, function: Callable, *args: Any) -> Any:
+		return await asyncio.wrap_future(self.submit(function, *args))
+
+	def run(self, function: Callable, *args: Any) -> Any:
+		# Dentro de 'AsyncSession.run_sync' se espera sin bloquear el event loop
+		if in_greenlet():
+			return await_only(self.arun(function, *args))
+
+		# Ya en un hilo del threadpool: bcrypt corre aquí, sin ocupar otro del pool
+		self.acquire()
+
+		return self.call(function, *args)
+
+
+password_executor = PasswordExecutor(
+	workers = PASSWORD_WORKERS,
+	queue_size = PASSWORD_QUEUE_SIZE
+)
+
 class Hashed(ABC):
 	
 	@classmethod
@@ -58,20 +129,39 @@ class ValidateHash(ABC):
 		pass
 
 
+def get_cost(passwordHashed: bytes | str) -> int:
+	"""
+		Costo guardado en el hash de bcrypt: '$2b$<costo>$<salt+hash>'.
+	"""
+	if isinstance(passwordHashed, bytes):
+		passwordHashed = passwordHashed.decode('utf-8')
+
+	try:
+		return int(passwordHashed.split("$")[2])
+	except (IndexError, ValueError):
+		raise ValueError("El hash no tiene el formato de bcrypt")
+
+
+def needs_rehash(passwordHashed: bytes | str, rounds: int | None = None) -> bool:
+	rounds = PASSWORD_BCRYPT_ROUNDS if rounds is None else rounds
+
+	return get_cost(passwordHashed) != rounds
+
+
 class HashPassword(Hashed):
 	@validate_call(config = ConfigDict(hide_input_in_errors = True))
 	def getHash(password: str) -> bytes:
 		passwordBytes = hashPassword.dump_python(password)
 
 		try:
-			return bcrypt.hashpw(passwordBytes, bcrypt.gensalt(10))
+			return password_executor.run(bcrypt.hashpw, passwordBytes, bcrypt.gensalt(PASSWORD_BCRYPT_ROUNDS))
 		except TypeError as e:
 			raise ValueError("Error en el password, el tipo de dato ingresado no es valido")
-		
+
 
 class ValidateHashedPassword(ValidateHash):
 	@validate_call(config = ConfigDict(hide_input_in_errors = True))
 	def is_validate(passwordPlainText: str, passwordHashed: TypePasswordHashed) -> bool:
 		passwordBytes = hashPassword.dump_python(passwordPlainText)
 		
-		return bcrypt.checkpw(passwordBytes, passwordHashed)
+		return password_executor.run(bcrypt.checkpw, passwordBytes, passwordHashed)
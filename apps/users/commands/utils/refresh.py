@@ -0,0 +1,140 @@
+import uuid
+import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from apps import REFRESH_TOKEN_EXPIRE_HOURS
+from apps.users.models import User
+from apps.users.models import RefreshToken
+from apps.utils.token.token import TokenCreate
+from apps.utils.token.token import TokenRefresh
+from apps.utils.token.token import RefreshTokenType
+from apps.utils.token.token import compact_claims
+from apps.utils.token.token import token_version
+from apps.utils.token.token import revocation_list
+from .error_messages import RefreshTokenInvalid
+from .error_messages import RefreshTokenRevoked
+
+
+def issue_tokens(db: Session, user_id: int, family: str | None = None, parent: str | None = None) -> Dict[str, str]:
+	"""
+		Registra un refresh token nuevo (sin commit) y firma el par.
+		Sin 'family' empieza una familia nueva, como en el login.
+	"""
+	jti = uuid.uuid4().hex
+	family = family or jti
+
+	db.add(RefreshToken(
+		jti = jti,
+		family = family,
+		parent = parent,
+		user_id = user_id,
+		expires = datetime.datetime.utcnow() + datetime.timedelta(hours = REFRESH_TOKEN_EXPIRE_HOURS)
+	))
+
+	claims = compact_claims({"id": user_id})
+	claims.update({"fam": family})
+
+	return {
+		"token": TokenCreate.main(data = claims),
+		"refresh": TokenRefresh.main(data = {**claims, "jti": jti, "typ": RefreshTokenType})
+	}
+
+
+def revoke_family(db: Session, family: str) -> int:
+	result = db.execute(
+		update(RefreshToken)
+		.where(RefreshToken.family == family)
+		.values(revoked = True)
+	)
+
+	revocation_list.add(family)
+
+	return result.rowcount
+
+
+def rotate_refresh_token(db: Session, claims: Dict[str, Any]) -> Dict[str, str]:
+	"""
+		Marca como usado el refresh token y emite el siguiente de su
+		familia. Si ya estaba usado alguien lo reutilizó (robo o replay):
+		se revoca toda la familia, con sus tokens de acceso.
+	"""
+	jti = claims.get("jti")
+
+	if jti is None:
+		return migrate_refresh_token(db, claims = claims)
+
+	if claims.get("typ") != RefreshTokenType:
+		raise ValueError(RefreshTokenInvalid.get(), 401)
+
+	result = db.execute(
+		update(RefreshToken)
+		.where(
+			RefreshToken.jti == jti,
+			RefreshToken.used.is_(False),
+			RefreshToken.revoked.is_(False)
+		)
+		.values(used = True)
+	)
+
+	if result.rowcount != 1:
+		refresh = db.get(RefreshToken, jti)
+
+		if refresh is None:
+			raise ValueError(RefreshTokenInvalid.get(), 401)
+
+		if not refresh.revoked:
+			revoke_family(db, family = refresh.family)
+			# La revocación se guarda aunque la petición falle
+			db.commit()
+
+		raise ValueError(RefreshTokenRevoked.get(), 401)
+
+	return issue_tokens(db, user_id = int(claims["sub"]), family = claims["fam"], parent = jti)
+
+
+def migrate_refresh_token(db: Session, claims: Dict[str, Any]) -> Dict[str, str]:
+	"""
+		Tokens v1, de antes de las familias: no se distinguen de los de
+		acceso, así que se aceptan mientras TOKEN_MIN_VERSION lo permita
+		y empiezan una familia nueva.
+	"""
+	if token_version(claims) >= 2:
+		raise ValueError(RefreshTokenInvalid.get(), 401)
+
+	try:
+		user_id = int(compact_claims(claims)["sub"])
+	except ValueError:
+		raise ValueError(RefreshTokenInvalid.get(), 401)
+
+	if db.get(User, user_id) is None:
+		raise ValueError(RefreshTokenInvalid.get(), 401)
+
+	return issue_tokens(db, user_id = user_id)
+
+
+def revoked_families(db: Session) -> List[str]:
+	return db.scalars(
+		select(RefreshToken.family)
+		.where(
+			RefreshToken.revoked.is_(True),
+			RefreshToken.expires > datetime.datetime.utcnow()
+		)
+		.distinct()
+	).all()
+
+
+def is_revoked(db: Session, family: str) -> bool:
+	return db.scalar(
+		select(RefreshToken.jti)
+		.where(
+			RefreshToken.family == family,
+			RefreshToken.revoked.is_(True)
+		)
+		.limit(1)
+	) is not None
@@ -6,8 +6,8 @@ from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import ValidationError
 from pydantic import BeforeValidator
-from pydantic import validate_call
 
+from apps.utils.validation.validation import validate_call
 from apps.users.models import User
 from .password import decodePassword
 
@@ -1 +1,2 @@
-from apps.users.models.model import User
\ No newline at end of file
+from apps.users.models.model import User
+from apps.users.models.model import RefreshToken
@@ -1,5 +1,8 @@
 from typing import List
+from datetime import datetime
 
+from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy  import ForeignKey
 from sqlalchemy  import String
 from sqlalchemy.orm  import Mapped 
@@ -25,4 +28,33 @@ class User(Model):
 		return f"User(id={self.id}, name={self.name}, email={self.email}, username={self.username})"
 
 
+class RefreshToken(Model):
+	"""
+		Un refresh token emitido. Cada login inicia una familia ('family' es
+		el 'jti' del primero) y cada refresh la continua ('parent'). Usar otra
+		vez un token ya usado revoca toda la familia.
+	"""
+	__tablename__ = "refresh_token"
+	__table_args__ = (
+		Index("ix_refresh_token_family", "family"),
+		Index("ix_refresh_token_revoked_expires", "revoked", "expires"),
+	)
+
+	jti: Mapped[str] = mapped_column(String(32), primary_key = True)
+	family: Mapped[str] = mapped_column(String(32))
+	parent: Mapped[str | None] = mapped_column(String(32))
+	user_id: Mapped[int] = mapped_column(
+		ForeignKey(
+			'user.id',
+			ondelete = "CASCADE",
+			onupdate = "CASCADE"
+		),
+		index = True
+	)
+	created: Mapped[datetime] = mapped_column(insert_default = func.now())
+	expires: Mapped[datetime]
+	used: Mapped[bool] = mapped_column(insert_default = False)
+	revoked: Mapped[bool] = mapped_column(insert_default = False)
 
+	def __repr__(self):
+		return f"RefreshToken(jti={self.jti}, family={self.family}, parent={self.parent}, used={self.used}, revoked={self.revoked})"
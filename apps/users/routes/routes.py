@@ -1,13 +1,26 @@
 
+from typing import Callable
+from typing import AsyncContextManager
+
 from fastapi import status
 from fastapi import Depends
 from fastapi import Response
 from fastapi import APIRouter
+from fastapi import BackgroundTasks
 from fastapi.responses import JSONResponse
 
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps import get_db_opener
+from apps import run_command
+from apps import get_async_db
 from apps.users.schemas import schemas
 from apps.users.commands import commands
-from apps.utils.token.token import validate_authorization
+from apps.utils.token.token import Principal
+from apps.utils.token.token import get_principal
+from apps.utils.token.token import authorize_user
 
 
 router = APIRouter(prefix = "/user")
@@ -17,6 +30,7 @@ STATUS_CODE_ERRORS = {
 	401: status.HTTP_401_UNAUTHORIZED,
 	404: status.HTTP_404_NOT_FOUND,
 	409: status.HTTP_409_CONFLICT,
+	503: status.HTTP_503_SERVICE_UNAVAILABLE,
 }
 
 @router.post(
@@ -24,9 +38,9 @@ STATUS_CODE_ERRORS = {
 	response_model = schemas.UserResponse,
 	status_code=status.HTTP_201_CREATED
 ) 
-def create_user(user: schemas.UserRequest) -> schemas.UserResponse:
+async def create_user(user: schemas.UserRequest, db: AsyncSession | Session = Depends(get_async_db)) -> schemas.UserResponse:
 	try:
-		new_user = commands.command_create_user(user = user)
+		new_user = await run_command(db, commands.command_create_user, user = user)
 	except ValueError as e:
 		message, status_code = e.args
 
@@ -41,10 +55,10 @@ def create_user(user: schemas.UserRequest) -> schemas.UserResponse:
 	response_model = schemas.UserResponse, 
 	status_code = status.HTTP_200_OK
 )
-def get_user(id: int, token: str = Depends(validate_authorization)) -> schemas.UserResponse:
+async def get_user(id: int, principal: Principal = Depends(get_principal), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.UserResponse:
 
 	try:
-		user = commands.command_get_user(user_id = id)
+		user = await run_command(db, commands.command_get_user, user_id = id)
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -57,10 +71,10 @@ def get_user(id: int, token: str = Depends(validate_authorization)) -> schemas.U
 
 
 @router.delete("/{id}")
-def delete_user(id: int, token: str = Depends(validate_authorization)) -> Response:
+async def delete_user(id: int, principal: Principal = Depends(authorize_user), db: AsyncSession | Session = Depends(get_async_db)) -> Response:
 	
 	try:
-		commands.command_delete_user(user_id = id)
+		await run_command(db, commands.command_delete_user, user_id = id)
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -81,10 +95,10 @@ def delete_user(id: int, token: str = Depends(validate_authorization)) -> Respon
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.UserEmailResponse
 )
-def update_email(id: int, user: schemas.UserEmail, token: str = Depends(validate_authorization)) -> schemas.UserEmailResponse:
+async def update_email(id: int, user: schemas.UserEmail, principal: Principal = Depends(authorize_user), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.UserEmailResponse:
 
 	try:
-		user = commands.command_update_email_user(user_id = id, infoUpdate = user) 
+		user = await run_command(db, commands.command_update_email_user, user_id = id, infoUpdate = user) 
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -100,10 +114,10 @@ def update_email(id: int, user: schemas.UserEmail, token: str = Depends(validate
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.UserEmailResponse
 )
-def update_password(id: int, user: schemas.UserPassword, token: str = Depends(validate_authorization)) -> schemas.UserEmailResponse:
+async def update_password(id: int, user: schemas.UserPassword, principal: Principal = Depends(authorize_user), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.UserEmailResponse:
 
 	try:
-		user = commands.command_update_password_user(user_id = id, infoUpdate = user)
+		user = await run_command(db, commands.command_update_password_user, user_id = id, infoUpdate = user)
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -120,9 +134,9 @@ def update_password(id: int, user: schemas.UserPassword, token: str = Depends(va
 	response_model = schemas.UserUsernameResponse
 )
 
-def update_username(id: int, user: schemas.UserUsername,token: str = Depends(validate_authorization)) -> schemas.UserUsernameResponse:
+async def update_username(id: int, user: schemas.UserUsername, principal: Principal = Depends(authorize_user), db: AsyncSession | Session = Depends(get_async_db)) -> schemas.UserUsernameResponse:
 	try:
-		user = commands.command_update_username_user(user_id = id, infoUpdate = user)
+		user = await run_command(db, commands.command_update_username_user, user_id = id, infoUpdate = user)
 	except ValueError as e:
 		message, status_code = e.args
 		
@@ -133,13 +147,28 @@ def update_username(id: int, user: schemas.UserUsername,token: str = Depends(val
 
 	return user
 
+async def rehash_password(open_db: Callable[[], AsyncContextManager[AsyncSession | Session]], user_id: int, infoLogin: schemas.UserLogin) -> None:
+	# Corre después de enviar la respuesta: la sesión de la petición ya se cerró
+	try:
+		async with open_db() as db:
+			await run_command(
+				db, 
+				commands.command_rehash_password, 
+				user_id = user_id, 
+				infoLogin = infoLogin
+			)
+	except (ValueError, SQLAlchemyError):
+		# Pool de contraseñas lleno, usuario eliminado o error de la DB: se intenta en el próximo login
+		pass
+
+
 @router.post("/login",
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.UserLoginResponse
 )
-def login(user: schemas.UserLogin) -> schemas.UserLoginResponse:
+async def login(user: schemas.UserLogin, background_tasks: BackgroundTasks, db: AsyncSession | Session = Depends(get_async_db), open_db: Callable = Depends(get_db_opener)) -> schemas.UserLoginResponse:
 	try:
-		result = commands.command_login(infoLogin = user)
+		result = await run_command(db, commands.command_login, infoLogin = user)
 	except ValueError as e:
 		message, status_code = e.args
 
@@ -148,6 +177,14 @@ def login(user: schemas.UserLogin) -> schemas.UserLoginResponse:
 			status_code = STATUS_CODE_ERRORS[status_code]
 		)
 
+	if result["rehash"]:
+		background_tasks.add_task(
+			rehash_password, 
+			open_db = open_db,
+			user_id = result["user"]["id"], 
+			infoLogin = user
+		)
+
 	return result
 
 
@@ -155,9 +192,9 @@ def login(user: schemas.UserLogin) -> schemas.UserLoginResponse:
 	status_code = status.HTTP_200_OK,
 	response_model = schemas.TokensResponse
 )
-def refresh_token(token: schemas.TokenRefresh) -> schemas.TokensResponse:
+async def refresh_token(token: schemas.TokenRefresh, db: AsyncSession | Session = Depends(get_async_db)) -> schemas.TokensResponse:
 
-	result = commands.command_refresh_token(token = token.token)
+	result = await run_command(db, commands.command_refresh_token, token = token.token)
 
 	if not result.get("auth", False):
 
@@ -167,3 +204,18 @@ def refresh_token(token: schemas.TokenRefresh) -> schemas.TokensResponse:
 		)
 
 	return result
+
+
+@router.post("/logout",
+	status_code = status.HTTP_204_NO_CONTENT
+)
+async def logout(token: schemas.TokenRefresh, db: AsyncSession | Session = Depends(get_async_db)) -> Response:
+	try:
+		await run_command(db, commands.command_logout, token = token.token)
+	except ValueError as e:
+		message, status_code = e.args
+
+		return JSONResponse(
+			content = {"message": message},
+			status_code = STATUS_CODE_ERRORS[status_code]
+		)
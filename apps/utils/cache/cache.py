@@ -0,0 +1,204 @@
+import time
+import threading
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from apps import DETAIL_CACHE_TTL
+from apps import DETAIL_CACHE_SIZE
+
+
+class CacheBackend(ABC):
+	"""
+		Lo mínimo que necesita 'DetailCache'. 'get' devuelve None si la
+		clave no está o ya venció. Las etiquetas ('tags') agrupan claves
+		para invalidarlas juntas, ej: los tickets que muestran un proyecto.
+	"""
+
+	@abstractmethod
+	def get(self, key: str) -> Optional[Any]:
+		pass
+
+	@abstractmethod
+	def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+		pass
+
+	@abstractmethod
+	def delete(self, *keys: str) -> None:
+		pass
+
+	@abstractmethod
+	def delete_tag(self, tag: str) -> None:
+		pass
+
+	@abstractmethod
+	def clear(self) -> None:
+		pass
+
+	def snapshot(self) -> Dict[str, Any]:
+		return {}
+
+
+class MemoryCache(CacheBackend):
+	"""
+		LRU por worker en el que cada entrada vence 'ttl' segundos después
+		de guardarse. Con 'max_size' 0 no guarda nada.
+	"""
+
+	def __init__(self, max_size: int, ttl: float) -> None:
+		self.max_size = max_size
+		self.ttl = ttl
+		self.entries = OrderedDict()
+		self.tags: Dict[str, set] = {}
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+
+	def _remove(self, key: str) -> None:
+		_, _, tags = self.entries.pop(key)
+
+		for tag in tags:
+			keys = self.tags.get(tag)
+
+			if keys is not None:
+				keys.discard(key)
+
+				if not keys:
+					del self.tags[tag]
+
+	def get(self, key: str) -> Optional[Any]:
+		with self.lock:
+			cached = self.entries.get(key)
+
+			if cached is None or cached[0] <= time.monotonic():
+				if cached is not None:
+					self._remove(key)
+					self.expirations += 1
+
+				self.misses += 1
+				return None
+
+			self.entries.move_to_end(key)
+			self.hits += 1
+
+			return cached[1]
+
+	def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+		if self.max_size <= 0 or self.ttl <= 0:
+			return
+
+		tags = tuple(tags)
+
+		with self.lock:
+			if key in self.entries:
+				self._remove(key)
+
+			self.entries[key] = (time.monotonic() + self.ttl, value, tags)
+
+			for tag in tags:
+				self.tags.setdefault(tag, set()).add(key)
+
+			while len(self.entries) > self.max_size:
+				self._remove(next(iter(self.entries)))
+				self.evictions += 1
+
+	def delete(self, *keys: str) -> None:
+		with self.lock:
+			for key in keys:
+				if key in self.entries:
+					self._remove(key)
+
+	def delete_tag(self, tag: str) -> None:
+		with self.lock:
+			for key in list(self.tags.get(tag, ())):
+				self._remove(key)
+
+	def clear(self) -> None:
+		with self.lock:
+			self.entries.clear()
+			self.tags.clear()
+
+	def snapshot(self) -> Dict[str, Any]:
+		lookups = self.hits + self.misses
+
+		return {
+			"size": len(self.entries),
+			"max_size": self.max_size,
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+			"evictions": self.evictions,
+			"expirations": self.expirations,
+		}
+
+
+def detached_copy(instance: Any) -> Any:
+	"""
+		Copia del objeto y de las relaciones que ya tiene cargadas (ej: el
+		'joinedload') fuera de toda sesión: ni el commit ni el cierre de la
+		sesión que lo consultó expiran lo que queda en el cache.
+	"""
+	with Session() as scratch:
+		return scratch.merge(instance, load = False)
+
+
+class DetailCache:
+	"""
+		Cache de lectura ('read-through') de objetos del ORM. Se guarda una
+		copia desconectada de la sesión, con sus relaciones ya cargadas, y
+		cada acierto recibe otra copia unida a su propia sesión con
+		'merge(load = False)', sin consultas. Los 'commands' que modifican
+		los datos invalidan sus claves o etiquetas después del commit.
+
+		El backend es intercambiable ('use'); uno compartido entre workers
+		(ej: Redis) tiene que serializar los objetos con pickle.
+	"""
+
+	def __init__(self, backend: CacheBackend) -> None:
+		self.backend = backend
+
+	def use(self, backend: CacheBackend) -> None:
+		self.backend = backend
+
+	def load(self, db: Session, key: str, loader: Callable[[], Any], tags: Optional[Callable[[Any], Iterable[str]]] = None) -> Any:
+		instance = self.backend.get(key)
+
+		if instance is None:
+			# Si no existe, 'loader' lanza el error y no se guarda nada
+			instance = loader()
+			entry_tags = tags(instance) if tags is not None else ()
+			self.backend.set(key, detached_copy(instance), entry_tags)
+
+			return instance
+
+		return db.merge(instance, load = False)
+
+	def invalidate(self, *keys: str) -> None:
+		if keys:
+			self.backend.delete(*keys)
+
+	def invalidate_tag(self, *tags: str) -> None:
+		for tag in tags:
+			self.backend.delete_tag(tag)
+
+	def clear(self) -> None:
+		self.backend.clear()
+
+	def snapshot(self) -> Dict[str, Any]:
+		return self.backend.snapshot()
+
+
+def cache_key(name: str, id: int) -> str:
+	return f"{name}:{id}"
+
+
+detail_cache = DetailCache(backend = MemoryCache(max_size = DETAIL_CACHE_SIZE, ttl = DETAIL_CACHE_TTL))
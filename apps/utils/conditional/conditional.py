@@ -0,0 +1,187 @@
+import json
+import hashlib
+import datetime
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from fastapi import status
+from fastapi import Request
+from fastapi import Response
+
+from sqlalchemy import inspect
+
+
+# Sin 'no-cache' un navegador podría reusar la respuesta sin preguntar;
+# con él siempre revalida y recibe un 304 si no cambió
+CacheControl = "private, no-cache"
+
+ConditionalMethods = ("GET", "HEAD")
+
+
+def make_etag(*parts: Any) -> str:
+	"""
+		ETag débil a partir de valores que se pueden pasar a JSON
+		(fechas y Enums con 'str'): mismo contenido, mismo ETag.
+	"""
+	data = json.dumps(parts, sort_keys = True, default = str, separators = (",", ":"))
+	digest = hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+	return f'W/"{digest}"'
+
+
+def row_values(instance: Any, exclude: tuple = ()) -> Dict[str, Any]:
+	"""
+		Columnas ya cargadas del objeto del ORM, para el ETag de un
+		detalle: cualquier cambio lo invalida, aunque 'updated' quede
+		igual por caer en el mismo segundo.
+	"""
+	state = inspect(instance)
+
+	return {
+		column.key: state.dict.get(column.key)
+		for column in state.mapper.column_attrs
+		if column.key not in exclude
+	}
+
+
+def http_date(value: datetime.datetime) -> str:
+	# 'updated' se guarda sin zona, en UTC ('func.now()')
+	if value.tzinfo is None:
+		value = value.replace(tzinfo = datetime.timezone.utc)
+
+	return format_datetime(value.astimezone(datetime.timezone.utc), usegmt = True)
+
+
+def latest(*values: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+	values = [value for value in values if value is not None]
+
+	return max(values) if values else None
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime.datetime]:
+	if value is None:
+		return None
+
+	try:
+		return parsedate_to_datetime(value)
+	except (TypeError, ValueError):
+		return None
+
+
+def matches_etag(header: str, etag: str) -> bool:
+	if header.strip() == "*":
+		return True
+
+	# Comparación débil (RFC 9110): se ignora el prefijo 'W/'
+	opaque = etag.removeprefix("W/")
+
+	return any(value.strip().removeprefix("W/") == opaque for value in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime.datetime] = None) -> bool:
+	if request.method not in ConditionalMethods:
+		return False
+
+	header = request.headers.get("if-none-match")
+
+	if header is not None:
+		# Con If-None-Match se ignora If-Modified-Since (RFC 9110, 13.2.2)
+		return matches_etag(header, etag)
+
+	since = parse_http_date(request.headers.get("if-modified-since"))
+
+	if since is None or last_modified is None:
+		return False
+
+	if last_modified.tzinfo is None:
+		last_modified = last_modified.replace(tzinfo = datetime.timezone.utc)
+
+	# Las fechas HTTP no tienen fracciones de segundo
+	return last_modified.replace(microsecond = 0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime.datetime] = None) -> Dict[str, str]:
+	headers = {"ETag": etag, "Cache-Control": CacheControl}
+
+	if last_modified is not None:
+		headers["Last-Modified"] = http_date(last_modified)
+
+	return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime.datetime] = None) -> Response:
+	return Response(status_code = status.HTTP_304_NOT_MODIFIED, headers = validator_headers(etag, last_modified))
+
+
+def conditional_response(request: Request, response: Response, etag: str, last_modified: Optional[datetime.datetime] = None) -> Optional[Response]:
+	"""
+		Agrega los validadores a 'response' y devuelve un 304 si el cliente
+		ya tiene esta versión. La ruta lo llama antes de consultar o
+		serializar el contenido:
+
+			if (cached := conditional_response(request, response, etag)) is not None:
+				return cached
+	"""
+	if is_not_modified(request, etag, last_modified):
+		return not_modified(etag, last_modified)
+
+	response.headers.update(validator_headers(etag, last_modified))
+
+	return None
+
+
+class ConditionalMiddleware:
+	"""
+		Para las rutas que ponen un ETag o Last-Modified sin revisar la
+		petición: si coincide con If-None-Match / If-Modified-Since, el 200
+		se cambia por un 304 sin cuerpo. Ahorra el envío, no la consulta;
+		las rutas que pueden, usan 'conditional_response' antes.
+	"""
+
+	def __init__(self, app: Any) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+		if scope["type"] != "http" or scope["method"] not in ConditionalMethods:
+			await self.app(scope, receive, send)
+			return
+
+		request = Request(scope)
+
+		if "if-none-match" not in request.headers and "if-modified-since" not in request.headers:
+			await self.app(scope, receive, send)
+			return
+
+		skip_body = False
+
+		async def send_conditional(message: Dict[str, Any]) -> None:
+			nonlocal skip_body
+
+			if message["type"] == "http.response.start" and message["status"] == status.HTTP_200_OK:
+				headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in message.get("headers", [])}
+				etag = headers.get("etag")
+				last_modified = headers.get("last-modified")
+
+				if etag is not None and is_not_modified(request, etag, parse_http_date(last_modified)):
+					skip_body = True
+					kept = [
+						(key, value) for key, value in message.get("headers", [])
+						if key.lower() in (b"etag", b"last-modified", b"cache-control", b"vary")
+					]
+
+					await send({"type": "http.response.start", "status": status.HTTP_304_NOT_MODIFIED, "headers": kept})
+					return
+
+			if skip_body and message["type"] == "http.response.body":
+				if not message.get("more_body", False):
+					await send({"type": "http.response.body", "body": b""})
+
+				return
+
+			await send(message)
+
+		await self.app(scope, receive, send_conditional)
+
@@ -0,0 +1,14 @@
+# python -m apps.utils.database
+# Crea los índices de los modelos que falten en una base de datos existente
+from importlib import import_module
+
+from apps import Model
+from apps import engine
+from apps.utils.database.database import create_missing_indexes
+
+# Registra las tablas en 'Model.metadata'
+for module in ("apps.users.models", "apps.tickets.models", "apps.projects.models"):
+	import_module(module)
+
+for name in create_missing_indexes(engine, Model.metadata):
+	print(f"Índice creado: {name}")
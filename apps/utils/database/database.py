@@ -0,0 +1,200 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy import Index
+from sqlalchemy import inspect
+from sqlalchemy import Engine
+from sqlalchemy import MetaData
+from sqlalchemy import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def env_bool(value: str | None, default: bool = False) -> bool:
+	if value is None:
+		return default
+
+	return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def expunge(db: Session | AsyncSession, instances: Iterable[Any]) -> None:
+	"""
+		Saca los objetos de la sesión: el commit ya no los expira y
+		se pueden devolver sin volver a leerlos uno por uno. No usa
+		'expunge_all', que invalidaría el identity map de un cursor
+		todavía abierto.
+	"""
+	for instance in instances:
+		db.expunge(instance)
+
+
+def engine_options(url: str, pool_size: int, max_overflow: int, pool_recycle: int, pool_pre_ping: bool, pool_timeout: int, statement_timeout: int | None = None, insertmanyvalues_page_size: int | None = None) -> Dict[str, Any]:
+	"""
+		Construye los argumentos de 'create_engine' para la URL indicada.
+		SQLite con archivo usa un QueuePool como los demás motores; en
+		memoria usa SingletonThreadPool (o StaticPool con aiosqlite), que
+		no acepta los ajustes del pool y solo recibe 'pool_pre_ping'.
+	"""
+	url = make_url(url)
+	backend = url.get_backend_name()
+	memory = backend == "sqlite" and (url.database in (None, "", ":memory:") or url.query.get("mode") == "memory")
+
+	options = {
+		"pool_pre_ping": pool_pre_ping,
+	}
+
+	if insertmanyvalues_page_size:
+		options.update({"insertmanyvalues_page_size": insertmanyvalues_page_size})
+
+	if memory:
+		return options
+
+	options.update({
+		"pool_size": pool_size,
+		"max_overflow": max_overflow,
+		"pool_recycle": pool_recycle,
+		"pool_timeout": pool_timeout,
+	})
+
+	if statement_timeout and backend == "postgresql":
+		connect_args = {"options": f"-c statement_timeout={statement_timeout}"}
+
+		if url.get_driver_name() == "asyncpg":
+			connect_args = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+
+		options.update({"connect_args": connect_args})
+
+	return options
+
+
+class PoolMetrics:
+	"""
+		Contadores del pool de conexiones alimentados por los eventos 
+		'connect', 'checkout', 'checkin' e 'invalidate' de SQLAlchemy.
+	"""
+
+	def __init__(self) -> None:
+		self.connects = 0
+		self.checkouts = 0
+		self.checkins = 0
+		self.invalidations = 0
+		self.max_checked_out = 0
+		self.overflow_checkouts = 0
+		self.engines = []
+
+	def register(self, engine: Engine) -> Engine:
+		pool = engine.pool
+
+		@event.listens_for(pool, "connect")
+		def on_connect(dbapi_connection, connection_record):
+			self.connects += 1
+
+		@event.listens_for(pool, "checkout")
+		def on_checkout(dbapi_connection, connection_record, connection_proxy):
+			self.checkouts += 1
+
+			checked_out = self._call(pool, "checkedout")
+			self.max_checked_out = max(self.max_checked_out, checked_out)
+
+			if self._call(pool, "overflow") > 0:
+				self.overflow_checkouts += 1
+
+		@event.listens_for(pool, "checkin")
+		def on_checkin(dbapi_connection, connection_record):
+			self.checkins += 1
+
+		@event.listens_for(pool, "invalidate")
+		def on_invalidate(dbapi_connection, connection_record, exception):
+			self.invalidations += 1
+
+		self.engines.append(engine)
+
+		return engine
+
+	@staticmethod
+	def _call(pool: Any, name: str) -> int:
+		method = getattr(pool, name, None)
+		
+		return method() if callable(method) else 0
+
+	def snapshot(self) -> Dict[str, int]:
+		pools = [engine.pool for engine in self.engines]
+
+		return {
+			"connects": self.connects,
+			"checkouts": self.checkouts,
+			"checkins": self.checkins,
+			"invalidations": self.invalidations,
+			"max_checked_out": self.max_checked_out,
+			"overflow_checkouts": self.overflow_checkouts,
+			"checked_out": sum(self._call(pool, "checkedout") for pool in pools),
+			"overflow": sum(self._call(pool, "overflow") for pool in pools),
+			"pool_size": sum(self._call(pool, "size") for pool in pools),
+		}
+
+
+def create_index(engine: Engine, index: Index) -> bool:
+	"""
+		Crea el índice con 'IF NOT EXISTS'. En PostgreSQL usa CONCURRENTLY
+		(fuera de una transacción) para no bloquear las escrituras de una
+		tabla con datos. Devuelve False si el CREATE falló porque otro
+		proceso ya lo había creado (bases sin 'IF NOT EXISTS').
+	"""
+	backend = engine.dialect.name
+
+	try:
+		if backend == "postgresql":
+			options = index.dialect_options["postgresql"]
+			concurrently = options["concurrently"]
+			options["concurrently"] = True
+
+			try:
+				with engine.connect().execution_options(isolation_level = "AUTOCOMMIT") as connection:
+					connection.execute(CreateIndex(index, if_not_exists = True))
+			finally:
+				options["concurrently"] = concurrently
+		else:
+			with engine.begin() as connection:
+				connection.execute(CreateIndex(index, if_not_exists = backend == "sqlite"))
+	except (OperationalError, ProgrammingError) as error:
+		message = str(error.orig).lower()
+
+		if "already exists" not in message and "duplicate" not in message:
+			raise
+
+		return False
+
+	return True
+
+
+def create_missing_indexes(engine: Engine, metadata: MetaData) -> List[str]:
+	"""
+		'create_all' solo crea los índices de las tablas nuevas. Esto agrega
+		los índices declarados en los modelos que falten en una base de datos
+		existente (sin Alembic) y devuelve sus nombres.
+
+		Es un comando aparte, no se ejecuta al importar la aplicación:
+
+			python -m apps.utils.database
+	"""
+	missing = []
+
+	with engine.connect() as connection:
+		inspector = inspect(connection)
+
+		for table in metadata.sorted_tables:
+			if not inspector.has_table(table.name):
+				continue
+
+			existing = {index["name"] for index in inspector.get_indexes(table.name)}
+			missing.extend(index for index in table.indexes if index.name not in existing)
+
+	# Otro worker o despliegue pudo crear alguno entre la revisión y el CREATE
+	return [index.name for index in missing if create_index(engine, index)]
+
@@ -1,19 +1,31 @@
 import math
+import json
+import base64
+
+from urllib.parse import quote
 
 from typing import Any
 from typing import List
 from typing import Dict
+from typing import Tuple
 from typing import Optional
 from typing_extensions import Annotated
 
 from pydantic import Field
 from pydantic import BaseModel
-from pydantic import validate_call
 from pydantic import ConfigDict
 from pydantic import PlainSerializer
 
 from fastapi import Request
 
+from sqlalchemy import func
+from sqlalchemy import Select
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import InstrumentedAttribute
+
+from apps.utils.validation.validation import validate_call
+
 
 ListElements = Optional[List[Any]]
 
@@ -23,16 +35,21 @@ PageSizeDefault = 10
 PageSizeUpperLimit = 20
 PageSizeLowerLimit = 1
 
+CursorNext = "n"
+CursorPrevious = "p"
+
 
 class ListPagination(BaseModel):
 	page: int = Field(ge = PageLowerLimit, default = PageDefault)
 	pageSize: int = Field(ge = PageSizeLowerLimit, le = PageSizeUpperLimit, default = PageSizeDefault) #10
+	cursor: Optional[str] = None
 
 
 class ResponsePagination(BaseModel):
 	previous: str | None
 	next: str | None
 	current: int
+	cursor: str | None = None
 
 
 # Sirve para validar el parametro request en 'set_url_pagination'
@@ -47,18 +64,66 @@ def add_params_to_url(params: Optional[Dict[str, int | str]] = None) -> Dict[str
 
 	if params:
 		for var, value in params.items():
-			url += f"&{var}={value}"
+			url += f"&{var}={quote(str(value), safe = '')}"
 	
 	return {
 		"url": url
 	}
 
+def encode_cursor(key: int, direction: str = CursorNext) -> str:
+	value = json.dumps({"k": key, "d": direction}, separators = (",", ":"))
+
+	return base64.urlsafe_b64encode(value.encode("utf-8")).decode("utf-8").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+	try:
+		padding = "=" * (-len(cursor) % 4)
+		value = json.loads(base64.urlsafe_b64decode(cursor + padding))
+
+		key, direction = value["k"], value["d"]
+	except (ValueError, TypeError, KeyError):
+		raise ValueError("El cursor de la paginación no es valido", 400)
+
+	if not isinstance(key, int) or direction not in (CursorNext, CursorPrevious):
+		raise ValueError("El cursor de la paginación no es valido", 400)
+
+	return key, direction
+
+
+def get_element_key(element: Any) -> int | None:
+	return getattr(element, "id", None)
+
+
 @validate_call(config = ConfigDict(hide_input_in_errors=True))
-def set_url_pagination(request: RequestContext, elements: ListElements, total_elements: int, page: int, pageSize: int, params: Optional[Dict[str, int | str]] = None) -> Dict[str, str]:
+def set_url_pagination(request: RequestContext, elements: ListElements, total_elements: int | None, page: int, pageSize: int, params: Optional[Dict[str, int | str]] = None, cursor: Optional[str] = None) -> Dict[str, str]:
+	if isinstance(request, dict):
+		# Sin 'VALIDATE_CALL' llega el dict de 'get_url_from_request'
+		request = RequestContext.model_construct(**request)
+
 	url_params = add_params_to_url(params = params)
 
 	url_base = f"{request.base_url}{request.path}"
 
+	last_key = get_element_key(elements[-1]) if elements else None
+	first_key = get_element_key(elements[0]) if elements else None
+
+	if cursor is not None:
+		_, direction = decode_cursor(cursor)
+		is_full = elements is not None and len(elements) == pageSize
+
+		has_next = direction == CursorPrevious or is_full
+		has_previous = direction == CursorNext or is_full
+
+		url_next = f"{url_base}?cursor={encode_cursor(last_key, CursorNext)}&pageSize={pageSize}{url_params['url']}"
+		url_previous = f"{url_base}?cursor={encode_cursor(first_key, CursorPrevious)}&pageSize={pageSize}{url_params['url']}"
+
+		return {
+			"previous": url_previous if has_previous and first_key is not None else None,
+			"next": url_next if has_next and last_key is not None else None,
+			"cursor": encode_cursor(last_key, CursorNext) if has_next and last_key is not None else None
+		}
+
 	url_next = f"{url_base}?page={page + 1}&pageSize={pageSize}{url_params['url']}"
 	url_previous = f"{url_base}?page={page - 1}&pageSize={pageSize}{url_params['url']}"
 
@@ -69,7 +134,8 @@ def set_url_pagination(request: RequestContext, elements: ListElements, total_el
 
 	return {
 		"previous": has_previous,
-		"next": has_next
+		"next": has_next,
+		"cursor": encode_cursor(last_key) if has_next and last_key is not None else None
 	}
 
 
@@ -92,4 +158,67 @@ def calculate_start_pagination(page: int = PageDefault, pageSize:int = PageSizeD
 	
 	start = (page - 1) * pageSize
 
-	return start
\ No newline at end of file
+	return start
+
+
+def count_elements(db: Session, sql: Select) -> int:
+	sql_count = select(func.count()).select_from(
+		sql.order_by(None).subquery()
+	)
+
+	return db.scalar(sql_count)
+
+
+def paginate(db: Session, sql: Select, page: int = PageDefault, pageSize: int = PageSizeDefault, count_over: bool = True, total: Optional[int] = None) -> Tuple[List[Any], int]:
+	"""
+		Devuelve los elementos de la página y el total de la consulta.
+
+		Con 'count_over' el total se obtiene en la misma sentencia con
+		'count(*) OVER ()'. Si la página está vacía (o 'count_over' es False)
+		se usa el conteo por separado. Si ya se conoce el 'total' (ej: de
+		un contador) solo se consulta la página.
+	"""
+	start = calculate_start_pagination(page = page, pageSize = pageSize)
+
+	if total is not None:
+		return db.scalars(sql.offset(start).limit(pageSize)).all(), total
+
+	if not count_over:
+		elements = db.scalars(sql.offset(start).limit(pageSize)).all()
+
+		return elements, count_elements(db = db, sql = sql)
+
+	sql_page = (
+		sql.add_columns(func.count().over().label("total"))
+		.offset(start)
+		.limit(pageSize)
+	)
+
+	rows = db.execute(sql_page).all()
+
+	if not rows:
+		total = count_elements(db = db, sql = sql) if start > 0 else 0
+
+		return [], total
+
+	return [row[0] for row in rows], rows[0].total
+
+
+def paginate_keyset(db: Session, sql: Select, key: InstrumentedAttribute, cursor: str, pageSize: int = PageSizeDefault) -> List[Any]:
+	"""
+		Paginación por cursor: filtra por la última clave vista en lugar de
+		usar OFFSET, así el costo de cada página no depende de su profundidad.
+	"""
+	value, direction = decode_cursor(cursor)
+
+	if direction == CursorNext:
+		sql_page = sql.where(key > value).order_by(None).order_by(key.asc())
+	else:
+		sql_page = sql.where(key < value).order_by(None).order_by(key.desc())
+
+	elements = db.scalars(sql_page.limit(pageSize)).all()
+
+	if direction == CursorPrevious:
+		elements = list(reversed(elements))
+
+	return elements
@@ -0,0 +1,77 @@
+import logging
+from functools import lru_cache
+from typing import Any
+from typing import Mapping
+from typing import Optional
+
+from fastapi import status
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+
+from pydantic import TypeAdapter
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_response() -> type[JSONResponse]:
+	"""
+		Respuesta por defecto de la app: con orjson (en requirements.txt)
+		los errores y las rutas sin 'ModelResponse' se codifican sin el
+		módulo 'json'. Si no está instalado se avisa y se usa 'JSONResponse'.
+	"""
+	if orjson is None:
+		logger.warning("orjson no está instalado: se usa JSONResponse (pip install -r requirements.txt)")
+
+		return JSONResponse
+
+	return ORJSONResponse
+
+
+DefaultResponse = default_response()
+
+
+@lru_cache(maxsize = None)
+def type_adapter(model: Any) -> TypeAdapter:
+	# Construir el validador/serializador de un schema es lo caro: uno por schema
+	return TypeAdapter(model)
+
+
+def dump_json(model: Any, content: Any) -> bytes:
+	"""
+		Valida 'content' (dicts, objetos del ORM o filas) contra 'model'
+		y lo pasa a JSON en un solo paso de pydantic-core, igual que el
+		'response_model' de FastAPI pero sin 'jsonable_encoder' ni 'json'.
+	"""
+	adapter = type_adapter(model)
+
+	return adapter.dump_json(adapter.validate_python(content, from_attributes = True))
+
+
+class ModelResponse(Response):
+	"""
+		Respuesta ya serializada con el schema de la ruta. FastAPI no
+		vuelve a validar una 'Response', así que el 'response_model' de la
+		ruta queda solo para la documentación:
+
+			return ModelResponse(schemas.TicketsByProjectResponse, content, headers = response.headers)
+
+		'headers' recibe el 'Response' inyectado en la ruta para no perder
+		los que ya se agregaron (ej: ETag).
+	"""
+
+	media_type = "application/json"
+
+	def __init__(self, model: Any, content: Any, status_code: int = status.HTTP_200_OK, headers: Optional[Mapping[str, str]] = None) -> None:
+		self.model = model
+
+		super().__init__(content = content, status_code = status_code, headers = headers)
+
+	def render(self, content: Any) -> bytes:
+		return dump_json(self.model, content)
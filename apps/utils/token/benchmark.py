@@ -0,0 +1,76 @@
+import time
+import timeit
+import tempfile
+from typing import Dict
+from typing import Iterable
+
+from apps.utils.token.keys import KeyRing
+from apps.utils.token.keys import generate_key
+from apps.utils.token.keys import is_asymmetric
+from apps.utils.token.token import TOKEN_VERSION
+from apps.utils.token.token import encode_jwt
+from apps.utils.token.token import decode_jwt
+
+
+def claims() -> Dict[str, int | str]:
+	now = int(time.time())
+
+	return {"sub": "1", "ver": TOKEN_VERSION, "iat": now, "exp": now + 3600}
+
+
+def benchmark_algorithm(algorithm: str, number: int, verify_per_sign: int) -> Dict[str, float]:
+	import jwt
+
+	secret = "benchmark-secret-key-with-32-bytes!"
+	data = claims()
+
+	with tempfile.TemporaryDirectory() as path:
+		if is_asymmetric(algorithm):
+			generate_key(path, "bench", algorithm)
+			ring = KeyRing(path = path, algorithm = algorithm)
+
+			sign = lambda: encode_jwt(data, ring = ring)
+			verify = lambda token: decode_jwt(token, ring = ring)
+		else:
+			sign = lambda: jwt.encode(data, secret, algorithm = algorithm)
+			verify = lambda token: jwt.decode(token, secret, algorithms = [algorithm])
+
+		token = sign()
+
+		sign_us = timeit.timeit(sign, number = number) / number * 1e6
+		verify_us = timeit.timeit(lambda: verify(token), number = number) / number * 1e6
+
+	# Un login firma 2 tokens (token y refresh); cada petición autenticada verifica 1
+	mix_us = (2 * sign_us + verify_per_sign * verify_us) / (1 + verify_per_sign)
+
+	return {
+		"sign_us": round(sign_us, 2),
+		"verify_us": round(verify_us, 2),
+		"mix_us": round(mix_us, 2),
+		"token_bytes": len(token),
+	}
+
+
+def benchmark_tokens(number: int = 2000, algorithms: Iterable[str] = ("HS256", "ES256", "EdDSA"), verify_per_sign: int = 50) -> Dict[str, Dict[str, float]]:
+	"""
+		Microsegundos por firma y por verificación de cada algoritmo con
+		los claims v2. 'mix_us' es el costo medio por petición cuando hay
+		un login cada 'verify_per_sign' peticiones autenticadas (sin contar
+		los aciertos de 'token_cache'). Los algoritmos asimétricos se omiten
+		si no está instalado 'cryptography'.
+	"""
+	result = {}
+
+	for algorithm in algorithms:
+		try:
+			result[algorithm] = benchmark_algorithm(algorithm, number, verify_per_sign)
+		except ImportError:
+			continue
+
+	return result
+
+
+if __name__ == "__main__":
+	# python -m apps.utils.token.benchmark
+	for algorithm, times in benchmark_tokens().items():
+		print(f"{algorithm}: {times}")
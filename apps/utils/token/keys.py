@@ -0,0 +1,208 @@
+import os
+import time
+import threading
+from typing import Any
+from typing import Dict
+from typing import Tuple
+from typing import Optional
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+
+# Requieren 'cryptography', declarado con "PyJWT[crypto]" en requirements.txt
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+PrivateSuffix = ".pem"
+PublicSuffix = ".pub"
+# 'kid' desconocidos recordados, para no releer el directorio por cada uno
+UnknownKidsMax = 1024
+
+
+def is_asymmetric(algorithm: str) -> bool:
+	return algorithm in ASYMMETRIC_ALGORITHMS
+
+
+class KeyRing:
+	"""
+		Llaves de un directorio, ya preparadas para PyJWT y en memoria.
+		Cada llave se identifica por su 'kid' (nombre del archivo):
+
+			<kid>.pub	llave pública, para verificar
+			<kid>.pem	llave privada, para firmar
+
+		Un worker que solo verifica no necesita ningún '.pem'. Firma la
+		llave privada más reciente (por fecha de modificación), así que
+		para rotar basta con agregar un '<kid>.pem' y su '<kid>.pub' al
+		directorio; la llave vieja se borra cuando expiren sus tokens.
+		El directorio se vuelve a leer si cambió, como mucho cada
+		'refresh_seconds', o ante un 'kid' desconocido: en ese caso
+		también como mucho una vez por intervalo, y el 'kid' se recuerda
+		como desconocido hasta el siguiente, así un token con 'kid'
+		inventados no obliga a releer las llaves en cada petición.
+	"""
+
+	def __init__(self, path: str, algorithm: str, refresh_seconds: float = 60) -> None:
+		if not is_asymmetric(algorithm):
+			raise ValueError(f"Algoritmo no asimétrico: {algorithm}")
+
+		self.path = path
+		self.algorithm = algorithm
+		self.refresh_seconds = refresh_seconds
+		self.lock = threading.Lock()
+
+		self.public_keys: Dict[str, Any] = {}
+		self.signing: Optional[Tuple[str, Any]] = None
+		self.fingerprint = None
+		self.checked = 0.0
+		self.forced = None
+		self.unknown: Dict[str, float] = {}
+		self.loads = 0
+
+		self.load()
+
+	def files(self) -> Tuple[Tuple[str, float], ...]:
+		return tuple(sorted(
+			(entry.name, entry.stat().st_mtime)
+			for entry in os.scandir(self.path)
+			if entry.is_file() and entry.name.endswith((PrivateSuffix, PublicSuffix))
+		))
+
+	def prepare(self, filename: str) -> Any:
+		with open(os.path.join(self.path, filename), "rb") as file:
+			return get_default_algorithms()[self.algorithm].prepare_key(file.read())
+
+	def load(self) -> None:
+		files = self.files()
+		public_keys = {}
+		private_keys = []
+
+		for name, mtime in files:
+			if name.endswith(PublicSuffix):
+				public_keys[name[:-len(PublicSuffix)]] = self.prepare(name)
+			else:
+				private_keys.append((mtime, name[:-len(PrivateSuffix)], name))
+
+		signing = None
+
+		if private_keys:
+			_, kid, name = max(private_keys)
+			key = self.prepare(name)
+			signing = (kid, key)
+			# El worker que firma también verifica sus propios tokens
+			public_keys.setdefault(kid, key.public_key())
+
+		with self.lock:
+			self.public_keys = public_keys
+			self.signing = signing
+			self.fingerprint = files
+			self.checked = time.monotonic()
+			self.unknown = {}
+			self.loads += 1
+
+	def refresh(self, force: bool = False) -> None:
+		if not force and time.monotonic() - self.checked < self.refresh_seconds:
+			return
+
+		files = self.files()
+
+		if files != self.fingerprint:
+			self.load()
+		else:
+			self.checked = time.monotonic()
+
+	def signing_key(self) -> Tuple[str, Any]:
+		self.refresh()
+
+		if self.signing is None:
+			raise ValueError(f"No hay llave privada en '{self.path}' para firmar tokens")
+
+		return self.signing
+
+	def reload_for(self, kid: str) -> Optional[Any]:
+		"""
+			Vuelve a leer el directorio por un 'kid' desconocido (puede
+			ser una llave recién rotada), como mucho una vez por intervalo.
+		"""
+		now = time.monotonic()
+
+		with self.lock:
+			if self.unknown.get(kid, 0.0) > now:
+				return None
+
+			force = self.forced is None or now - self.forced >= self.refresh_seconds
+
+			if force:
+				self.forced = now
+
+		if force:
+			self.refresh(force = True)
+
+		key = self.public_keys.get(kid)
+
+		if key is None:
+			with self.lock:
+				if len(self.unknown) >= UnknownKidsMax:
+					self.unknown.clear()
+
+				self.unknown[kid] = now + self.refresh_seconds
+
+		return key
+
+	def verification_key(self, kid: Optional[str]) -> Any:
+		self.refresh()
+
+		key = self.public_keys.get(kid)
+
+		if key is None and kid is not None:
+			key = self.reload_for(kid)
+
+		if key is None:
+			raise jwt.InvalidSignatureError(f"Llave desconocida: {kid}")
+
+		return key
+
+
+def generate_key(path: str, kid: str, algorithm: str) -> None:
+	"""
+		Crea '<kid>.pem' y '<kid>.pub' en 'path'. Solo el '.pub'
+		se copia a los workers que únicamente verifican.
+	"""
+	from cryptography.hazmat.primitives import serialization
+	from cryptography.hazmat.primitives.asymmetric import ec
+	from cryptography.hazmat.primitives.asymmetric import ed25519
+
+	if algorithm == "ES256":
+		private_key = ec.generate_private_key(ec.SECP256R1())
+	elif algorithm == "EdDSA":
+		private_key = ed25519.Ed25519PrivateKey.generate()
+	else:
+		raise ValueError(f"Algoritmo no asimétrico: {algorithm}")
+
+	private_pem = private_key.private_bytes(
+		encoding = serialization.Encoding.PEM,
+		format = serialization.PrivateFormat.PKCS8,
+		encryption_algorithm = serialization.NoEncryption()
+	)
+	public_pem = private_key.public_key().public_bytes(
+		encoding = serialization.Encoding.PEM,
+		format = serialization.PublicFormat.SubjectPublicKeyInfo
+	)
+
+	with open(os.path.join(path, f"{kid}{PublicSuffix}"), "wb") as file:
+		file.write(public_pem)
+
+	# La llave privada solo la puede leer el dueño
+	private_path = os.path.join(path, f"{kid}{PrivateSuffix}")
+	descriptor = os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+	with os.fdopen(descriptor, "wb") as file:
+		os.chmod(private_path, 0o600)
+		file.write(private_pem)
+
+
+if __name__ == "__main__":
+	# python -m apps.utils.token.keys <directorio> <kid> [ES256|EdDSA]
+	import sys
+
+	generate_key(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "EdDSA")
@@ -0,0 +1,141 @@
+import math
+import time
+import hashlib
+import threading
+from typing import Dict
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class BloomFilter:
+	"""
+		Conjunto aproximado: 'in' nunca da falsos negativos y da falsos
+		positivos con una probabilidad cercana a 'error_rate' mientras no
+		se agreguen más de 'capacity' valores.
+	"""
+
+	def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+		capacity = max(capacity, 1)
+
+		self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+		self.hashes = max(1, round(self.size / capacity * math.log(2)))
+		self.bits = bytearray((self.size + 7) // 8)
+		self.count = 0
+
+	def positions(self, value: str) -> Iterable[int]:
+		digest = hashlib.blake2b(value.encode("utf-8"), digest_size = 16).digest()
+		first = int.from_bytes(digest[:8], "little")
+		second = int.from_bytes(digest[8:], "little") | 1
+
+		return ((first + i * second) % self.size for i in range(self.hashes))
+
+	def add(self, value: str) -> None:
+		for position in self.positions(value):
+			self.bits[position >> 3] |= 1 << (position & 7)
+
+		self.count += 1
+
+	def __contains__(self, value: str) -> bool:
+		return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+def load_revoked_families() -> Iterable[str]:
+	from apps import session
+	from apps.users.commands.utils.refresh import revoked_families
+
+	with session() as db:
+		return revoked_families(db)
+
+
+def is_family_revoked(family: str) -> bool:
+	from apps import session
+	from apps.users.commands.utils.refresh import is_revoked
+
+	with session() as db:
+		return is_revoked(db, family)
+
+
+class RevocationList:
+	"""
+		Familias de refresh tokens revocadas, en un filtro de Bloom por
+		worker. Casi todas las peticiones traen una familia que no está
+		revocada y se resuelven en memoria; solo un posible positivo se
+		confirma en la base de datos. El filtro se reconstruye desde la
+		base de datos cada 'refresh_seconds' para ver lo que revocaron
+		otros workers.
+	"""
+
+	def __init__(
+		self,
+		capacity: int,
+		error_rate: float = 0.01,
+		refresh_seconds: float = 30,
+		loader: Callable[[], Iterable[str]] = load_revoked_families,
+		confirm: Callable[[str], bool] = is_family_revoked
+	) -> None:
+		self.capacity = capacity
+		self.error_rate = error_rate
+		self.refresh_seconds = refresh_seconds
+		self.loader = loader
+		self.confirm = confirm
+		self.lock = threading.Lock()
+
+		self.bloom = BloomFilter(capacity, error_rate)
+		# Revocadas en este worker desde la última recarga
+		self.recent = set()
+		self.loaded = None
+		self.checks = 0
+		self.db_checks = 0
+
+	def reload(self) -> None:
+		try:
+			families = list(self.loader())
+		except SQLAlchemyError:
+			# Se conserva el filtro actual y se reintenta en el próximo intervalo
+			self.loaded = time.monotonic()
+			return
+
+		bloom = BloomFilter(max(self.capacity, len(families)), self.error_rate)
+
+		for family in families:
+			bloom.add(family)
+
+		with self.lock:
+			# Pueden no estar en la consulta si se revocaron mientras corría
+			for family in self.recent:
+				bloom.add(family)
+
+			self.recent.clear()
+			self.bloom = bloom
+			self.loaded = time.monotonic()
+
+	def add(self, family: str) -> None:
+		with self.lock:
+			self.bloom.add(family)
+			self.recent.add(family)
+
+	def is_revoked(self, family: Optional[str]) -> bool:
+		if family is None:
+			return False
+
+		if self.loaded is None or time.monotonic() - self.loaded >= self.refresh_seconds:
+			self.reload()
+
+		self.checks += 1
+
+		if family not in self.bloom:
+			return False
+
+		self.db_checks += 1
+
+		return self.confirm(family)
+
+	def snapshot(self) -> Dict[str, int]:
+		return {
+			"revoked": self.bloom.count,
+			"checks": self.checks,
+			"db_checks": self.db_checks,
+		}
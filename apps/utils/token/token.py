@@ -1,8 +1,11 @@
+import time
+import hashlib
 import datetime
+import threading
 from typing import Any
 from typing import Dict
 from typing import Optional
-
+from collections import OrderedDict
 
 from typing_extensions import Annotated
 
@@ -10,20 +13,31 @@ import jwt
 
 from fastapi import status
 from fastapi import Header
+from fastapi import Depends
 from fastapi import HTTPException
 
 from pydantic import BaseModel
-from pydantic import validate_call
 from pydantic import ConfigDict
 from pydantic import ValidationError
 from pydantic import AfterValidator
 
+from apps.utils.validation.validation import validate_call
 from apps import (
 	SECRET_KEY,
 	ALGORITHM_JWT,
 	ACCESS_TOKEN_EXPIRE_HOURS,
-	REFRESH_TOKEN_EXPIRE_HOURS
+	REFRESH_TOKEN_EXPIRE_HOURS,
+	TOKEN_CACHE_SIZE,
+	TOKEN_MIN_VERSION,
+	JWT_KEYS_DIR,
+	JWT_KEYS_REFRESH,
+	REVOCATION_CAPACITY,
+	REVOCATION_ERROR_RATE,
+	REVOCATION_REFRESH
 )
+from apps.utils.token.keys import KeyRing
+from apps.utils.token.keys import is_asymmetric
+from apps.utils.token.revocation import RevocationList
 from apps.utils.token.exceptions import (
 	TokenExpiredError,
 	TokenInvalidError,
@@ -32,6 +46,68 @@ from apps.utils.token.exceptions import (
 ) 
 
 
+# v1: el diccionario de 'user_serializer' (id, name, email, username, password)
+# v2: solo 'sub' (id del usuario) y 'ver', además de 'exp' e 'iat'
+TOKEN_VERSION = 2
+# Valor del claim 'typ' de los refresh tokens
+RefreshTokenType = "refresh"
+
+
+def token_version(claims: Dict[str, Any]) -> int:
+	return claims.get("ver", 1)
+
+
+def token_subject(claims: Dict[str, Any]) -> Any:
+	if token_version(claims) >= 2:
+		return claims.get("sub")
+
+	return claims.get("id")
+
+
+def compact_claims(data: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+		Claims v2 a partir de los datos de un usuario o de los
+		claims de otro token (v1 o v2), por ejemplo al refrescarlo.
+	"""
+	subject = token_subject(data)
+
+	if subject is None or token_version(data) < TOKEN_MIN_VERSION:
+		raise ValueError("Token no valido")
+
+	# PyJWT exige que 'sub' sea un str
+	return {"sub": str(subject), "ver": TOKEN_VERSION}
+
+
+# Se carga una vez por worker; None con HS256 (SECRET_KEY)
+key_ring = KeyRing(
+	path = JWT_KEYS_DIR, 
+	algorithm = ALGORITHM_JWT, 
+	refresh_seconds = JWT_KEYS_REFRESH
+) if is_asymmetric(ALGORITHM_JWT) else None
+
+
+def encode_jwt(data: Dict[str, Any], ring: Optional[KeyRing] = None) -> str:
+	ring = ring or key_ring
+
+	if ring is None:
+		return jwt.encode(data, SECRET_KEY, algorithm = ALGORITHM_JWT)
+
+	kid, key = ring.signing_key()
+
+	return jwt.encode(data, key, algorithm = ring.algorithm, headers = {"kid": kid})
+
+
+def decode_jwt(token: str, ring: Optional[KeyRing] = None) -> Dict[str, Any]:
+	ring = ring or key_ring
+
+	if ring is None:
+		return jwt.decode(token, SECRET_KEY, algorithms = [ALGORITHM_JWT])
+
+	kid = jwt.get_unverified_header(token).get("kid")
+
+	return jwt.decode(token, ring.verification_key(kid), algorithms = [ring.algorithm])
+
+
 class DecodeTokenResult(BaseModel):
 	data: Optional[Dict[str, Any]] = {}
 	message: Optional[str] = "OK"
@@ -41,6 +117,113 @@ class DecodeTokenResult(BaseModel):
 class VerifyTokenResult(BaseModel):
 	message: str = "OK"
 	state: bool = True
+	data: Optional[Dict[str, Any]] = None
+
+
+class Principal(BaseModel):
+	"""
+		Identidad de un token ya verificado. Las rutas la reciben
+		en lugar del token, así no lo vuelven a decodificar.
+	"""
+	model_config = ConfigDict(frozen = True)
+
+	id: int
+	# Solo en tokens v1
+	username: Optional[str] = None
+	exp: int
+	# Familia del refresh token con el que se emitió (ver RefreshToken)
+	family: Optional[str] = None
+
+	@classmethod
+	def from_claims(cls, claims: Dict[str, Any]) -> "Principal":
+		if token_version(claims) < TOKEN_MIN_VERSION:
+			raise ValueError(f"Versión de token no aceptada: {token_version(claims)}")
+
+		if claims.get("typ") == RefreshTokenType:
+			raise ValueError("Un refresh token no sirve para autenticar")
+
+		return cls(
+			id = token_subject(claims), 
+			username = claims.get("username"), 
+			exp = claims.get("exp"),
+			family = claims.get("fam")
+		)
+
+
+class TokenCache:
+	"""
+		LRU de tokens ya verificados. La clave es el sha256 del token (no se
+		guarda el token) y cada entrada vence con el 'exp' del propio token.
+	"""
+
+	def __init__(self, max_size: int) -> None:
+		self.max_size = max_size
+		self.tokens = OrderedDict()
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	@staticmethod
+	def digest(token: str) -> bytes:
+		return hashlib.sha256(token.encode("utf-8")).digest()
+
+	def get(self, token: str) -> Optional[Dict[str, Any] | Principal]:
+		key = self.digest(token)
+
+		with self.lock:
+			cached = self.tokens.get(key)
+
+			if cached is None or cached[0] <= time.time():
+				if cached is not None:
+					del self.tokens[key]
+
+				self.misses += 1
+				return None
+
+			self.tokens.move_to_end(key)
+			self.hits += 1
+
+			return cached[1]
+
+	def set(self, token: str, data: Dict[str, Any] | Principal) -> None:
+		exp = data.get("exp") if isinstance(data, dict) else getattr(data, "exp", None)
+
+		# Sin 'exp' no se sabe hasta cuándo es valido
+		if self.max_size <= 0 or not isinstance(exp, (int, float)) or exp <= time.time():
+			return
+
+		key = self.digest(token)
+
+		with self.lock:
+			self.tokens[key] = (exp, data)
+			self.tokens.move_to_end(key)
+
+			while len(self.tokens) > self.max_size:
+				self.tokens.popitem(last = False)
+				self.evictions += 1
+
+	def clear(self) -> None:
+		with self.lock:
+			self.tokens.clear()
+
+	def snapshot(self) -> Dict[str, int]:
+		return {
+			"size": len(self.tokens),
+			"max_size": self.max_size,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+		}
+
+
+token_cache = TokenCache(max_size = TOKEN_CACHE_SIZE)
+
+revocation_list = RevocationList(
+	capacity = REVOCATION_CAPACITY,
+	error_rate = REVOCATION_ERROR_RATE,
+	refresh_seconds = REVOCATION_REFRESH
+)
 
 
 def is_empty(value: Dict[str, Any]) ->  Dict[str, Any]:
@@ -53,10 +236,10 @@ isEmpty = Annotated[Dict[str, Any], AfterValidator(is_empty)]
 
 
 @validate_call(config = ConfigDict(hide_input_in_errors=True))
-def validate_token(token: str) -> None:
+def validate_token(token: str) -> Dict[str, Any]:
 
 	try:
-		jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM_JWT])
+		return decode_jwt(token)
 	except jwt.ExpiredSignatureError:
 		raise TokenExpiredError()
 
@@ -66,6 +249,10 @@ def validate_token(token: str) -> None:
 	except jwt.ImmatureSignatureError:
 		raise TokenImmatureError()
 
+	except jwt.InvalidAlgorithmError:
+		# Token firmado con otro algoritmo (ej: HS256 con llaves asimétricas)
+		raise TokenInvalidError()
+
 	except jwt.DecodeError:
 		raise TokenDecodeError()
 
@@ -76,8 +263,8 @@ def verify_token(token: str = "") -> VerifyTokenResult:
 	message = ""
 	
 	try:
-		validate_token(token)
-		return VerifyTokenResult(state = True, message = "OK")
+		data = validate_token(token)
+		return VerifyTokenResult(state = True, message = "OK", data = data)
 	except TokenExpiredError as e:
 		message = e
 	except TokenInvalidError as e:
@@ -94,7 +281,7 @@ def verify_token(token: str = "") -> VerifyTokenResult:
 def create_token(infoDict: isEmpty) -> str:
 
 	if not infoDict:
-		raise ValidationError("")
+		raise ValueError("No se creará un token a partir de un diccionario vacío")
 	
 	data = infoDict.copy()
 
@@ -104,7 +291,7 @@ def create_token(infoDict: isEmpty) -> str:
 		#  identifica el momento en el que se emitió el JWT.
 	})
 
-	token = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM_JWT)
+	token = encode_jwt(data)
 
 	return token
 
@@ -118,7 +305,7 @@ def create_refresh_token(infoDict: isEmpty) -> str:
 		"iat": datetime.datetime.utcnow()
 	})
 
-	token = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM_JWT)
+	token = encode_jwt(data)
 
 	return token
 
@@ -129,7 +316,7 @@ def decode_token(token: str) -> DecodeTokenResult:
 	message = "" 
 	
 	try:
-		data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM_JWT])
+		data = decode_jwt(token)
 		return DecodeTokenResult(data = data)
 	
 	except jwt.ExpiredSignatureError:
@@ -154,7 +341,12 @@ def extract_token_from_str(auth: str) -> str:
 	return auth.replace(find, "").strip(" ")
 
 
-def validate_authorization(authorization: Annotated[str | None, Header()] = None) -> str:
+def get_principal(authorization: Annotated[str | None, Header()] = None) -> Principal:
+	"""
+		Verifica el token una sola vez y devuelve su 'Principal'.
+		Mientras no expire, el mismo token sale de 'token_cache'.
+		La revocación se consulta en memoria ('revocation_list').
+	"""
 	if authorization is None:
 		raise HTTPException(
 				status_code = status.HTTP_401_UNAUTHORIZED, 
@@ -162,17 +354,51 @@ def validate_authorization(authorization: Annotated[str | None, Header()] = None
 				headers={"WWW-Authenticate": "Bearer"},
 			)
 	token = extract_token_from_str(auth = authorization)
+
+	principal = token_cache.get(token)
 	
-	result = verify_token(token = token)
+	if principal is None:
+		result = verify_token(token = token)
 
-	if not result.state:
+		if result.state:
+			try:
+				principal = Principal.from_claims(result.data)
+			except ValueError:
+				# Firma valida, pero sin 'sub'/'id', sin 'exp', de una versión vieja o refresh
+				principal = None
+
+		if principal is not None:
+			token_cache.set(token, principal)
+
+	# También con la caché: la familia se pudo revocar después
+	if principal is None or revocation_list.is_revoked(principal.family):
 		raise HTTPException(
 				status_code = status.HTTP_401_UNAUTHORIZED, 
 				detail = "Token no valido",
 				headers={"WWW-Authenticate": "Bearer"},
 			)
 
-	return token
+	return principal
+
+
+def authorize_user(id: int, principal: Principal = Depends(get_principal)) -> Principal:
+	"""
+		Para las rutas '/{id}' de un usuario: solo el dueño
+		del token puede operar sobre su propia cuenta.
+	"""
+	if principal.id != id:
+		raise HTTPException(
+				status_code = status.HTTP_403_FORBIDDEN, 
+				detail = "No tiene permisos sobre este usuario",
+			)
+
+	return principal
+
+
+def validate_authorization(authorization: Annotated[str | None, Header()] = None) -> str:
+	get_principal(authorization = authorization)
+
+	return extract_token_from_str(auth = authorization)
 
 
 class TokenDecode:
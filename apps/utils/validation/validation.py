@@ -0,0 +1,26 @@
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from pydantic import ConfigDict
+from pydantic import validate_call as pydantic_validate_call
+
+from apps import VALIDATE_CALL
+
+
+def validate_call(func: Optional[Callable] = None, /, *, config: Optional[ConfigDict] = None, validate_return: bool = False) -> Any:
+	"""
+		Igual que 'pydantic.validate_call', pero con 'VALIDATE_CALL' desactivado
+		devuelve la función sin envolver. Es para los limites internos cuyos
+		argumentos ya validó FastAPI (commands, paginación, tokens).
+	"""
+	def decorator(function: Callable) -> Callable:
+		if not VALIDATE_CALL:
+			return function
+
+		return pydantic_validate_call(function, config = config, validate_return = validate_return)
+
+	if func is not None:
+		return decorator(func)
+
+	return decorator
@@ -15,12 +15,19 @@ from pydantic import ValidationError
 
 from apps import Model
 from apps import engine
+from apps import pool_metrics
+from apps.tickets.commands.utils.search import create_search_index
+from apps.tickets.commands.utils.counters import create_missing_counters
+from apps.utils.conditional.conditional import ConditionalMiddleware
+from apps.utils.responses.responses import DefaultResponse
+from apps.utils.cache.cache import detail_cache
 
 from apps.users.routes import router as router_users
 from apps.tickets.routes import router as router_ticket
 from apps.projects.routes import router as router_project
 
-app = FastAPI()
+app = FastAPI(default_response_class = DefaultResponse)
+app.add_middleware(ConditionalMiddleware)
 
 @app.exception_handler(RequestValidationError)
 def validation_error_exception_handler(request: Request, exc: RequestValidationError):
@@ -41,6 +48,13 @@ def validation_error_exception_handler(request: Request, exc: RequestValidationE
 	)
 
 Model.metadata.create_all(engine)
+create_search_index(engine)
+create_missing_counters(engine)
+
+@app.get("/metrics")
+def metrics():
+	# Contadores de este worker: cada proceso de uvicorn tiene los suyos
+	return {"pool": pool_metrics.snapshot(), "detail_cache": detail_cache.snapshot()}
 
 app.include_router(router_users)
 app.include_router(router_ticket)
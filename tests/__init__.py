@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import importlib
 
 from sqlalchemy.pool import StaticPool
@@ -20,9 +21,26 @@ ENGINE = create_engine(
 SESSION = Session(ENGINE)
 
 def get_db():
+	db = Session(ENGINE)
 	try:
-		yield SESSION
+		yield db
 	finally:
-		SESSION.close()
+		db.close()
+
+def verify_token_as(user_id = 1, username = "bolivar19"):
+	"""
+		'side_effect' para los 'patch' de 'verify_token': el token
+		de prueba ("token-key") pasa a ser el del usuario 'user_id'
+	"""
+	from apps.utils.token.token import VerifyTokenResult
+
+	def verify(token = ""):
+		return VerifyTokenResult(data = {
+			"id": user_id,
+			"username": username,
+			"exp": int(time.time()) + 3600
+		})
+
+	return verify
 
 # command: pytest -import-mode=importlib -v {file_or_directory}
\ No newline at end of file
@@ -1,11 +1,11 @@
 import pytest
-from unittest.mock import patch
+
+from sqlalchemy import event
 
 from pydantic import ValidationError
 
 from tests import ENGINE
 from tests import SESSION
-from tests import get_db
 from tests.projects import set_project
 from tests.projects import set_project_schema
 
@@ -14,11 +14,14 @@ from apps.users.models import User
 from apps.projects.models import Project
 from apps.projects.schemas import schemas
 from apps.projects.commands import commands
+from apps.utils.cache.cache import detail_cache
 
 
 class TestCommandsProject:
 
 	def setup_method(self):
+		detail_cache.clear()
+
 		Model.metadata.drop_all(ENGINE)
 		Model.metadata.create_all(ENGINE)
 
@@ -51,7 +54,6 @@ class TestCommandsProject:
 		self.db.close()
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_new_project(self):
 		""" Validar que se crea un nuevo proyecto """
 		
@@ -59,7 +61,7 @@ class TestCommandsProject:
 			user_id = self.user.id
 		)
 
-		project = commands.command_create_project(project = schema_project)
+		project = commands.command_create_project(db = self.db, project = schema_project)
 
 		assert project.id == 2
 		assert project.title == schema_project.title
@@ -68,7 +70,6 @@ class TestCommandsProject:
 		assert project.user_id == schema_project.user_id
 
 	@pytest.mark.xfail(reason = "No existe este usuario", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_no_existent_user(self):
 		""" 
 			Intenar que no se cree un proyecto con un usuario
@@ -78,11 +79,10 @@ class TestCommandsProject:
 			user_id = 100
 		)
 
-		project = commands.command_create_project(project = schema_project)
+		project = commands.command_create_project(db = self.db, project = schema_project)
 
 
 	@pytest.mark.xfail(reason = "Parametro 'priority' incorrecto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_wrong_priority(self):
 		"""
 			Intentar que no se cree un proyecto con una prioridad
@@ -92,7 +92,7 @@ class TestCommandsProject:
 			user_id = self.user.id
 		)
 
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "Proyecto A",
 			"description": "descripción del proyecto A",
 			"priority": "ahora",
@@ -100,7 +100,6 @@ class TestCommandsProject:
 		})
 
 	@pytest.mark.xfail(reason = "Logitud de 'description' muy larga", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_too_long_description(self):
 		"""
 			Intentar que no se cree un proyecto con una descripción
@@ -136,7 +135,7 @@ class TestCommandsProject:
 			aliquam unde animi quod debitis voluptates recusandae ut minima, 
 			eos dicta molestiae accusamus?
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "Proyecto A",
 			"description": descripcion,
 			"user_id": 1,
@@ -144,13 +143,12 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Logitud de 'description' muy corto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_very_short_description(self):
 		"""
 			Intentar que no se cree un proyecto con una descripción
 			muy corta
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "Proyecto A",
 			"description": "info",
 			"user_id": 1,
@@ -158,7 +156,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Logitud de 'title' muy largo", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_too_long_title(self):
 		"""
 			Intentar que no se cree un proyecto con un titulo
@@ -171,7 +168,7 @@ class TestCommandsProject:
 		eos dicta molestiae accusamus?
 		"""
 
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": title,
 			"description": "descripción del proyecto",
 			"user_id": 1,
@@ -180,13 +177,12 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Logitud de 'title' muy corto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_with_very_short_title(self):
 		"""
 			Intentar que no se cree un proyecto con un titulo
 			muy corto
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "app",
 			"description": "descripción del proyecto",
 			"user_id": 1,
@@ -194,49 +190,45 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Sin parametro 'description' ", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_without_description(self):
 		"""
 			Intentar que no se cree un proyecto sin una descripción
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "Proyecto A",
 			"user_id": 1,
 		})
 
 
 	@pytest.mark.xfail(reason = "Sin parametro 'title' ", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_without_title(self):
 		"""
 			Intentar que no se cree un proyecto sin un titulo
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"description": "descripción del proyecto",
 			"user_id": 1,
 		})
 
 
 	@pytest.mark.xfail(reason = "Sin parametro 'user_id' ", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_create_project_without_user_id(self):
 		"""
 			Intentar que no se cree un proyecto sin un usuario
 		"""
-		project = commands.command_create_project(project = {
+		project = commands.command_create_project(db = self.db, project = {
 			"title": "Proyecto A",
 			"description": "descripción del proyecto",
 		})
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_id(self):
 		""" 
 			Obtener un proyecto por us ID
 		"""
 		project_id = 1
 
-		project = commands.command_get_project(project_id = project_id)
+		project = commands.command_get_project(db = self.db, project_id = project_id)
 
 		assert project.id == self.project.id
 		assert project.title == self.project.title
@@ -247,31 +239,83 @@ class TestCommandsProject:
 		assert project.user_id == self.project.user_id
 
 
+	def test_get_project_from_cache(self):
+		"""
+			Validar que la segunda lectura sale del cache
+			y que actualizar el proyecto la invalida
+		"""
+		commands.command_get_project(db = self.db, project_id = self.project.id)
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			project = commands.command_get_project(db = self.db, project_id = self.project.id)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert project.title == self.project.title
+		assert project.user.username == self.user.username
+		assert queries == []
+
+		infoUpdate = schemas.ProjectUpdate(user_id = self.user.id, title = "Proyecto B")
+		commands.command_update_project(db = self.db, project_id = self.project.id, infoUpdate = infoUpdate)
+
+		project = commands.command_get_project(db = self.db, project_id = self.project.id)
+
+		assert project.title == "Proyecto B"
+
+
 	@pytest.mark.xfail(reason = "No existe el proyecto ", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_no_existent_project(self):
 		"""
 			Intentar obtener un proyecto por una ID que no existe
 		"""
 		project_id = 100
 
-		project = commands.command_get_project(project_id = project_id)
+		project = commands.command_get_project(db = self.db, project_id = project_id)
 
 		assert project.id == self.project.id
 
 
 	@pytest.mark.xfail(reason = "Sin parametro", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_without_params(self):
 		"""
 			Intentar obtener un proyecto por una ID que no existe
 		"""
-		project = commands.command_get_project()
+		project = commands.command_get_project(db = self.db)
 
 		assert project.id == self.project.id
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
+	def test_update_project_without_refresh(self):
+		"""
+			Validar que el proyecto actualizado se puede serializar
+			sin volver a consultar la base de datos
+		"""
+		infoUpdate = schemas.ProjectUpdate(user_id = self.user.id, title = "Proyecto B")
+
+		project = commands.command_update_project(
+			db = self.db,
+			project_id = self.project.id,
+			infoUpdate = infoUpdate
+		)
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			response = schemas.ProjectSimpleResponse.model_validate(project, from_attributes = True)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert response.title == "Proyecto B"
+		assert response.updated is not None
+		assert queries == []
+
+
 	def test_update_project(self):
 		"""
 			Validar la actualición de un proyecto
@@ -283,15 +327,20 @@ class TestCommandsProject:
 			priority = "alta"
 		)
 
+		old_title = self.project.title
+		old_priority = self.project.priority.name
+		old_description = self.project.description
+
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
 
 		assert project_updated.id == self.project.id
-		assert project_updated.title != self.project.title
-		assert project_updated.priority.name != self.project.priority.name
-		assert project_updated.description != self.project.description
+		assert project_updated.title != old_title
+		assert project_updated.priority.name != old_priority
+		assert project_updated.description != old_description
 
 		assert project_updated.title == infoUpdate.title
 		assert project_updated.priority.name == infoUpdate.priority
@@ -299,7 +348,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "No existe este proyecto", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_no_existent_project(self):
 		"""
 			Intentar actualizar un proyecto que no existe
@@ -314,13 +362,13 @@ class TestCommandsProject:
 		)
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = project_id,
 			infoUpdate = infoUpdate
 		)
 
 
 	@pytest.mark.xfail(reason = "No existe este usuario", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_no_existent_user(self):
 		"""
 			Intentar actualizar un proyecto con un ID de usuario
@@ -336,6 +384,7 @@ class TestCommandsProject:
 		)
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
@@ -344,7 +393,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Usuario no autorizado", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_unauthorized_user(self):
 		"""
 			Intentar actualizar un proyecto con el ID 
@@ -369,12 +417,12 @@ class TestCommandsProject:
 		)
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_only_description(self):
 		"""
 			Intentar actualizar un valor del proyecto (description)
@@ -384,20 +432,22 @@ class TestCommandsProject:
 			description = "Una app para hacer test",
 		)
 
+		old_description = self.project.description
+
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
 
 		assert project_updated.id == self.project.id
 		assert project_updated.title == self.project.title
-		assert project_updated.description != self.project.description
+		assert project_updated.description != old_description
 		assert project_updated.priority.name == self.project.priority.name
 
 		assert project_updated.description == infoUpdate.description
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_only_title(self):
 		"""
 			Intentar actualizar un valor del proyecto (title)
@@ -407,20 +457,22 @@ class TestCommandsProject:
 			title = "Actualizando Proyecto A",
 		)
 
+		old_title = self.project.title
+
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
 
 		assert project_updated.id == self.project.id
-		assert project_updated.title != self.project.title
+		assert project_updated.title != old_title
 		assert project_updated.description == self.project.description
 		assert project_updated.priority.name == self.project.priority.name
 
 		assert project_updated.title == infoUpdate.title
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_only_priority(self):
 		"""
 			Intentar actualizar un valor del proyecto (priority)
@@ -430,7 +482,10 @@ class TestCommandsProject:
 			priority = "baja"
 		)
 
+		old_priority = self.project.priority.name
+
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = infoUpdate
 		)
@@ -438,18 +493,18 @@ class TestCommandsProject:
 		assert project_updated.id == self.project.id
 		assert project_updated.title == self.project.title
 		assert project_updated.description == self.project.description
-		assert project_updated.priority.name != self.project.priority.name
+		assert project_updated.priority.name != old_priority
 
 		assert project_updated.priority.name == infoUpdate.priority
 
 	@pytest.mark.xfail(reason = "Valor de 'priority' incorrecto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_wrong_priority(self):
 		"""
 			Intentar actualizar la prioridad (priority) con
 			un valor incorrecto
 		"""
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = {
 				"priority": "ahora",
@@ -459,7 +514,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Descripción muy larga", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_too_long_description(self):
 		"""
 			Intentar actualizar la descripción (description) con
@@ -498,6 +552,7 @@ class TestCommandsProject:
 		"""
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = {
 				"user_id": self.user.id,
@@ -507,7 +562,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Descripción muy corta", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_too_short_description(self):
 		"""
 			Intentar actualizar la descripción (description) con
@@ -516,6 +570,7 @@ class TestCommandsProject:
 		description = "app"
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = {
 				"user_id": self.user.id,
@@ -525,7 +580,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Titulo muy largo", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_too_long_title(self):
 		"""
 			Intentar actualizar el titulo (title) con
@@ -539,6 +593,7 @@ class TestCommandsProject:
 		"""
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = {
 				"title": title,
@@ -548,7 +603,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Titulo muy corto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_with_too_short_title(self):
 		"""
 			Intentar actualizar el titulo (title) con
@@ -557,6 +611,7 @@ class TestCommandsProject:
 		title = "app"
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id,
 			infoUpdate = {
 				"title": title,
@@ -565,7 +620,6 @@ class TestCommandsProject:
 		)
 
 	@pytest.mark.xfail(reason = "Sin parametro proyecto_id", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_without_project_id(self):
 		"""
 			Intentar actualizar el titulo (title) con
@@ -573,6 +627,7 @@ class TestCommandsProject:
 		"""
 
 		project_updated = commands.command_update_project(
+			db = self.db,
 			infoUpdate = {
 				"title": "Una simple app",
 				"user_id": self.user.id
@@ -580,25 +635,24 @@ class TestCommandsProject:
 		)
 
 	@pytest.mark.xfail(reason = "Sin datos para actualizar", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_update_project_without_data_project(self):
 		"""
 			Intentar actualizar el titulo (title) con
 			un valor muy corto
 		"""
 		project_updated = commands.command_update_project(
+			db = self.db,
 			project_id = self.project.id
 		)
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_delete_project(self):
 		"""
 			Validar que se elimine el proyecto
 		"""
 		project_id = self.project.id
 
-		commands.command_delete_project(project_id = project_id)
+		commands.command_delete_project(db = self.db, project_id = project_id)
 
 		project = self.db.get(Project, project_id)
 
@@ -606,14 +660,13 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "No existe este proyecto", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_delete_no_existent_project(self):
 		"""
 			Intentar eliminar un proyecto que no existe
 		"""
 		project_id = 100
 
-		commands.command_delete_project(project_id = project_id)
+		commands.command_delete_project(db = self.db, project_id = project_id)
 
 		project = self.db.get(Project, project_id)
 
@@ -621,14 +674,13 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Parametro con dato incorreto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_delete_project_with_wrong_param(self):
 		"""
 			Intentar pasar como parametro un dato incorreto
 		"""
 		project_id = "ida12"
 
-		commands.command_delete_project(project_id = project_id)
+		commands.command_delete_project(db = self.db, project_id = project_id)
 
 		project = self.db.get(Project, project_id)
 
@@ -644,15 +696,13 @@ class TestCommandsProject:
 	
 
 	@pytest.mark.xfail(reason = "Sin parametro", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_delete_project_without_param(self):
 		"""
 			Intentar pasar como parametro un dato incorreto
 		"""
-		commands.command_delete_project()
+		commands.command_delete_project(db = self.db)
 
 	
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user(self):
 		"""
 			Obtener todos los proyectos que posee un usuario
@@ -663,6 +713,7 @@ class TestCommandsProject:
 		user_id = self.user.id
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id
@@ -671,7 +722,22 @@ class TestCommandsProject:
 		assert projects
 		assert len(projects) == 1
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
+	def test_get_projects_user_keeps_search(self):
+		"""
+			Validar que el filtro de la lista de proyectos
+			no se modifica al consultar
+		"""
+		search = {"priority": "normal"}
+
+		projects = commands.command_get_projects_user(
+			db = self.db,
+			user_id = self.user.id,
+			search = search
+		)
+
+		assert len(projects) == 1
+		assert search == {"priority": "normal"}
+
 	def test_get_project_with_no_existent_user(self):
 		"""
 			Intentar obtener la lista de proyectos
@@ -683,6 +749,7 @@ class TestCommandsProject:
 		user_id = 100
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id
@@ -692,7 +759,6 @@ class TestCommandsProject:
 		assert len(projects) == 0
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user_with_default_page_and_pageSize(self):
 		"""
 			Obtener lista de proyectos de un usuario
@@ -701,6 +767,7 @@ class TestCommandsProject:
 		user_id = 1
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			user_id = user_id
 		)
 
@@ -709,7 +776,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Sin parametro user_id", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user_without_user_id(self):
 		"""
 			Obtener lista de proyectos pero sin pasar como
@@ -719,6 +785,7 @@ class TestCommandsProject:
 		pageSize = 3
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize
 		)
@@ -726,7 +793,6 @@ class TestCommandsProject:
 		assert projects
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user_with_too_big_page(self):
 		"""
 			Obtener lista de proyectos pero pasando como
@@ -737,6 +803,7 @@ class TestCommandsProject:
 		user_id = self.user.id
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id
@@ -746,7 +813,6 @@ class TestCommandsProject:
 		assert len(projects) == 0
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user_with_filter(self):
 		"""
 			Obtener todos los proyectos de un usuario pero,
@@ -779,6 +845,7 @@ class TestCommandsProject:
 		search = {"priority": "baja"}
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id,
@@ -791,9 +858,10 @@ class TestCommandsProject:
 		page = 1
 		pageSize = 5
 		user_id = 1
-		search = {"priority": "alta"}
+		search = {"priority": "normal"}
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id,
@@ -809,6 +877,7 @@ class TestCommandsProject:
 		search = {"priority": "normal"}
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id,
@@ -824,6 +893,7 @@ class TestCommandsProject:
 		search = {"priority": "inmediata"}
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id,
@@ -835,7 +905,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Parametro de busqueda incorreto", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_project_by_user_with_wrong_filter_value(self):
 		"""
 			Obtener todos los proyectos de un usuario pero,
@@ -847,6 +916,7 @@ class TestCommandsProject:
 		search = {"priority": "ahora"}
 
 		projects = commands.command_get_projects_user(
+			db = self.db,
 			page = page,
 			pageSize = pageSize,
 			user_id = user_id,
@@ -854,7 +924,6 @@ class TestCommandsProject:
 		)
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_by_user(self):
 		"""
 			Obtener el total de proyectos que tiene
@@ -879,13 +948,13 @@ class TestCommandsProject:
 		self.db.commit()
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id
 		)
 
 		assert total == 4
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_by_user_with_filter(self):
 		"""
 			Obtener el total de proyectos que tiene
@@ -916,15 +985,17 @@ class TestCommandsProject:
 		search = {"priority": "baja"}
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id,
 			search = search
 		)
 
 		assert total == 2
 
-		search = {"priority": "alta"}
+		search = {"priority": "normal"}
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id,
 			search = search
 		)
@@ -934,6 +1005,7 @@ class TestCommandsProject:
 		search = {"priority": "normal"}
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id,
 			search = search
 		)
@@ -943,6 +1015,7 @@ class TestCommandsProject:
 		search = {"priority": "inmediata"}
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id,
 			search = search
 		)
@@ -951,7 +1024,6 @@ class TestCommandsProject:
 
 
 	@pytest.mark.xfail(reason = "Parametro de busqueda incorreto", raises = ValueError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_by_user_with_wrong_filter_value(self):
 		"""
 			Obtener el total de proyectos que tiene
@@ -982,12 +1054,12 @@ class TestCommandsProject:
 		search = {"priority": "ahora"}
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = self.user.id,
 			search = search
 		)
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_with_no_existent_user(self):
 		"""
 			Obtener el total de proyectos de un usuario
@@ -996,24 +1068,23 @@ class TestCommandsProject:
 		user_id = 100
 
 		total = commands.command_get_total_project_user(
+			db = self.db,
 			user_id = user_id
 		)
 
 		assert total == 0
 
 	@pytest.mark.xfail(reason = "Sin parametro user_id", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_by_user_without_user_id(self):
 		"""
 			Intentar obtener el total de proyectos de un
 			usuario pero, sin pasar por parametro 'user_id'
 		"""
-		total = commands.command_get_total_project_user()
+		total = commands.command_get_total_project_user(db = self.db)
 
 		assert total == 0
 
 	@pytest.mark.xfail(reason = "Parametro con dato incorrecto", raises = ValidationError)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_get_total_project_by_user_with_wrong_param(self):
 		"""
 			Intentar obtener el total de proyectos de un
@@ -1021,7 +1092,7 @@ class TestCommandsProject:
 		"""
 		user_id = "1asb"
 
-		total = commands.command_get_total_project_user(user_id = user_id)
+		total = commands.command_get_total_project_user(db = self.db, user_id = user_id)
 
 		assert total == 0
 
@@ -3,16 +3,23 @@ from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
+from sqlalchemy import event
+
 from tests import ENGINE
 from tests import get_db
+from tests import verify_token_as
 from tests import SESSION
 from tests.projects import set_project
 from tests.projects import set_project_schema
 
 from main import app
 from apps import Model
+from apps import get_async_db
+from apps.utils.token.token import token_cache
+from apps.utils.cache.cache import detail_cache
 from apps.users.models import User
 from apps.projects.models import Project
+from apps.tickets.models import Ticket
 from apps.projects.schemas import schemas
 from apps.projects.models import ChoicesPrority
 
@@ -31,12 +38,17 @@ TokenExpirado = {
 }
 ResponseTokenNoValido = {"detail": "Token no valido"}
 
+app.dependency_overrides[get_async_db] = get_db
+
 client = TestClient(app)
 
 
 class TestRoutesProject:
 
 	def setup_method(self):
+		token_cache.clear()
+		detail_cache.clear()
+
 		Model.metadata.drop_all(ENGINE)
 		Model.metadata.create_all(ENGINE)
 
@@ -79,8 +91,7 @@ class TestRoutesProject:
 		assert self.db.query(Project).count() == 1
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project(self, mockToken):
 		""" 
 			Validar ruta para crear un proyecto
@@ -110,8 +121,7 @@ class TestRoutesProject:
 		assert responseJson["user"]["id"] == project.user_id
 		assert responseJson["priority"] == project.priority
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_without_title(self, mockToken):
 		"""
 			Intentar crear proyecto sin titulo
@@ -135,8 +145,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_too_long_title(self, mockToken):
 		"""
 			Intentar crear proyecto con titulo muy largo
@@ -168,8 +177,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 		
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_too_short_title(self, mockToken):
 		"""
 			Intentar crear proyecto con titulo muy corto
@@ -196,8 +204,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_without_description(self, mockToken):
 		"""
 			Intentar crear proyecto sin descripción
@@ -221,8 +228,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_too_long_description(self, mockToken):
 		"""
 			Intentar crear proyecto con una descripción muy larga
@@ -270,8 +276,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_too_short_description(self, mockToken):
 		"""
 			Intentar crear proyecto con una descripción muy corta
@@ -298,8 +303,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_wrong_priority(self, mockToken):
 		"""
 			Intentar crear proyecto con una prioridad incorrecta
@@ -326,8 +330,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 		
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_with_no_existent_user(self, mockToken):
 		"""
 			Intentar crear proyecto con el ID de un usuario
@@ -359,8 +362,7 @@ class TestRoutesProject:
 		assert responseJson == {"message": DoesNotExistsUser.get(id = project.user_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_project_without_user_id(self, mockToken):
 		"""
 			Intentar crear proyecto pero sin enviar 
@@ -384,7 +386,6 @@ class TestRoutesProject:
 
 		assert responseStatus == 422
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_create_project_without_authorization(self):
 		"""
 			Intentar crear proyecto, pero sin un token
@@ -409,7 +410,6 @@ class TestRoutesProject:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_create_project_with_token_expired(self):
 		"""
 			Intentar crear proyecto, pero con un token
@@ -436,8 +436,7 @@ class TestRoutesProject:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_project_by_id(self, mockToken):
 		"""
 			Obtener proyecto por ID
@@ -464,8 +463,97 @@ class TestRoutesProject:
 		assert responseJson["user"]["id"] == self.project.user_id
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_project_by_id_not_modified(self, mockToken):
+		"""
+			Validar el 304 del detalle y que una actualización cambie su ETag
+		"""
+		self.headers.update(self.auth)
+
+		response = client.get(f"{self.url}/{self.project.id}", headers = self.headers)
+		etag = response.headers["ETag"]
+
+		assert response.status_code == 200
+		assert "Last-Modified" in response.headers
+
+		response = client.get(f"{self.url}/{self.project.id}", headers = {**self.headers, "If-None-Match": etag})
+
+		assert response.status_code == 304
+		assert response.content == b""
+
+		client.put(f"{self.url}/{self.project.id}", headers = self.headers, json = {"title": "Proyecto actualizado", "user_id": self.user.id})
+
+		response = client.get(f"{self.url}/{self.project.id}", headers = {**self.headers, "If-None-Match": etag})
+
+		assert response.status_code == 200
+		assert response.headers["ETag"] != etag
+		assert response.json()["title"] == "Proyecto actualizado"
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_project_stats(self, mockToken):
+		"""
+			Obtener el resumen de tickets del proyecto y validar su ETag
+		"""
+		self.headers.update(self.auth)
+
+		self.db.add_all([
+			Ticket(title = "Tarea 1", priority = "alta", project_id = self.project.id),
+			Ticket(title = "Tarea 2", priority = "alta", type = "cerrado", project_id = self.project.id),
+			Ticket(title = "Tarea 3", priority = "baja", state = "terminado", project_id = self.project.id),
+		])
+		self.db.commit()
+
+		response = client.get(f"{self.url}/{self.project.id}/stats?days=7", headers = self.headers)
+
+		responseJson = response.json()
+
+		assert response.status_code == 200
+		assert responseJson["total"] == 3
+		assert responseJson["priority"] == {"baja": 1, "normal": 0, "alta": 2, "inmediata": 0}
+		assert responseJson["state"]["terminado"] == 1
+		assert responseJson["type"]["cerrado"] == 1
+		assert len(responseJson["created_per_day"]) == 7
+		assert responseJson["created_per_day"][-1]["total"] == 3
+		assert responseJson["closed_per_day"][-1]["total"] == 1
+
+		etag = response.headers["ETag"]
+
+		response = client.get(
+			f"{self.url}/{self.project.id}/stats?days=7",
+			headers = {**self.headers, "If-None-Match": etag}
+		)
+
+		assert response.status_code == 304
+		assert response.content == b""
+
+		self.db.add(Ticket(title = "Tarea 4", project_id = self.project.id))
+		self.db.commit()
+
+		response = client.get(
+			f"{self.url}/{self.project.id}/stats?days=7",
+			headers = {**self.headers, "If-None-Match": etag}
+		)
+
+		assert response.status_code == 200
+		assert response.headers["ETag"] != etag
+		assert response.json()["total"] == 4
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_stats_not_existent_project(self, mockToken):
+		"""
+			Intentar obtener el resumen de un proyecto que no existe
+		"""
+		self.headers.update(self.auth)
+
+		response = client.get(f"{self.url}/100/stats", headers = self.headers)
+
+		assert response.status_code == 404
+		assert response.json() == {"message": DoesNotExistsProject.get(id = 100)}
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_not_existent_project(self, mockToken):
 		"""
 			Intentar obtener un proyecto que no existe 
@@ -488,7 +576,6 @@ class TestRoutesProject:
 		assert responseJson == {"message": DoesNotExistsProject.get(id = project_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_get_project_by_id_without_authorization(self):
 		"""
 			Intentar obtener un proyecto, pero sin
@@ -508,7 +595,6 @@ class TestRoutesProject:
 		assert responseStatus == 401
 		assert responseJson == ResponseNoToken
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_get_project_by_id_with_token_expired(self):
 		"""
 			Intentar obtener un proyecto, pero
@@ -529,8 +615,7 @@ class TestRoutesProject:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project(self, mockToken):
 		"""
 			Validar que se actualice un proyecto
@@ -568,8 +653,7 @@ class TestRoutesProject:
 		assert responseJson["priority"] == infoUpdate.priority
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_no_existent_project(self, mockToken):
 		"""
 			Intentar actualizar un proyecto que no existe
@@ -600,8 +684,7 @@ class TestRoutesProject:
 		assert responseJson == {"message": DoesNotExistsProject.get(id = project_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_too_long_title(self, mockToken):
 		"""
 			Intentar actualizar el titulo de un proyecto
@@ -637,8 +720,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_too_short_title(self, mockToken):
 		"""
 			Intentar actualizar el titulo de un proyecto
@@ -668,8 +750,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_only_title(self, mockToken):
 		"""
 			Intentar actualizar solo el titulo de un proyecto
@@ -701,8 +782,7 @@ class TestRoutesProject:
 
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_too_long_description(self, mockToken):
 		"""
 			Intentar actualizar la descripción de un proyecto
@@ -746,8 +826,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_too_short_description(self, mockToken):
 		"""
 			Intentar actualizar la descripción de un proyecto
@@ -778,8 +857,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_only_description(self, mockToken):
 		"""
 			Intentar actualizar solo la descripción un proyecto
@@ -809,8 +887,7 @@ class TestRoutesProject:
 		assert responseJson["priority"] == self.project.priority.name
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_wrong_priority(self, mockToken):
 		"""
 			Intentar actualizar un proyecto
@@ -840,8 +917,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_only_priority(self, mockToken):
 		"""
 			Intentar actualizar solo la prioridad de un proyecto
@@ -871,8 +947,7 @@ class TestRoutesProject:
 		assert responseJson["description"] == self.project.description
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_no_existent_user(self, mockToken):
 		"""
 			Intentar actualizar un proyecto con un usuario que
@@ -904,8 +979,7 @@ class TestRoutesProject:
 		assert responseJson == {"message": UnauthorizedProject.get(id = project_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_project_with_unauthorized_user(self, mockToken):
 		"""
 			Intentar actualizar un proyecto que no le pertenece al
@@ -948,7 +1022,6 @@ class TestRoutesProject:
 		assert responseJson == {"message": UnauthorizedProject.get(id = project_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_update_project_without_authorization(self):
 		"""
 			Intentar actualizar un proyecto, pero sin 
@@ -976,7 +1049,6 @@ class TestRoutesProject:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_update_project_with_token_expired(self):
 		"""
 			Intentar actualizar un proyecto, pero
@@ -1005,8 +1077,7 @@ class TestRoutesProject:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_delete_project(self, mockToken):
 		"""
 			Validar que se ha eliminado un proyecto
@@ -1026,8 +1097,7 @@ class TestRoutesProject:
 
 		assert responseStatus == 204
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_delete_no_existent_project(self, mockToken):
 		"""
 			Intentar eliminar un proyecto que no existe
@@ -1049,7 +1119,6 @@ class TestRoutesProject:
 		assert responseJson == {"message": DoesNotExistsProject.get(id = project_id)}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_delete_project_without_authorization(self):
 		"""
 			Intentar eliminar un proyecto, pero sin
@@ -1069,7 +1138,6 @@ class TestRoutesProject:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_delete_project_with_token_expired(self):
 		"""
 			Intentar eliminar un proyecto, pero
@@ -1090,9 +1158,7 @@ class TestRoutesProject:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_by_user(self, mockToken):
 		""" Validar obtener projectos por usuario """
 
@@ -1181,9 +1247,61 @@ class TestRoutesProject:
 		assert responseJson["response"]["content"]["total"] == 3
 		assert len(responseJson["response"]["content"]["projects"]) == 1
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_projects_by_user_counts_once(self, mockToken):
+		"""
+			Validar que el total del ETag se reusa en la página:
+			un solo conteo por listado
+		"""
+		self.headers.update(self.auth)
+
+		self.db.add(set_project(title = "Proyecto B", description = "Descripción del proyecto B", user_id = self.user.id))
+		self.db.commit()
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			response = client.get(f"{self.url}/list/user", headers = self.headers, params = {"page": 1, "pageSize": 1, "user_id": self.user.id})
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert response.status_code == 200
+		assert response.json()["response"]["content"]["total"] == 2
+		assert len(response.json()["response"]["content"]["projects"]) == 1
+		assert sum("count(" in query.lower() for query in queries) == 1
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_projects_by_user_not_modified(self, mockToken):
+		"""
+			Validar el 304 del listado por usuario y que un proyecto
+			nuevo cambie su ETag
+		"""
+		self.headers.update(self.auth)
+
+		params = {"page": 1, "pageSize": 2, "user_id": self.user.id}
+
+		response = client.get(f"{self.url}/list/user", headers = self.headers, params = params)
+		etag = response.headers["ETag"]
+
+		assert response.status_code == 200
+
+		response = client.get(f"{self.url}/list/user", headers = {**self.headers, "If-None-Match": etag}, params = params)
+
+		assert response.status_code == 304
+
+		self.db.add(set_project(title = "Proyecto B", description = "Descripción del proyecto B", user_id = self.user.id))
+		self.db.commit()
+
+		response = client.get(f"{self.url}/list/user", headers = {**self.headers, "If-None-Match": etag}, params = params)
+
+		assert response.status_code == 200
+		assert response.json()["response"]["content"]["total"] == 2
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_user_with_filter(self, mockToken):
 		""" 
 			Obtener proyectos por usuario pero, 
@@ -1349,9 +1467,7 @@ class TestRoutesProject:
 		assert len(responseJson["response"]["content"]["projects"]) == 0
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_user_with_wrong_filter_value(self, mockToken):
 		""" 
 			Obtener proyectos por usuario pero, 
@@ -1385,9 +1501,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 		
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_by_user_with_too_hight_page(self, mockToken):
 		""" 
 			Obtener proyectos por usuario, pero
@@ -1427,9 +1541,7 @@ class TestRoutesProject:
 		assert len(responseJson["response"]["content"]["projects"]) == 0
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_by_user_without_page_and_pageSize(self, mockToken):
 		""" 
 			Obtener proyectos por usuario, pero
@@ -1465,9 +1577,7 @@ class TestRoutesProject:
 		assert len(responseJson["response"]["content"]["projects"]) == 1
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_by_user_with_page_and_pageSize_negative(self, mockToken):
 		""" 
 			Obtener proyectos por usuario, pero
@@ -1499,9 +1609,7 @@ class TestRoutesProject:
 		assert responseStatus == 422
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_projects_with_no_existent_user_(self, mockToken):
 		""" 
 			Obtener proyectos por usuario, pero
@@ -1532,8 +1640,6 @@ class TestRoutesProject:
 		assert responseStatus == 404
 		assert responseJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_get_projects_by_user_without_authorization(self):
 		"""
 			Obtener proyectos por usuario, pero
@@ -1573,8 +1679,6 @@ class TestRoutesProject:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.projects.commands.commands.get_db", get_db)
 	def test_route_get_projects_by_user_with_token_expired(self):
 		"""
 			Obtener proyectos por usuario, pero
@@ -1,15 +1,16 @@
 import pytest
 from typing import Literal
-from unittest.mock import patch
 
+from sqlalchemy import event
+from sqlalchemy import func
 from sqlalchemy import insert
+from sqlalchemy import select
 
 from pydantic import ValidationError
 from pydantic import BaseModel
 
 from tests import ENGINE
 from tests import SESSION
-from tests import get_db
 from tests.tickets import set_ticket
 from tests.tickets import set_ticket_schema
 from tests.tickets import insert_projects
@@ -20,16 +21,25 @@ from apps import Model
 from apps.users.models import User
 from apps.projects.models import Project
 from apps.tickets.models import Ticket
+from apps.tickets.models import TicketHistory
+from apps.tickets.models import StateTicketHistory
 from apps.tickets.models import ChoicesPrority
 from apps.tickets.models import ChoicesState
 from apps.tickets.models import ChoicesType
 from apps.tickets.schemas import schemas
 from apps.tickets.commands import commands
+from apps.projects.schemas import schemas as p_schemas
+from apps.projects.commands import commands as c_projects
+from apps.utils.cache.cache import detail_cache
+from apps.utils.pagination.pagination import encode_cursor
+from apps.utils.pagination.pagination import CursorPrevious
 
 
 class TestTicketCommand:
 
 	def setup_method(self):
+		detail_cache.clear()
+
 		Model.metadata.drop_all(ENGINE)
 		Model.metadata.create_all(ENGINE)
 
@@ -89,7 +99,6 @@ class TestTicketCommand:
 		assert ticket.type.name == self.ticket.type.name
 		assert ticket.project_id == self.ticket.project_id
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket(self):
 		"""
 			Validar que se ha creado un ticket
@@ -97,7 +106,7 @@ class TestTicketCommand:
 
 		schema_ticket = set_ticket_schema(project_id = self.project.id)
 
-		ticket = commands.command_create_ticket(ticket = schema_ticket)
+		ticket = commands.command_create_ticket(db = self.db, ticket = schema_ticket)
 
 		assert ticket
 		assert ticket.id == 2
@@ -109,8 +118,113 @@ class TestTicketCommand:
 		assert ticket.project_id == schema_ticket.project_id
 
 
+	def count_commits(self):
+		commits = []
+		event.listen(self.db, "after_commit", lambda session: commits.append(1))
+
+		return commits
+
+
+	def test_create_ticket_with_history(self):
+		"""
+			Validar que se crea el ticket y su historial
+			con un solo commit
+		"""
+		schema_ticket = set_ticket_schema(project_id = self.project.id)
+		commits = self.count_commits()
+
+		ticket = commands.command_create_ticket_with_history(db = self.db, ticket = schema_ticket)
+
+		assert len(commits) == 1
+		assert ticket.id == 2
+		assert ticket.title == schema_ticket.title
+		assert ticket.state.name == ChoicesState.nuevo.name
+
+		history = self.db.scalar(select(TicketHistory).where(TicketHistory.ticket_id == ticket.id))
+
+		assert history.state == StateTicketHistory.crear
+		assert history.message == f"Se ha creado un nuevo ticket con ID: {ticket.id}"
+
+
+	def test_update_ticket_with_history(self):
+		"""
+			Validar que se actualiza el ticket y su historial
+			con un solo commit
+		"""
+		commits = self.count_commits()
+
+		ticket = commands.command_update_ticket_with_history(
+			db = self.db,
+			ticket_id = self.ticket.id,
+			infoUpdate = schemas.TicketUpdate(title = "Update Tarea A", state = "terminado")
+		)
+
+		assert len(commits) == 1
+		assert ticket.title == "Update Tarea A"
+		assert ticket.state == ChoicesState.terminado
+
+		history = self.db.scalar(select(TicketHistory).where(TicketHistory.ticket_id == ticket.id))
+
+		assert history.state == StateTicketHistory.actualizar
+		assert history.message == f"Se han actualizado los campos: [title='Update Tarea A' state='terminado'] del ticket con ID {ticket.id}"
+
+
+	def test_update_ticket_with_history_does_not_exists(self):
+		"""
+			Sin ticket no se agrega historial
+		"""
+		with pytest.raises(ValueError):
+			commands.command_update_ticket_with_history(
+				db = self.db,
+				ticket_id = 100,
+				infoUpdate = schemas.TicketUpdate(state = "terminado")
+			)
+
+		assert self.db.scalar(select(func.count()).select_from(TicketHistory)) == 0
+
+
+	def test_create_tickets(self):
+		"""
+			Validar que se crean varios tickets y su
+			historial en una sola transacción
+		"""
+		insert_projects(self.db)
+
+		schema_tickets = [
+			set_ticket_schema(title = f"Importado {i}", project_id = project_id)
+			for i, project_id in enumerate([self.project.id, 2, 3, self.project.id])
+		]
+
+		tickets = commands.command_create_tickets(db = self.db, tickets = schema_tickets)
+
+		assert [ticket.id for ticket in tickets] == [2, 3, 4, 5]
+		assert [ticket.title for ticket in tickets] == [ticket.title for ticket in schema_tickets]
+		assert [ticket.project_id for ticket in tickets] == [self.project.id, 2, 3, self.project.id]
+		assert tickets[0].state.name == ChoicesState.nuevo.name
+		assert tickets[0].created is not None
+
+		histories = self.db.scalars(select(TicketHistory).order_by(TicketHistory.ticket_id)).all()
+
+		assert [history.ticket_id for history in histories] == [2, 3, 4, 5]
+		assert all(history.state == StateTicketHistory.crear for history in histories)
+
+
+	def test_create_tickets_with_wrong_project(self):
+		"""
+			Si un proyecto no existe no se crea ningún ticket
+		"""
+		schema_tickets = [
+			set_ticket_schema(project_id = self.project.id),
+			set_ticket_schema(project_id = 100),
+		]
+
+		with pytest.raises(ValueError):
+			commands.command_create_tickets(db = self.db, tickets = schema_tickets)
+
+		assert self.db.scalar(select(func.count()).select_from(Ticket)) == 1
+
+
 	@pytest.mark.xfail(reason = "Titulo muy largo", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_too_long_title(self):
 		"""
 			Validar la longitud del titulo cuando es muy largo
@@ -122,7 +236,7 @@ class TestTicketCommand:
 		eos dicta molestiae accusamus?
 		"""
 		
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": title,
 			"project_id": self.project.id,
 			"description": "Descripción de la tarea",
@@ -132,14 +246,13 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Titulo muy corto", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_too_short_title(self):
 		"""
 			Validar la longitud del titulo cuando es muy corto
 		"""
 		title = "App"
 		
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": title,
 			"project_id": self.project.id,
 			"description": "Descripción de la tarea",
@@ -149,12 +262,11 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Sin titulo", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_without_title(self):
 		"""
 			Validar que no se cree un ticket sin 'titulo' 
 		"""
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"project_id": self.project.id,
 			"description": "Descripción de la tarea",
 			"priority": "alta"
@@ -162,7 +274,6 @@ class TestTicketCommand:
 		})
 
 	@pytest.mark.xfail(reason = "'Descripción' muy larga", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_too_long_description(self):
 		"""
 			Validar la longitud de la descripción cuando es muy larga 
@@ -187,7 +298,7 @@ class TestTicketCommand:
 		eos dicta molestiae accusamus?
 		"""
 
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"project_id": self.project.id,
 			"description": description,
@@ -197,7 +308,6 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Descripción muy corta", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_too_short_description(self):
 		"""
 			Validar la longitud de la descripción cuando es muy corta
@@ -205,7 +315,7 @@ class TestTicketCommand:
 
 		description = "App"
 
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"project_id": self.project.id,
 			"description": description,
@@ -214,13 +324,12 @@ class TestTicketCommand:
 		})
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_without_description(self):
 		"""
 			Validar que se cree un ticket sin 'descripción' 
 		"""
 
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"project_id": self.project.id,
 			"priority": "alta"
@@ -232,14 +341,13 @@ class TestTicketCommand:
 		assert ticket.project_id == self.project.id
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_param_state(self):
 		"""
 			Validar que se cree un ticket
 			ignorando el valor para el 'state'
 			si se envia.
 		"""
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"description": "Descripción de la tarea a",
 			"project_id": self.project.id,
@@ -253,7 +361,6 @@ class TestTicketCommand:
 		assert ticket.state.name ==  "nuevo"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_param_type(self):
 		"""
 			Validar que se cree un ticket
@@ -261,7 +368,7 @@ class TestTicketCommand:
 			si se envia.
 		"""
 
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"description": "Descripción de la tarea a",
 			"project_id": self.project.id,
@@ -276,14 +383,13 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason="Incorrecto 'priority'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_wrong_priority(self):
 		"""
 			Validar que no se cree un ticket
 			enviando un valor incorrecto para el 'priority'
 		"""
 
-		ticket = commands.command_create_ticket(ticket = {
+		ticket = commands.command_create_ticket(db = self.db, ticket = {
 			"title": "Tarea a",
 			"description": "Descripción de la tarea a",
 			"project_id": self.project.id,
@@ -291,7 +397,6 @@ class TestTicketCommand:
 		})
 
 	@pytest.mark.xfail(reason="No existe este proyecto", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_with_no_existent_project(self):
 		"""
 			Validar que no se cree un ticket
@@ -300,15 +405,14 @@ class TestTicketCommand:
 
 		schema_ticket = set_ticket_schema(project_id = 100)
 
-		ticket = commands.command_create_ticket(ticket = schema_ticket)
+		ticket = commands.command_create_ticket(db = self.db, ticket = schema_ticket)
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_id(self):
 		"""
 			Validar obtener un ticket por ID
 		"""
 
-		ticket = commands.command_get_ticket(ticket_id = 1)
+		ticket = commands.command_get_ticket(db = self.db, ticket_id = 1)
 
 		assert ticket.id == 1
 		assert ticket.title == self.ticket.title
@@ -319,8 +423,55 @@ class TestTicketCommand:
 		assert ticket.project_id == self.ticket.project_id
 
 
+	def test_get_ticket_from_cache(self):
+		"""
+			Validar que la segunda lectura sale del cache y que
+			actualizar el ticket o su proyecto la invalida
+		"""
+		commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id)
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			ticket = commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert ticket.title == self.ticket.title
+		assert ticket.project.title == self.project.title
+		assert queries == []
+
+		commands.command_update_ticket_with_history(
+			db = self.db,
+			ticket_id = self.ticket.id,
+			infoUpdate = schemas.TicketUpdate(title = "Tarea actualizada")
+		)
+
+		assert commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id).title == "Tarea actualizada"
+
+		c_projects.command_update_project(
+			db = self.db,
+			project_id = self.project.id,
+			infoUpdate = p_schemas.ProjectUpdate(user_id = self.project.user_id, title = "Proyecto B")
+		)
+
+		assert commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id).project.title == "Proyecto B"
+
+
+	def test_delete_ticket_invalidates_cache(self):
+		"""
+			Validar que un ticket borrado no se sigue leyendo del cache
+		"""
+		commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id)
+		commands.command_delete_ticket(db = self.db, ticket_id = self.ticket.id)
+
+		with pytest.raises(ValueError):
+			commands.command_get_ticket(db = self.db, ticket_id = self.ticket.id)
+
+
 	@pytest.mark.xfail(reason = "No existe este ticket", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_no_existent_ticket(self):
 		"""
 			Validar que se genere un error
@@ -328,24 +479,22 @@ class TestTicketCommand:
 		"""
 		ticket_id = 100
 		
-		ticket = commands.command_get_ticket(ticket_id = ticket_id)
+		ticket = commands.command_get_ticket(db = self.db, ticket_id = ticket_id)
 
 		assert ticket.id == ticket_id
 
 
 	@pytest.mark.xfail(reason = "Sin ticket_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_without_ticket_id(self):
 		"""
 			Validar que se genere un error 
 			al no enviar un valor para ticket_id
 		"""
 
-		ticket = commands.command_get_ticket()
+		ticket = commands.command_get_ticket(db = self.db)
 
 		assert ticket.id == 2
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket(self):
 		"""
 			Validar actualización de un ticket
@@ -362,6 +511,7 @@ class TestTicketCommand:
 		)
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
@@ -374,7 +524,65 @@ class TestTicketCommand:
 		assert ticket.priority.name == infoUpdate.priority
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
+	def test_update_tickets_by_ids(self):
+		"""
+			Validar que se actualizan varios tickets por
+			sus ids y se agrega su historial
+		"""
+		bulk_insert_ticket(self.db)
+
+		tickets = commands.command_update_tickets(
+			db = self.db,
+			infoUpdate = schemas.TicketUpdate(state = "terminado"),
+			ticket_ids = [1, 2, 3, 2]
+		)
+
+		assert sorted(ticket.id for ticket in tickets) == [1, 2, 3]
+		assert all(ticket.state == ChoicesState.terminado for ticket in tickets)
+
+		histories = self.db.scalars(select(TicketHistory).order_by(TicketHistory.ticket_id)).all()
+
+		assert [history.ticket_id for history in histories] == [1, 2, 3]
+		assert all(history.state == StateTicketHistory.actualizar for history in histories)
+		assert "state='terminado'" in histories[0].message
+
+
+	def test_update_tickets_by_filter(self):
+		"""
+			Validar que se actualizan todos los tickets
+			del proyecto que cumplen el filtro
+		"""
+		bulk_insert_ticket(self.db)
+
+		tickets = commands.command_update_tickets(
+			db = self.db,
+			infoUpdate = schemas.TicketUpdate(state = "terminado", priority = "alta"),
+			project_id = self.project.id,
+			search = {"state": "repaso"}
+		)
+
+		assert len(tickets) == 4
+		assert self.db.scalar(select(func.count()).select_from(Ticket).where(Ticket.state == ChoicesState.repaso)) == 0
+		assert self.db.scalar(select(func.count()).select_from(TicketHistory)) == 4
+
+
+	def test_update_tickets_with_wrong_id(self):
+		"""
+			Si un ticket no existe no se actualiza ninguno
+		"""
+		with pytest.raises(ValueError):
+			commands.command_update_tickets(
+				db = self.db,
+				infoUpdate = schemas.TicketUpdate(state = "terminado"),
+				ticket_ids = [self.ticket.id, 100]
+			)
+
+		ticket = self.db.get(Ticket, self.ticket.id)
+
+		assert ticket.state == ChoicesState.nuevo
+		assert self.db.scalar(select(func.count()).select_from(TicketHistory)) == 0
+
+
 	def test_update_ticket_only_title(self):
 		"""
 			Validar que solo se actualice el titulo
@@ -385,17 +593,19 @@ class TestTicketCommand:
 			title = "Update Tarea A"
 		)
 
+		old_title = self.ticket.title
+
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 		assert ticket.id == self.ticket.id
 		assert ticket.title == infoUpdate.title
-		assert ticket.title != self.ticket.title
+		assert ticket.title != old_title
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_only_description(self):
 		"""
 			Validar que solo se actualice la descripción
@@ -406,17 +616,19 @@ class TestTicketCommand:
 			description = "Update descripción de tarea A"
 		)
 
+		old_description = self.ticket.description
+
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 		assert ticket.id == self.ticket.id
 		assert ticket.description == infoUpdate.description
-		assert ticket.description != self.ticket.description
+		assert ticket.description != old_description
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_only_type(self):
 		"""
 			Validar que solo se actualice el tipo 
@@ -427,17 +639,19 @@ class TestTicketCommand:
 			type = "archivado"
 		)
 
+		old_type = self.ticket.type.name
+
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 		assert ticket.id == self.ticket.id
 		assert ticket.type.name == infoUpdate.type
-		assert ticket.type.name != self.ticket.type.name
+		assert ticket.type.name != old_type
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_only_state(self):
 		"""
 			Validar que solo se actualice el estado
@@ -448,17 +662,19 @@ class TestTicketCommand:
 			state = "desarrollo"
 		)
 
+		old_state = self.ticket.state.name
+
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 		assert ticket.id == self.ticket.id
 		assert ticket.state.name == infoUpdate.state
-		assert ticket.state.name != self.ticket.state.name
+		assert ticket.state.name != old_state
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_only_priority(self):
 		"""
 			Validar que solo se actualice la prioridad
@@ -469,17 +685,19 @@ class TestTicketCommand:
 			priority = "inmediata"
 		)
 
+		old_priority = self.ticket.priority.name
+
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 		assert ticket.id == self.ticket.id
 		assert ticket.priority.name == infoUpdate.priority
-		assert ticket.priority.name != self.ticket.priority.name
+		assert ticket.priority.name != old_priority
 
 	@pytest.mark.xfail(reason = "(Update) Titulo muy largo", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_too_long_title(self):
 		"""
 			Validar la longitud del titulo
@@ -494,13 +712,13 @@ class TestTicketCommand:
 		"""
 		
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"title": title}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) Titulo muy corto", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_too_short_title(self):
 		"""
 			Validar la longitud del titulo
@@ -510,13 +728,13 @@ class TestTicketCommand:
 		title = "App"
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"title": title}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) Descripción muy larga", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_too_long_description(self):
 		"""
 			Validar la longitud de la descripción
@@ -539,13 +757,13 @@ class TestTicketCommand:
 		"""
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"description": description}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) Descripción muy corta", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_too_short_description(self):
 		"""
 			Validar la longitud de la descripción
@@ -555,12 +773,12 @@ class TestTicketCommand:
 		description = "App"
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"description": description}
 		)
 
 	@pytest.mark.xfail(reason = "(Update) Incorrecto 'state'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_wrong_state(self):
 		"""
 			Validar que se genere un error
@@ -571,13 +789,13 @@ class TestTicketCommand:
 		state = "eliminado"
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"state": state}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) Incorrecto 'type'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_wrong_type(self):
 		"""
 			Validar que se genere un error
@@ -588,13 +806,13 @@ class TestTicketCommand:
 		type = "guardado"
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"type": type}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) Incorrecto 'priotity'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_ticket_with_wrong_priority(self):
 		"""
 			Validar que se genere un error
@@ -605,13 +823,13 @@ class TestTicketCommand:
 		priority = "ahora"
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = {"priority": priority}
 		)
 
 
 	@pytest.mark.xfail(reason = "(Update) No existe este ticket", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_update_with_no_existent_ticket(self):
 		"""
 			Validar que se genere un error
@@ -625,12 +843,12 @@ class TestTicketCommand:
 		)
 
 		ticket = commands.command_update_ticket(
+			db = self.db,
 			ticket_id = ticket_id,
 			infoUpdate = infoUpdate
 		)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_delete_ticket(self):
 		"""
 			Validar que se elimine un ticket
@@ -638,13 +856,12 @@ class TestTicketCommand:
 
 		ticket_id = self.ticket.id
 
-		commands.command_delete_ticket(ticket_id = ticket_id)
+		commands.command_delete_ticket(db = self.db, ticket_id = ticket_id)
 		
 		assert self.db.get(Ticket, ticket_id) is None
 
 
 	@pytest.mark.xfail(reason = "(Delete) No existe este ticket", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_delete_no_existent_ticket(self):
 		"""
 			Validar que se genere un error
@@ -653,17 +870,16 @@ class TestTicketCommand:
 
 		ticket_id = 100
 
-		commands.command_delete_ticket(ticket_id = ticket_id)
+		commands.command_delete_ticket(db = self.db, ticket_id = ticket_id)
 
 	@pytest.mark.xfail(reason = "(Delete) Sin ticket_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_delete_ticket_without_ticket_id(self):
 		"""
 			Validar que se genere un error
 			al intentar eliminar un ticket
 			sin enviar ticket_id
 		"""
-		commands.command_delete_ticket()
+		commands.command_delete_ticket(db = self.db)
 
 
 	@pytest.mark.xfail(reason = "(Delete) Valor incorrecto en ticket_id", raises = ValidationError)
@@ -674,7 +890,6 @@ class TestTicketCommand:
 		{"id": 1},
 		[56,1,7,12]
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_delete_ticket_with_wrong_ticket_id(self, ticket_id):
 		"""
 			Validar que se genere un error
@@ -682,10 +897,9 @@ class TestTicketCommand:
 			al enviar un valor incorrecto para ticket_id
 		"""
 
-		commands.command_delete_ticket(ticket_id = ticket_id)
+		commands.command_delete_ticket(db = self.db, ticket_id = ticket_id)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter(self):
 		"""
 			Validar obtener el total de tickets
@@ -699,6 +913,7 @@ class TestTicketCommand:
 			priority = "baja"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_baja = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search 
 		)
@@ -707,6 +922,7 @@ class TestTicketCommand:
 			priority = "normal"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_normal = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -715,6 +931,7 @@ class TestTicketCommand:
 			priority = "inmediata"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_inmediata = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -723,6 +940,7 @@ class TestTicketCommand:
 			state = "desarrollo"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_desarrollo = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		) 
@@ -731,6 +949,7 @@ class TestTicketCommand:
 			state = "repaso"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_repaso = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -739,6 +958,7 @@ class TestTicketCommand:
 			type = "archivado"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_archivado = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -747,6 +967,7 @@ class TestTicketCommand:
 			type = "cerrado"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets_by_cerrado = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -760,7 +981,6 @@ class TestTicketCommand:
 		assert total_tickets_by_cerrado == 1
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_with_no_existent_project(self):
 		"""
 			Intentar obtener el total de tickets
@@ -774,6 +994,7 @@ class TestTicketCommand:
 			priority = "baja"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -782,7 +1003,6 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en priority", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_with_wrong_priority(self):
 		"""
 			Generar un error al enviar
@@ -793,13 +1013,13 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"priority": "ahora"}
 		)
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en state", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_with_wrong_state(self):
 		"""
 			Generar un error al enviar
@@ -810,13 +1030,13 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"state": "salvado"}
 		)
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en type", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_with_wrong_type(self):
 		"""
 			Generar un error al enviar
@@ -827,12 +1047,12 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"type": "registrado"}
 		)
 
 	@pytest.mark.xfail(reason = "Sin project_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_without_project_id(self):
 		"""
 			Generar un error al no enviar
@@ -843,11 +1063,11 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			search = {"type": "abierto"}
 		)
 		
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_filter_without_param_search(self):
 		"""
 			Validar que se obtenga el total de tickets
@@ -858,13 +1078,13 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_filter(
+			db = self.db,
 			project_id = project_id
 		)
 
 		assert total_tickets == 14
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter(self):
 		"""
 			Validar obtener tickets por proyecto
@@ -878,6 +1098,7 @@ class TestTicketCommand:
 			priority = "baja"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_priority_baja = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search 
 		)
@@ -886,6 +1107,7 @@ class TestTicketCommand:
 			priority = "normal"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_priority_normal = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -894,6 +1116,7 @@ class TestTicketCommand:
 			priority = "inmediata"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_priority_inmediata = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -902,6 +1125,7 @@ class TestTicketCommand:
 			state = "desarrollo"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_state_desarrollo = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		) 
@@ -910,6 +1134,7 @@ class TestTicketCommand:
 			state = "repaso"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_state_repaso = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -918,6 +1143,7 @@ class TestTicketCommand:
 			type = "archivado"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_type_archivado = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -926,6 +1152,7 @@ class TestTicketCommand:
 			type = "cerrado"
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		tickets_by_type_cerrado = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -966,7 +1193,6 @@ class TestTicketCommand:
 		assert tickets_by_type_cerrado[0].type.name == "cerrado"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_with_no_existent_project(self):
 		"""
 			Validar que retorne una lista vacia al
@@ -981,6 +1207,7 @@ class TestTicketCommand:
 		).model_dump(exclude_defaults = True, exclude=['page', 'pageSize'])
 		
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = search
 		)
@@ -989,7 +1216,6 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en priority", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_with_wrong_priority(self):
 		"""
 			Generer un error al enviar como
@@ -1000,13 +1226,13 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"priority": "ahora"}
 		)
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en state", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_with_wrong_state(self):
 		"""
 			Generer un error al enviar como
@@ -1017,12 +1243,12 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"state": "descartado"}
 		)
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en type", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_with_wrong_type(self):
 		"""
 			Generer un error al enviar como
@@ -1033,12 +1259,12 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"type": "eliminado"}
 		)
 
 	@pytest.mark.xfail(reason = "Sin project_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_without_project_id(self):
 		"""
 			Generar un error al no enviar
@@ -1047,11 +1273,11 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			search = {"priority": "normal"}
 		)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_without_param_search(self):
 		"""
 			Validar que se obtenga todos los tickets
@@ -1062,10 +1288,12 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets_page_1 = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id 
 		)
 
 		tickets_page_2 = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			page = 2
 		)
@@ -1077,6 +1305,110 @@ class TestTicketCommand:
 		assert len(tickets_page_2) == 4
 
 
+	def test_get_page_tickets_filter(self):
+		"""
+			Validar que se obtengan los tickets de la página
+			y el total en una sola consulta
+		"""
+		project_id = 1
+
+		bulk_insert_ticket(db = self.db)
+
+		tickets_page_1, total_page_1 = commands.command_get_page_tickets_filter(
+			db = self.db,
+			project_id = project_id
+		)
+
+		tickets_page_2, total_page_2 = commands.command_get_page_tickets_filter(
+			db = self.db,
+			project_id = project_id,
+			page = 2
+		)
+
+		tickets_alta, total_alta = commands.command_get_page_tickets_filter(
+			db = self.db,
+			project_id = project_id,
+			search = {"priority": "alta"}
+		)
+
+		assert len(tickets_page_1) == 10
+		assert len(tickets_page_2) == 4
+		assert total_page_1 == total_page_2 == 14
+
+		assert total_alta == len(tickets_alta)
+		assert total_alta == commands.command_get_total_tickets_filter(
+			db = self.db,
+			project_id = project_id,
+			search = {"priority": "alta"}
+		)
+
+
+	def test_get_page_tickets_filter_out_of_range(self):
+		"""
+			Validar que el total se mantenga cuando la página
+			no tiene elementos
+		"""
+		project_id = 1
+
+		bulk_insert_ticket(db = self.db)
+
+		tickets, total = commands.command_get_page_tickets_filter(
+			db = self.db,
+			project_id = project_id,
+			page = 5
+		)
+
+		assert not tickets
+		assert total == 14
+
+
+	def test_get_tickets_by_filter_with_cursor(self):
+		"""
+			Validar la paginación por cursor de los tickets
+			de un proyecto
+		"""
+		project_id = 1
+
+		bulk_insert_ticket(db = self.db)
+
+		tickets_page_1 = commands.command_get_ticket_by_filter(
+			db = self.db,
+			project_id = project_id,
+			pageSize = 5,
+			cursor = encode_cursor(0)
+		)
+
+		tickets_page_2 = commands.command_get_ticket_by_filter(
+			db = self.db,
+			project_id = project_id,
+			pageSize = 5,
+			cursor = encode_cursor(tickets_page_1[-1].id)
+		)
+
+		tickets_previous = commands.command_get_ticket_by_filter(
+			db = self.db,
+			project_id = project_id,
+			pageSize = 5,
+			cursor = encode_cursor(tickets_page_2[0].id, CursorPrevious)
+		)
+
+		assert [ticket.id for ticket in tickets_page_1] == [1, 2, 3, 4, 5]
+		assert [ticket.id for ticket in tickets_page_2] == [6, 7, 8, 9, 10]
+		assert [ticket.id for ticket in tickets_previous] == [1, 2, 3, 4, 5]
+
+
+	@pytest.mark.xfail(reason = "Cursor invalido", raises = ValueError)
+	def test_get_tickets_by_filter_with_invalid_cursor(self):
+		"""
+			Generar un error al enviar un cursor invalido
+		"""
+		commands.command_get_ticket_by_filter(
+			db = self.db,
+			project_id = 1,
+			cursor = "cursor-invalido"
+		)
+
+
 	@pytest.mark.xfail(reason = "Valores no validos en paginación", raises = (ValueError, ValidationError))
 	@pytest.mark.parametrize("pagination", [
 		{"page": -1, "pageSize": 5},
@@ -1084,7 +1416,6 @@ class TestTicketCommand:
 		{"page": 0.1, "pageSize": 5},
 		{"page": 1, "pageSize": 5.4},
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_filter_with_wrong_page_and_pageSize(self, pagination):
 		"""
 			Generar un error al enviar valores
@@ -1095,6 +1426,7 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 
 		tickets = commands.command_get_ticket_by_filter(
+			db = self.db,
 			project_id = project_id,
 			search = {"priority": "normal"},
 			page = pagination['page'],
@@ -1102,7 +1434,6 @@ class TestTicketCommand:
 		)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title(self):
 		"""
 			Validar obtener uno o más tickets por el titulo
@@ -1117,6 +1448,7 @@ class TestTicketCommand:
 		)
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = ticket_title,
 			project_id = project_id
 		)
@@ -1130,6 +1462,7 @@ class TestTicketCommand:
 		)
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = ticket_title_min,
 			project_id = project_id
 		)
@@ -1138,7 +1471,6 @@ class TestTicketCommand:
 		assert ticket_title_min.title.lower() in result[0].title.lower()
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title_return_not_found_tickets(self):
 		"""
 			Validar que retorne una lista
@@ -1155,6 +1487,7 @@ class TestTicketCommand:
 		)
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = ticket_title,
 			project_id = project_id
 		)
@@ -1163,7 +1496,6 @@ class TestTicketCommand:
 		assert len(result) == 0
 
 	@pytest.mark.xfail(reason = "(Search by title) Titulo muy largo", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title_with_too_long_title(self):
 		"""
 			Validar que genere un error
@@ -1182,13 +1514,13 @@ class TestTicketCommand:
 		"""
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = {"title": title},
 			project_id = project_id
 		)
 
 
 	@pytest.mark.xfail(reason = "Sin 'title'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title_without_title(self):
 		"""
 			Generar un error al no enviar
@@ -1197,11 +1529,10 @@ class TestTicketCommand:
 		bulk_insert_ticket(db = self.db)
 		project_id = self.project.id
 
-		result = commands.command_get_ticket_by_title(project_id = project_id)
+		result = commands.command_get_ticket_by_title(db = self.db, project_id = project_id)
 
 
 	@pytest.mark.xfail(reason = "Sin 'project_id'", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title_without_project_id(self):
 		"""
 			Generar un error al no enviar
@@ -1212,6 +1543,7 @@ class TestTicketCommand:
 		title = "App"
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = {"title": title},
 		)
 
@@ -1223,7 +1555,6 @@ class TestTicketCommand:
 		None,
 		[1]
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_by_title_with_wrong_project_id(self, project_id):
 		"""
 			Generar un error al enviar valores
@@ -1234,12 +1565,136 @@ class TestTicketCommand:
 		title = "App"
 
 		result = commands.command_get_ticket_by_title(
+			db = self.db,
 			ticket = {"title": title},
 			project_id = project_id
 		)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
+	def test_get_page_tickets_by_title(self):
+		"""
+			Validar que la busqueda incluye la descripción,
+			ordena primero las coincidencias en el titulo
+			y devuelve la página junto al total
+		"""
+		project_id = self.project.id
+
+		self.db.execute(
+			insert(Ticket),
+			[
+				{"title": "Login", "description": "Revisar el formulario", "project_id": project_id},
+				{"title": "Formulario de registro", "project_id": project_id},
+				{"title": "Formularios", "project_id": project_id},
+			]
+		)
+		self.db.commit()
+
+		ticket_title = schemas.TicketByTitle(title = "formulario")
+
+		tickets, total = commands.command_get_page_tickets_by_title(
+			db = self.db,
+			project_id = project_id,
+			ticket = ticket_title,
+			page = 1,
+			pageSize = 2
+		)
+
+		assert total == 3
+		assert len(tickets) == 2
+		assert [ticket.title for ticket in tickets] == ["Formularios", "Formulario de registro"]
+
+		tickets, total = commands.command_get_page_tickets_by_title(
+			db = self.db,
+			project_id = project_id,
+			ticket = ticket_title,
+			page = 2,
+			pageSize = 2
+		)
+
+		assert total == 3
+		assert [ticket.title for ticket in tickets] == ["Login"]
+
+
+	def test_stream_tickets_by_title(self):
+		"""
+			Validar que el stream recorre todos los resultados
+			por bloques y en el mismo orden que la paginación
+		"""
+		bulk_insert_ticket(db = self.db)
+
+		project_id = self.project.id
+
+		ticket_title = schemas.TicketByTitle(title = "e")
+
+		tickets, total = commands.command_get_page_tickets_by_title(
+			db = self.db,
+			project_id = project_id,
+			ticket = ticket_title,
+			page = 1,
+			pageSize = 20
+		)
+		expected = [ticket.id for ticket in tickets]
+
+		result = commands.command_stream_tickets_by_title(
+			db = self.db,
+			project_id = project_id,
+			ticket = ticket_title,
+			chunk_size = 2
+		)
+
+		assert [ticket.id for ticket in result] == expected
+		assert len(expected) == total
+
+
+	def test_get_page_tickets_by_title_with_cursor(self):
+		"""
+			Generar un error al paginar la busqueda
+			por titulo con un cursor
+		"""
+		with pytest.raises(ValueError):
+			commands.command_get_page_tickets_by_title(
+				db = self.db,
+				project_id = self.project.id,
+				ticket = schemas.TicketByTitle(title = "API"),
+				cursor = encode_cursor(1)
+			)
+
+
+	def test_get_ticket_by_title_after_update(self):
+		"""
+			Validar que la busqueda refleja los cambios
+			de un ticket actualizado
+		"""
+		bulk_insert_ticket(db = self.db)
+
+		project_id = self.project.id
+
+		ticket_title = schemas.TicketByTitle(title = "Optimizar")
+
+		result = commands.command_get_ticket_by_title(
+			db = self.db,
+			ticket = ticket_title,
+			project_id = project_id
+		)
+
+		assert not result
+
+		commands.command_update_ticket(
+			db = self.db,
+			ticket_id = self.ticket.id,
+			infoUpdate = schemas.TicketUpdate(title = "Optimizar consultas")
+		)
+
+		result = commands.command_get_ticket_by_title(
+			db = self.db,
+			ticket = ticket_title,
+			project_id = project_id
+		)
+
+		assert len(result) == 1
+		assert result[0].id == self.ticket.id
+
+
 	def test_get_tickets_by_projects(self):
 		"""
 			Validar obtener tickets por proyecto
@@ -1256,18 +1711,23 @@ class TestTicketCommand:
 
 
 		tickets_project_id_1 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id_1
 		) 
 		tickets_project_id_2 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id_2
 		)
 		tickets_project_id_3 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id_3
 		)
 		tickets_project_id_4 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id_4
 		)
 		tickets_project_id_5 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id_5
 		)
 
@@ -1297,7 +1757,6 @@ class TestTicketCommand:
 		assert tickets_project_id_5[0].project_id == project_id_5
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_projects_with_no_existent_project(self):
 		"""
 			Intentar obtener todos los tickets de un
@@ -1306,6 +1765,7 @@ class TestTicketCommand:
 		project_id = 3
 		
 		tickets = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id
 		)
 
@@ -1313,7 +1773,6 @@ class TestTicketCommand:
 		assert len(tickets) == 0
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_projects_checking_pagination(self):
 		"""
 			Validar obtener los tickets de un proyecto
@@ -1325,11 +1784,13 @@ class TestTicketCommand:
 		project_id = 2
 
 		tickets_page_0 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id,
 			pageSize = 2
 		)
 
 		tickets_page_1 = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id,
 			page = 2,
 			pageSize = 2
@@ -1351,7 +1812,6 @@ class TestTicketCommand:
 		{"page": 0.1, "pageSize": 5},
 		{"page": 1, "pageSize": 5.3}
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_projects_with_wrong_page_and_pageSize(self, pagination):
 		"""
 			Generar un error al enviar valores para [page, pageSize]
@@ -1363,13 +1823,13 @@ class TestTicketCommand:
 		project_id = 2
 
 		tickets = commands.command_get_tickets_by_project(
+			db = self.db,
 			project_id = project_id,
 			page = pagination["page"],
 			pageSize = pagination["pageSize"]
 		)
 
 	@pytest.mark.xfail(reason = "Sin project_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_tickets_by_projects_without_project_id(self):
 		"""
 			Generar un error al no eviar un valor
@@ -1379,10 +1839,9 @@ class TestTicketCommand:
 		insert_projects(db = self.db)
 		insert_ticket_by_project(db = self.db)
 
-		commands.command_get_tickets_by_project()
+		commands.command_get_tickets_by_project(db = self.db)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_by_project(self):
 		"""
 			Validar obtener el total de tickets
@@ -1398,18 +1857,23 @@ class TestTicketCommand:
 		project_id_5 = 5
 
 		total_tickets_project_id_1 = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id_1
 		) 
 		total_tickets_project_id_2 = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id_2
 		)
 		total_tickets_project_id_3 = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id_3
 		)
 		total_tickets_project_id_4 = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id_4
 		)
 		total_tickets_project_id_5 = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id_5
 		)
 
@@ -1425,7 +1889,6 @@ class TestTicketCommand:
 		assert total_tickets_project_id_5 == 1
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_by_project_with_no_existent_project(self):
 		"""
 			Intentar obtener el total de tickets
@@ -1434,6 +1897,7 @@ class TestTicketCommand:
 		project_id = 2
 
 		total_tickets = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id
 		)
 
@@ -1441,7 +1905,6 @@ class TestTicketCommand:
 
 
 	@pytest.mark.xfail(reason = "Sin project_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_by_project_without_project_id(self):
 		"""
 			Generar un error al no enviar el 
@@ -1450,7 +1913,7 @@ class TestTicketCommand:
 		insert_projects(db = self.db)
 		insert_ticket_by_project(db = self.db)
 
-		total_tickets = commands.command_get_total_tickets_project()
+		total_tickets = commands.command_get_total_tickets_project(db = self.db)
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto en project_id", raises = ValidationError)
@@ -1462,7 +1925,6 @@ class TestTicketCommand:
 		None,
 		(2,3)
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_tickets_by_project_with_wrong_project_id(self, project_id):
 		"""
 			Generar un error al enviar un valor incorrecto 
@@ -1472,5 +1934,6 @@ class TestTicketCommand:
 		insert_ticket_by_project(db = self.db)
 
 		total_tickets = commands.command_get_total_tickets_project(
+			db = self.db,
 			project_id = project_id
 		)
@@ -0,0 +1,209 @@
+from sqlalchemy import func
+from sqlalchemy import event
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from apps import Model
+from apps.users.models import User
+from apps.projects.models import Project
+from apps.tickets.models import Ticket
+from apps.tickets.models import TicketCounter
+from apps.tickets.schemas import schemas
+from apps.tickets.commands import commands
+from apps.tickets.commands.utils import counters
+from apps.projects.schemas import schemas as p_schemas
+from apps.projects.commands import commands as c_projects
+from apps.utils.cache.cache import detail_cache
+
+
+class TestTicketCounters:
+
+	def setup_method(self, method):
+		detail_cache.clear()
+
+		self.engine = create_engine("sqlite://")
+		Model.metadata.create_all(self.engine)
+
+		self.db = Session(self.engine)
+
+		user = User(
+			name = 'bolivar',
+			email = 'bolivar@gmail.com',
+			username = 'bolivar19',
+			password = '12345'
+		)
+		self.db.add(user)
+		self.db.commit()
+
+		project = c_projects.command_create_project(db = self.db, project = p_schemas.ProjectRequest(
+			title = "Proyecto de tests",
+			description = "Proyecto para hacer tests",
+			priority = "alta",
+			user_id = user.id
+		))
+
+		self.project_id = project.id
+
+	def teardown_method(self, method):
+		self.db.close()
+		self.engine.dispose()
+
+	def create_tickets(self, priorities):
+		return commands.command_create_tickets(db = self.db, tickets = [
+			schemas.TicketRequest(title = f"Tarea {i}", description = "Descripción", priority = priority, project_id = self.project_id)
+			for i, priority in enumerate(priorities)
+		])
+
+	def assert_counters_match(self):
+		""" Cada contador tiene que coincidir con un COUNT(*) sobre los tickets """
+		for dimension, value in counters.counter_keys():
+			search = {} if dimension == counters.CounterTotal else {dimension: value}
+			sql = select(func.count()).select_from(Ticket).filter_by(project_id = self.project_id, **search)
+
+			assert counters.count_tickets(self.db, project_id = self.project_id, search = search) == self.db.scalar(sql), (dimension, value)
+
+
+	def test_create_project_creates_counters(self):
+		"""
+			Validar que un proyecto nuevo empieza con todos sus contadores en 0
+		"""
+		totals = self.db.scalars(select(TicketCounter.total).where(TicketCounter.project_id == self.project_id)).all()
+
+		assert len(totals) == len(counters.counter_keys())
+		assert set(totals) == {0}
+
+
+	def test_counters_follow_writes(self):
+		"""
+			Validar los contadores después de crear, actualizar y borrar tickets
+		"""
+		tickets = self.create_tickets(["baja", "alta", "alta", "inmediata"])
+
+		commands.command_create_ticket(db = self.db, ticket = schemas.TicketRequest(
+			title = "Tarea sola", description = "Descripción", priority = "normal", project_id = self.project_id
+		))
+		commands.command_create_ticket_with_history(db = self.db, ticket = schemas.TicketRequest(
+			title = "Tarea con historial", description = "Descripción", priority = "baja", project_id = self.project_id
+		))
+		self.assert_counters_match()
+
+		commands.command_update_ticket(db = self.db, ticket_id = tickets[0].id, infoUpdate = schemas.TicketUpdate(state = "prueba"))
+		commands.command_update_ticket_with_history(db = self.db, ticket_id = tickets[1].id, infoUpdate = schemas.TicketUpdate(priority = "baja", type = "cerrado"))
+		self.assert_counters_match()
+
+		commands.command_update_tickets(db = self.db, infoUpdate = schemas.TicketUpdate(state = "terminado"), ticket_ids = [tickets[1].id, tickets[2].id])
+		commands.command_update_tickets(db = self.db, infoUpdate = schemas.TicketUpdate(type = "archivado"), project_id = self.project_id, search = {"state": "terminado"})
+		self.assert_counters_match()
+
+		commands.command_delete_ticket(db = self.db, ticket_id = tickets[3].id)
+		self.assert_counters_match()
+
+		assert counters.count_tickets(self.db, project_id = self.project_id) == 5
+		assert counters.count_tickets(self.db, project_id = self.project_id, search = {"state": "terminado"}) == 2
+
+
+	def test_update_without_counted_fields(self):
+		"""
+			Validar que cambiar solo el titulo no modifica los contadores
+		"""
+		tickets = self.create_tickets(["baja"])
+
+		commands.command_update_ticket(db = self.db, ticket_id = tickets[0].id, infoUpdate = schemas.TicketUpdate(title = "Nuevo titulo"))
+
+		self.assert_counters_match()
+
+
+	def test_totals_served_from_counters(self):
+		"""
+			Validar que los totales sin filtros o con un filtro no hacen COUNT(*)
+		"""
+		self.create_tickets(["baja", "alta", "alta"])
+
+		queries = []
+		event.listen(self.engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+		assert commands.command_get_total_tickets_project(db = self.db, project_id = self.project_id) == 3
+		assert commands.command_get_total_tickets_filter(db = self.db, project_id = self.project_id, search = {"priority": "alta"}) == 2
+
+		tickets, total = commands.command_get_page_tickets_filter(db = self.db, project_id = self.project_id, search = {"priority": "alta"}, page = 1, pageSize = 1)
+
+		assert total == 2
+		assert len(tickets) == 1
+		assert not any("count(" in query.lower() for query in queries)
+
+		# Con dos filtros se sigue contando
+		total = commands.command_get_total_tickets_filter(db = self.db, project_id = self.project_id, search = {"priority": "alta", "state": "nuevo"})
+
+		assert total == 2
+		assert "count(" in queries[-1].lower()
+
+
+	def test_project_without_counters(self):
+		"""
+			Validar que un proyecto anterior a los contadores usa COUNT(*)
+			hasta que 'create_missing_counters' los crea
+		"""
+		project = Project(title = "Proyecto viejo", description = "Sin contadores", user_id = 1)
+		self.db.add(project)
+		self.db.commit()
+
+		self.db.add_all([Ticket(title = f"Tarea {i}", priority = "alta", project_id = project.id) for i in range(3)])
+		self.db.commit()
+
+		assert counters.count_tickets(self.db, project_id = project.id) is None
+		assert commands.command_get_total_tickets_project(db = self.db, project_id = project.id) == 3
+
+		assert counters.create_missing_counters(self.engine) == [project.id]
+
+		assert counters.count_tickets(self.db, project_id = project.id) == 3
+		assert counters.count_tickets(self.db, project_id = project.id, search = {"priority": "alta"}) == 3
+		assert counters.create_missing_counters(self.engine) == []
+
+
+	def test_rebuild_counters(self):
+		"""
+			Validar que reconstruir recuenta con un UPDATE sobre los
+			contadores que ya existen, sin fallar por la clave duplicada
+			(otro worker los pudo crear antes)
+		"""
+		self.create_tickets(["baja", "alta", "alta"])
+
+		self.db.execute(update(TicketCounter).where(TicketCounter.project_id == self.project_id).values(total = 99))
+		self.db.commit()
+
+		counters.create_counters(self.db, project_id = self.project_id)
+		counters.rebuild_counters(self.db, project_id = self.project_id)
+		self.db.commit()
+
+		self.assert_counters_match()
+		assert counters.project_counts(self.db, project_id = self.project_id) == counters.group_counts(self.db, project_id = self.project_id)
+
+
+	def test_delete_project_deletes_counters(self):
+		"""
+			Validar que borrar el proyecto borra sus contadores
+		"""
+		c_projects.command_delete_project(db = self.db, project_id = self.project_id)
+
+		assert self.db.scalar(select(func.count()).select_from(TicketCounter)) == 0
+
+
+	def test_project_stats_from_counters(self):
+		"""
+			Validar que el resumen del proyecto sale de los contadores
+			y coincide con el GROUP BY sobre los tickets
+		"""
+		tickets = self.create_tickets(["baja", "alta", "alta"])
+		commands.command_update_ticket(db = self.db, ticket_id = tickets[0].id, infoUpdate = schemas.TicketUpdate(type = "cerrado"))
+
+		assert counters.project_counts(self.db, project_id = self.project_id) == counters.group_counts(self.db, project_id = self.project_id)
+
+		stats = c_projects.command_get_project_stats(db = self.db, project_id = self.project_id, days = 3)
+
+		assert stats["total"] == 3
+		assert stats["priority"]["alta"] == 2
+		assert stats["type"] == {"abierto": 2, "archivado": 0, "cerrado": 1}
+		assert [day["total"] for day in stats["created_per_day"]] == [0, 0, 3]
+		assert [day["total"] for day in stats["closed_per_day"]] == [0, 0, 1]
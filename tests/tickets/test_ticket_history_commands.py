@@ -1,5 +1,4 @@
 import pytest
-from unittest.mock import patch
 
 from sqlalchemy import insert
 from sqlalchemy import update
@@ -7,7 +6,6 @@ from pydantic import ValidationError
 
 from tests import ENGINE
 from tests import SESSION
-from tests import get_db
 from tests.tickets import set_ticket
 from tests.tickets import create_ticket_histories
 
@@ -142,7 +140,6 @@ class TestTicketHistoryCommand:
 		assert project.id == 1
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history(self):
 		"""
 			Validar que se genere el historial
@@ -152,6 +149,7 @@ class TestTicketHistoryCommand:
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 
 		ticket_history = commands.command_add_ticket_history(
+			db = self.db,
 			ticket_id = ticket.id
 		)
 
@@ -161,7 +159,6 @@ class TestTicketHistoryCommand:
 		assert ticket_history.state.name == StateTicketHistory.crear.name
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history_by_update_ticket(self):
 		"""
 			Validar que se genere el historial
@@ -179,6 +176,7 @@ class TestTicketHistoryCommand:
 		)
 
 		ticket_history = commands.command_add_ticket_history(
+			db = self.db,
 			ticket_id = ticket.id,
 			infoTicket = values,
 			state = "actualizar"
@@ -191,7 +189,6 @@ class TestTicketHistoryCommand:
 
 
 	@pytest.mark.xfail(reason = "Valor incorreto para 'state'", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history_with_wrong_state(self):
 		"""
 			Generar un error al crear el historial
@@ -200,13 +197,13 @@ class TestTicketHistoryCommand:
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 
 		ticket_history = commands.command_add_ticket_history(
+			db = self.db,
 			ticket_id = ticket.id,
 			state = "nuevo"
 		)
 
 
 	@pytest.mark.xfail(reason = "No existe este ticket", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history_with_no_existent_ticket(self):
 		"""
 			Generar un error al crear el historial
@@ -217,6 +214,7 @@ class TestTicketHistoryCommand:
 		ticket_id = ticket.id + 1
 		
 		ticket_history = commands.command_add_ticket_history(
+			db = self.db,
 			ticket_id = ticket_id,
 		)
 
@@ -230,7 +228,6 @@ class TestTicketHistoryCommand:
 		12.3,
 		None
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history_with_wrong_ticket_id(self, ticket_id):
 		"""
 			Generar un error al crear el historial
@@ -238,12 +235,12 @@ class TestTicketHistoryCommand:
 		"""
 
 		ticket_history = commands.command_add_ticket_history(
+			db = self.db,
 			ticket_id = ticket_id,
 		)
 		
 	
 	@pytest.mark.xfail(reason = "Sin ticket_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_create_ticket_history_without_ticket_id(self):
 		"""
 			Generar un error al crear el historial
@@ -251,10 +248,9 @@ class TestTicketHistoryCommand:
 		"""
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 
-		ticket_history = commands.command_add_ticket_history()
+		ticket_history = commands.command_add_ticket_history(db = self.db)
 
 	
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories(self):
 		"""
 			Validar obtener la lista de historial
@@ -264,6 +260,7 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		histories = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket.id
 		)
 
@@ -275,7 +272,6 @@ class TestTicketHistoryCommand:
 		assert histories[1].state.name == StateTicketHistory.actualizar.name
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories_with_no_existent_ticket(self):
 		"""
 			Intentar obtener el historial de cambio de un
@@ -288,6 +284,7 @@ class TestTicketHistoryCommand:
 		ticket_id = 100
 
 		histories = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id
 		)
 
@@ -295,7 +292,6 @@ class TestTicketHistoryCommand:
 		assert len(histories) == 0
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories_checking_pagination(self):
 		"""
 			Validar obtener el historial de cambios de
@@ -308,12 +304,14 @@ class TestTicketHistoryCommand:
 		ticket_id = ticket.id
 
 		histories_page_1 = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id,
 			page = 1,
 			pageSize = 3 
 		)
 
 		histories_page_2 = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id,
 			page = 2,
 			pageSize = 3 
@@ -333,7 +331,6 @@ class TestTicketHistoryCommand:
 		None,
 		4.4,
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories_with_wrong_ticket_id(self, ticket_id):
 		"""
 			Generar un error al enviar un valor incorrecto
@@ -343,6 +340,7 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		histories = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id
 		)
 
@@ -354,7 +352,6 @@ class TestTicketHistoryCommand:
 		{"page": 0.1, "pageSize": 5},
 		{"page": 1, "pageSize": 5.2}
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories_with_wrong_values_for_pagination(self, pagination):
 		"""
 			Generar un error al enviar un valor incorrecto
@@ -364,6 +361,7 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		histories = commands.command_get_ticket_histories(
+			db = self.db,
 			ticket_id = ticket.id,
 			page = pagination["page"],
 			pageSize = pagination["pageSize"]
@@ -371,7 +369,6 @@ class TestTicketHistoryCommand:
 
 
 	@pytest.mark.xfail(reason = "Sin ticket_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_ticket_histories_without_ticket_id(self):
 		"""
 			Generar un error al no eviar un valor
@@ -380,10 +377,9 @@ class TestTicketHistoryCommand:
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
-		histories = commands.command_get_ticket_histories()
+		histories = commands.command_get_ticket_histories(db = self.db)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_ticket_histories(self):
 		"""
 			Validar obtener el total de historial de cambios
@@ -393,13 +389,13 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		total_histories = commands.command_get_total_ticket_histories(
+			db = self.db,
 			ticket_id = ticket.id
 		)
 
 		assert total_histories == 4
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_ticket_histories_with_no_existent_ticket(self):
 		"""
 			Validar obtener el total de historial de cambios
@@ -412,6 +408,7 @@ class TestTicketHistoryCommand:
 		ticket_id = 100
 		
 		total_histories = commands.command_get_total_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id
 		)
 
@@ -419,7 +416,6 @@ class TestTicketHistoryCommand:
 
 
 	@pytest.mark.xfail(reason = "Sin ticket_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_ticket_histories_without_ticket_id(self):
 		"""
 			Generar un error al no eviar un valor para
@@ -428,7 +424,7 @@ class TestTicketHistoryCommand:
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
-		total_histories = commands.command_get_total_ticket_histories()
+		total_histories = commands.command_get_total_ticket_histories(db = self.db)
 
 	
 	@pytest.mark.xfail(reason = "Valor incorrecto para ticket_id", raises = ValidationError)
@@ -438,7 +434,6 @@ class TestTicketHistoryCommand:
 		None,
 		(12,4)
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_total_ticket_histories_with_wrong_ticket_id(self, ticket_id):
 		"""
 			Generar un error al eviar valores incorrectos
@@ -448,11 +443,11 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		total_histories = commands.command_get_total_ticket_histories(
+			db = self.db,
 			ticket_id = ticket_id
 		)
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_detail_ticket_history(self):
 		"""
 			Validar obtener el detalle de un 
@@ -463,6 +458,7 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		detail_history = commands.command_get_detail_ticket_history(
+			db = self.db,
 			history_id = 1
 		)
 
@@ -473,6 +469,7 @@ class TestTicketHistoryCommand:
 
 
 		detail_history = commands.command_get_detail_ticket_history(
+			db = self.db,
 			history_id = 3
 		)
 
@@ -481,7 +478,6 @@ class TestTicketHistoryCommand:
 
 
 	@pytest.mark.xfail(reason = "No existe este historial de cambios", raises = ValueError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_detail_with_no_existent_ticket_history(self):
 		"""
 			Intentar obtener el detalle de un historial
@@ -493,12 +489,12 @@ class TestTicketHistoryCommand:
 		history_id = 100
 		
 		detail_history = commands.command_get_detail_ticket_history(
+			db = self.db,
 			history_id = history_id
 		)
 
 
 	@pytest.mark.xfail(reason = "Sin history_id", raises = ValidationError)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_detail_ticket_history_without_history_id(self):
 		"""
 			Generar un error al no enviar un valor para
@@ -507,7 +503,7 @@ class TestTicketHistoryCommand:
 		ticket = create_ticket(db = self.db, project_id = self.project.id)
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
-		detail_history = commands.command_get_detail_ticket_history()
+		detail_history = commands.command_get_detail_ticket_history(db = self.db)
 
 
 	@pytest.mark.xfail(reason = "Valor incorrecto para history_id", raises = ValidationError)
@@ -517,7 +513,6 @@ class TestTicketHistoryCommand:
 		[1,3],
 		{"id": 1}
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_get_detail_ticket_history_wit_wrong_history_id(self, history_id):
 		"""
 			Generar un error al enviar un valor incorrecto para
@@ -527,6 +522,7 @@ class TestTicketHistoryCommand:
 		create_ticket_histories(db = self.db, ticket_id = ticket.id)
 
 		detail_history = commands.command_get_detail_ticket_history(
+			db = self.db,
 			history_id = history_id
 		)
 
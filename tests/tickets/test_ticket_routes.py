@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch
 
@@ -5,6 +6,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from sqlalchemy import func
+from sqlalchemy import event
 from sqlalchemy import select
 
 from pydantic import ValidationError
@@ -12,6 +14,7 @@ from pydantic import ValidationError
 from tests import ENGINE
 from tests import SESSION
 from tests import get_db
+from tests import verify_token_as
 from tests.tickets import set_ticket
 from tests.tickets import set_ticket_schema
 from tests.tickets import bulk_insert_ticket
@@ -20,6 +23,9 @@ from tests.tickets import bulk_insert_ticket_multiple_projects
 
 from main import app
 from apps import Model
+from apps import get_async_db
+from apps.utils.token.token import token_cache
+from apps.utils.cache.cache import detail_cache
 from apps.users.models import User
 from apps.projects.models import Project
 from apps.tickets.models import Ticket
@@ -51,10 +57,15 @@ ResponseTokenNoValido = {"detail": "Token no valido"}
 
 
 
+app.dependency_overrides[get_async_db] = get_db
+
 client = TestClient(app)
 
 class TestTicketRoute:
 	def setup_method(self):
+		token_cache.clear()
+		detail_cache.clear()
+
 		Model.metadata.drop_all(ENGINE)
 		Model.metadata.create_all(ENGINE)
 
@@ -126,8 +137,7 @@ class TestTicketRoute:
 		assert ticket.id == 1
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket(self, mockToken):
 		"""
 			Validar ruta para crear un ticket
@@ -161,8 +171,113 @@ class TestTicketRoute:
 		assert responseJson["project_id"] ==  ticket.project_id
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_create_tickets_bulk(self, mockToken):
+		"""
+			Validar ruta para crear varios tickets
+			en una sola petición
+		"""
+		self.headers.update(self.auth)
+
+		tickets = [
+			set_ticket_schema(title = f"Importado {i}", project_id = project_id).model_dump()
+			for i, project_id in enumerate([self.project.id, self.project_2.id, self.project.id])
+		]
+
+		response = client.post(
+			f"{self.url}/bulk",
+			headers = self.headers,
+			json = {"tickets": tickets}
+		)
+
+		responseStatus = response.status_code
+		responseJson = response.json()
+
+		assert responseStatus == 201
+		assert responseJson["total"] == 3
+		assert [ticket["id"] for ticket in responseJson["tickets"]] == [2, 3, 4]
+		assert [ticket["title"] for ticket in responseJson["tickets"]] == [ticket["title"] for ticket in tickets]
+		assert responseJson["tickets"][1]["project_id"] == self.project_2.id
+		assert responseJson["tickets"][0]["state"] == ChoicesState.nuevo.name
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_create_tickets_bulk_with_wrong_project(self, mockToken):
+		"""
+			Intentar crear varios tickets cuando
+			uno de los proyectos no existe
+		"""
+		self.headers.update(self.auth)
+
+		tickets = [
+			set_ticket_schema(project_id = self.project.id).model_dump(),
+			set_ticket_schema(project_id = 100).model_dump(),
+		]
+
+		response = client.post(
+			f"{self.url}/bulk",
+			headers = self.headers,
+			json = {"tickets": tickets}
+		)
+
+		responseStatus = response.status_code
+		responseJson = response.json()
+
+		assert responseStatus == 404
+		assert responseJson == {"message": DoesNotExistsProject.get(id = 100)}
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_update_tickets_bulk(self, mockToken):
+		"""
+			Validar ruta para actualizar todos los tickets
+			de un proyecto que cumplen un filtro
+		"""
+		self.headers.update(self.auth)
+
+		bulk_insert_ticket(self.db)
+
+		response = client.put(
+			f"{self.url}/bulk",
+			headers = self.headers,
+			json = {
+				"update": {"state": "terminado"},
+				"project_id": self.project.id,
+				"filter": {"state": "desarrollo"}
+			}
+		)
+
+		responseStatus = response.status_code
+		responseJson = response.json()
+
+		assert responseStatus == 200
+		assert responseJson["total"] == 2
+		assert {ticket["title"] for ticket in responseJson["tickets"]} == {"Endpoints", "Limites de petición"}
+		assert all(ticket["state"] == ChoicesState.terminado.name for ticket in responseJson["tickets"])
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_update_tickets_bulk_with_ids_and_project(self, mockToken):
+		"""
+			Intentar actualizar varios tickets enviando
+			'ids' y 'project_id' a la vez
+		"""
+		self.headers.update(self.auth)
+
+		response = client.put(
+			f"{self.url}/bulk",
+			headers = self.headers,
+			json = {
+				"update": {"state": "terminado"},
+				"ids": [self.ticket.id],
+				"project_id": self.project.id
+			}
+		)
+
+		assert response.status_code == 422
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_wrong_priority(self, mockToken):
 		"""
 			Intentar crear un nuevo ticket
@@ -191,8 +306,7 @@ class TestTicketRoute:
 		assert responseJson["message"] == f"La prioridad elegida es incorrecta, debe ser: {str_choices_priority} alguna de estás opciones."
 		assert responseJson["detail"] == f"Input error: {priority}"
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_too_long_title(self, mockToken):
 		"""
 			Intentar crear un ticket con un titulo
@@ -226,8 +340,7 @@ class TestTicketRoute:
 		assert responseJson["detail"] == f"Input error: {title}"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_too_short_title(self, mockToken):
 		"""
 			Intentar crear un ticket con un titulo
@@ -256,8 +369,7 @@ class TestTicketRoute:
 		assert responseJson["detail"] == f"Input error: {title}"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_without_title(self, mockToken):
 		"""
 			Intentar crear un ticket sin enviar
@@ -283,8 +395,7 @@ class TestTicketRoute:
 		assert "detail" not in responseJson
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_too_long_description(self, mockToken):
 		"""
 			Intentar crear un ticket con una descripción
@@ -335,8 +446,7 @@ class TestTicketRoute:
 		assert responseJson["detail"] == f"Input error: {description}"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_too_short_description(self, mockToken):
 		"""
 			Intentar crear un ticket con una descripción
@@ -366,8 +476,7 @@ class TestTicketRoute:
 		assert responseJson["detail"] == f"Input error: {description}"
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_without_description(self, mockToken):
 		"""
 			Intentar crear un ticket sin una
@@ -395,8 +504,7 @@ class TestTicketRoute:
 		assert responseJson["description"] == None
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_create_ticket_with_no_existent_project(self, mockToken):
 		"""
 			Intentar crear un ticket con un ID
@@ -428,7 +536,6 @@ class TestTicketRoute:
 		assert responseJson == {"message": DoesNotExistsProject.get(id = project_id)}
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_create_ticket_without_authorization(self):
 		"""
 			Intentar crear un ticket pero,
@@ -454,7 +561,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_create_ticket_with_expired_token(self):
 		"""
 			Intentar crear un ticket pero,
@@ -483,8 +589,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_id(self, mockToken):
 		"""
 			Validar obtener un ticket por su ID
@@ -514,8 +619,42 @@ class TestTicketRoute:
 		assert responseJson["project"]["id"] == self.ticket.project_id
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_id_not_modified(self, mockToken):
+		"""
+			Validar el 304 con If-None-Match o If-Modified-Since
+			y que un cambio en el ticket cambie su ETag
+		"""
+		self.headers.update(self.auth)
+
+		response = client.get(f"{self.url}/{self.ticket.id}", headers = self.headers)
+
+		etag = response.headers["ETag"]
+		last_modified = response.headers["Last-Modified"]
+
+		assert response.status_code == 200
+		assert response.headers["Cache-Control"] == "private, no-cache"
+
+		response = client.get(f"{self.url}/{self.ticket.id}", headers = {**self.headers, "If-None-Match": etag})
+
+		assert response.status_code == 304
+		assert response.headers["ETag"] == etag
+		assert response.content == b""
+
+		response = client.get(f"{self.url}/{self.ticket.id}", headers = {**self.headers, "If-Modified-Since": last_modified})
+
+		assert response.status_code == 304
+
+		client.put(f"{self.url}/{self.ticket.id}", headers = self.headers, json = {"title": "Tarea actualizada"})
+
+		response = client.get(f"{self.url}/{self.ticket.id}", headers = {**self.headers, "If-None-Match": etag})
+
+		assert response.status_code == 200
+		assert response.headers["ETag"] != etag
+		assert response.json()["title"] == "Tarea actualizada"
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_with_no_existent_ticket(self, mockToken):
 		"""
 			Intentar obtener un ticket por un ID
@@ -545,8 +684,7 @@ class TestTicketRoute:
 		12.2,
 		None
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_id_wit_wrong_ticket_id(self, mockToken, ticket_id):
 		"""
 			Intentar obtener un ticket pero,
@@ -569,7 +707,6 @@ class TestTicketRoute:
 		assert responseStatus == 422
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_by_id_without_authorization(self):
 		"""
 			Intentar obtener un ticket por su ID pero,
@@ -589,7 +726,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_by_id_with_expired_token(self):
 		"""
 			Intentar obtener un ticket por su ID pero,
@@ -622,9 +758,7 @@ class TestTicketRoute:
 		({"type": "archivado"}, 2),
 		({"type": "cerrado"}, 1)
 	])
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter(self, mockToken, search, total_search):
 		"""
 			Validar obtener tickets aplicando un filtro
@@ -660,9 +794,150 @@ class TestTicketRoute:
 		assert responseJson["content"]["tickets"][0][key] == value
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_filter_counts_once(self, mockToken):
+		"""
+			Validar que el total del ETag se reusa en la página:
+			un solo conteo por listado
+		"""
+		bulk_insert_ticket(db = self.db)
+
+		self.headers.update(self.auth)
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			response = client.get(
+				f"{self.url}/project/{self.project.id}/search",
+				headers = self.headers,
+				params = {"priority": "alta", "pageSize": 2}
+			)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert response.status_code == 200
+		assert response.json()["content"]["total"] == 3
+		assert len(response.json()["content"]["tickets"]) == 2
+		assert sum("count(" in query.lower() for query in queries) == 1
+
+		queries.clear()
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			response = client.get(f"{self.url}/{self.ticket.id}/history", headers = self.headers)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert response.status_code == 200
+		assert sum("count(" in query.lower() for query in queries) == 1
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_filter_not_modified(self, mockToken):
+		"""
+			Validar que un listado sin cambios responde 304 sin
+			consultar la página de tickets
+		"""
+		bulk_insert_ticket(db = self.db)
+
+		self.headers.update(self.auth)
+
+		url = f"{self.url}/project/{self.project.id}/search"
+		params = {"priority": "alta", "pageSize": 2}
+
+		response = client.get(url, headers = self.headers, params = params)
+		etag = response.headers["ETag"]
+
+		assert response.status_code == 200
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(ENGINE, "before_cursor_execute", count_query)
+
+		try:
+			response = client.get(url, headers = {**self.headers, "If-None-Match": etag}, params = params)
+		finally:
+			event.remove(ENGINE, "before_cursor_execute", count_query)
+
+		assert response.status_code == 304
+		assert any("max(ticket.updated)" in query for query in queries)
+		assert not any("LIMIT" in query for query in queries)
+
+		# Otra página es otro ETag
+		response = client.get(url, headers = {**self.headers, "If-None-Match": etag}, params = {**params, "page": 2})
+
+		assert response.status_code == 200
+
+		self.db.add(set_ticket(title = "Tarea nueva", priority = "alta", project_id = self.project.id))
+		self.db.commit()
+
+		response = client.get(url, headers = {**self.headers, "If-None-Match": etag}, params = params)
+
+		assert response.status_code == 200
+		assert response.json()["content"]["total"] == 4
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_filter_with_cursor(self, mockToken):
+		"""
+			Validar obtener tickets de un proyecto
+			usando la paginación por cursor
+		"""
+		bulk_insert_ticket(db = self.db)
+
+		mockToken.result_value.state.result_value = True
+
+		self.headers.update(self.auth)
+		
+		project_id = self.project.id
+		
+		response = client.get(
+			f"{self.url}/project/{project_id}/search",
+			headers = self.headers,
+			params = {"pageSize": 5}
+		)
+
+		responseJson = response.json()
+
+		assert response.status_code == 200
+		assert responseJson["cursor"] is not None
+
+		response_next = client.get(
+			f"{self.url}/project/{project_id}/search",
+			headers = self.headers,
+			params = {"pageSize": 5, "cursor": responseJson["cursor"]}
+		)
+
+		responseNextJson = response_next.json()
+
+		assert response_next.status_code == 200
+		assert responseNextJson["content"]["total"] is None
+		assert [ticket["id"] for ticket in responseNextJson["content"]["tickets"]] == [6, 7, 8, 9, 10]
+		assert "cursor=" in responseNextJson["next"]
+		assert "cursor=" in responseNextJson["previous"]
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_filter_with_invalid_cursor(self, mockToken):
+		"""
+			Intentar obtener tickets enviando un cursor invalido
+		"""
+		mockToken.result_value.state.result_value = True
+
+		self.headers.update(self.auth)
+
+		response = client.get(
+			f"{self.url}/project/{self.project.id}/search",
+			headers = self.headers,
+			params = {"cursor": "cursor-invalido"}
+		)
+
+		assert response.status_code == 400
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_with_wrong_value_filter(self, mockToken):
 		"""
 			Intentar obtener tickets aplicando
@@ -720,9 +995,7 @@ class TestTicketRoute:
 		assert responseJson["detail"] == f"Input error: {search_type['type']}"
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_with_no_existent_project(self, mockToken):
 		"""
 			Intentar obtener todos los tickets de
@@ -752,9 +1025,7 @@ class TestTicketRoute:
 		assert responseJson == {"message": DoesNotExistsProject.get(id = project_id)}
 
 	
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_checking_pagination(self, mockToken):
 		"""
 			Validar el funcionamiento de la paginación
@@ -839,9 +1110,7 @@ class TestTicketRoute:
 		),
 
 	])
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_with_wrong_value_pagination(self, mockToken, pagination, errors):
 		"""
 			Intentar obtener todos los tickets de
@@ -875,9 +1144,7 @@ class TestTicketRoute:
 		assert responseJson == errors
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_with_too_high_page(self, mockToken):
 		"""
 			Intentar obtener todos los tickets de
@@ -921,9 +1188,7 @@ class TestTicketRoute:
 		assert len(responseJson["content"]["tickets"]) == 0
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_filter_without_filter_search(self, mockToken):
 		"""
 			Intentar obtener todos los tickets de
@@ -972,8 +1237,6 @@ class TestTicketRoute:
 		assert len(responseJson["content"]["tickets"]) == 4
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_by_filter_without_authorization(self):
 		"""
 			Intentar obtener todos los tickets de
@@ -1001,8 +1264,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_by_filter_with_expired_token(self):
 		"""
 			Intentar obtener todos los tickets de
@@ -1034,8 +1295,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_title(self, mockToken):
 		"""
 			Obtener un ticket haciendo una busqueda
@@ -1063,8 +1323,8 @@ class TestTicketRoute:
 		responseJson = response.json()
 
 		assert responseStatus == 200
-		assert responseJson["tickets"]
-		assert ticket.title in responseJson["tickets"][0]["title"]
+		assert responseJson["content"]["tickets"]
+		assert ticket.title in responseJson["content"]["tickets"][0]["title"]
 
 
 		project_id = 2
@@ -1082,13 +1342,12 @@ class TestTicketRoute:
 		responseJson = response.json()
 
 		assert responseStatus == 200
-		assert responseJson["tickets"]
-		assert len(responseJson["tickets"]) == 2
-		assert ticket.title in responseJson["tickets"][0]["title"]
+		assert responseJson["content"]["tickets"]
+		assert len(responseJson["content"]["tickets"]) == 2
+		assert ticket.title in responseJson["content"]["tickets"][0]["title"]
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_title_with_no_existent_project(self, mockToken):
 		"""
 			Intentar obtener un ticket por su titulo,
@@ -1115,12 +1374,11 @@ class TestTicketRoute:
 		responseJson = response.json()
 
 		assert responseStatus == 200
-		assert not responseJson["tickets"]
-		assert len(responseJson["tickets"]) == 0
+		assert not responseJson["content"]["tickets"]
+		assert len(responseJson["content"]["tickets"]) == 0
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_title_with_wrong_title(self, mockToken):
 		"""
 			Intentar obtener un ticket 
@@ -1154,8 +1412,7 @@ class TestTicketRoute:
 		assert responseStatus == 422
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_title_with_not_find_ticket(self, mockToken):
 		"""
 			Intentar obtener un ticket por su titulo,
@@ -1183,12 +1440,11 @@ class TestTicketRoute:
 		responseJson = response.json()
 
 		assert responseStatus == 200
-		assert not responseJson["tickets"]
-		assert len(responseJson["tickets"]) == 0
+		assert not responseJson["content"]["tickets"]
+		assert len(responseJson["content"]["tickets"]) == 0
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_by_title_without_title(self, mockToken):
 		"""
 			Intentar obtener un ticket 
@@ -1215,8 +1471,102 @@ class TestTicketRoute:
 		assert responseJson == {"message": "Field required"}
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_title_with_pagination(self, mockToken):
+		"""
+			Validar que la busqueda por titulo devuelve
+			la página, el total y los enlaces de paginación
+		"""
+		bulk_insert_ticket_multiple_projects(db = self.db)
+
+		mockToken.result_value.state.result_value = True
+
+		self.headers.update(self.auth)
+
+		project_id = 2
+
+		response = client.get(
+			f"{self.url}/project/{project_id}/ticket",
+			headers = self.headers,
+			params = {"title": "API", "page": 1, "pageSize": 1}
+		)
+
+		responseStatus = response.status_code
+		responseJson = response.json()
+
+		assert responseStatus == 200
+		assert responseJson["current"] == 1
+		assert responseJson["previous"] is None
+		assert "title=API" in responseJson["next"]
+		assert "page=2" in responseJson["next"]
+		assert responseJson["content"]["total"] == 2
+		assert len(responseJson["content"]["tickets"]) == 1
+
+		response = client.get(
+			f"{self.url}/project/{project_id}/ticket",
+			headers = self.headers,
+			params = {"title": "API", "page": 2, "pageSize": 1}
+		)
+
+		responseJson = response.json()
+
+		assert response.status_code == 200
+		assert responseJson["next"] is None
+		assert responseJson["previous"] is not None
+		assert len(responseJson["content"]["tickets"]) == 1
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_title_with_stream(self, mockToken):
+		"""
+			Validar que con 'stream' se devuelven todos
+			los resultados como NDJSON
+		"""
+		bulk_insert_ticket_multiple_projects(db = self.db)
+
+		mockToken.result_value.state.result_value = True
+
+		self.headers.update(self.auth)
+
+		project_id = 2
+
+		response = client.get(
+			f"{self.url}/project/{project_id}/ticket",
+			headers = self.headers,
+			params = {"title": "API", "pageSize": 1, "stream": True}
+		)
+
+		lines = [json.loads(line) for line in response.text.splitlines()]
+
+		assert response.status_code == 200
+		assert response.headers["content-type"].startswith("application/x-ndjson")
+		assert len(lines) == 2
+		assert all("API" in line["title"] for line in lines)
+		assert all(line["project_id"] == project_id for line in lines)
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_route_get_ticket_by_title_with_cursor(self, mockToken):
+		"""
+			Intentar paginar la busqueda por titulo
+			con un cursor
+		"""
+		bulk_insert_ticket_multiple_projects(db = self.db)
+
+		mockToken.result_value.state.result_value = True
+
+		self.headers.update(self.auth)
+
+		response = client.get(
+			f"{self.url}/project/2/ticket",
+			headers = self.headers,
+			params = {"title": "API", "cursor": "eyJrIjoxLCJkIjoibiJ9"}
+		)
+
+		assert response.status_code == 400
+		assert response.json()["message"]
+
+
 	def test_route_get_ticket_by_title_without_authorization(self):
 		"""
 			Intentar obtener un ticket por su titulo,
@@ -1242,8 +1592,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.projects.commands.commands.get_db", get_db)
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_by_title_with_expired_token(self):
 		"""
 			Intentar obtener un ticket por su titulo,
@@ -1273,8 +1621,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket(self, mockToken):
 		"""
 			Validar actualizar un ticket
@@ -1309,8 +1656,7 @@ class TestTicketRoute:
 		assert responseJson["priority"] != old_ticket.priority.name
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket_with_no_existent_ticket(self, mockToken):
 		"""
 			Intentar actualizar un ticket, pero 
@@ -1355,8 +1701,7 @@ class TestTicketRoute:
 		)
 
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket_with_wrong_options(self, mockToken, options, error):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1401,8 +1746,7 @@ class TestTicketRoute:
 		)
 
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket_with_wrong_title(self, mockToken, update_ticket, error):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1454,8 +1798,7 @@ class TestTicketRoute:
 		)
 
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket_with_wrong_description(self, mockToken, update_ticket, error):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1481,8 +1824,7 @@ class TestTicketRoute:
 		assert responseJson["message"] == error
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_update_ticket_with_nothing(self, mockToken):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1509,7 +1851,6 @@ class TestTicketRoute:
 		assert responseJson == {"message": EmptyValues.get()}
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_update_ticket_without_authorization(self):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1532,7 +1873,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_update_ticket_with_expired_token(self):
 		"""
 			Intentar actualizar un ticket, pero
@@ -1560,8 +1900,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_delete_ticket(self, mockToken):
 		"""
 			Validar que se elimine un ticket
@@ -1582,8 +1921,7 @@ class TestTicketRoute:
 		assert responseStatus == 204
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_delete_ticket_with_no_existent_ticket(self, mockToken):
 		"""
 			Intentar eliminar un ticket, pero
@@ -1613,8 +1951,7 @@ class TestTicketRoute:
 		None,
 		1.5,
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_delete_ticket_with_wrong_ticket_id(self, mockToken, ticket_id):
 		"""
 			Intentar eliminar un ticket, pero
@@ -1634,7 +1971,6 @@ class TestTicketRoute:
 		assert responseStatus == 422
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_delete_ticket_without_autorization(self):
 		"""
 			Intentar eliminar un ticket, pero
@@ -1654,7 +1990,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_delete_ticket_with_token_expired(self):
 		"""
 			Intentar eliminar un ticket, pero
@@ -1677,8 +2012,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_ticket_history_by_ticket(self, mockToken):
 		"""
 			Validar obtener el listado de cambios
@@ -1710,8 +2044,7 @@ class TestTicketRoute:
 		assert responseJson["content"]["histories"][1]["state"] == StateTicketHistory.actualizar.name
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_ticket_history_by_ticket_with_no_existent_ticket(self, mockToken):
 		"""
 			Intenatr obtener el listado de cambios
@@ -1736,8 +2069,7 @@ class TestTicketRoute:
 
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_ticket_history_by_ticket_checking_pagination(self, mockToken):
 		"""
 			Validar obtener el listado de cambios
@@ -1821,8 +2153,7 @@ class TestTicketRoute:
 			"Input should be less than or equal to 20"
 		),
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_ticket_history_by_ticket_with_wron_value_pagination(self, mockToken, pagination, error):
 		"""
 			Intentar obtener el listado de cambios
@@ -1849,7 +2180,6 @@ class TestTicketRoute:
 		assert responseJson["message"] == error
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)	
 	def test_route_ticket_history_by_ticket_without_authorization(self):
 		"""
 			Intentar obtener el listado de cambios
@@ -1871,7 +2201,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_ticket_history_by_ticket_with_expired_token(self):
 		"""
 			Intentar obtener el listado de cambios
@@ -1894,8 +2223,7 @@ class TestTicketRoute:
 		assert responseJson == ResponseTokenNoValido
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_history(self, mockToken):
 		"""
 			Validar obtener el detalle de historial
@@ -1936,8 +2264,7 @@ class TestTicketRoute:
 		assert responseJson["state"] == StateTicketHistory.actualizar.name
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_history_with_no_existent_ticket_history(self, mockToken):
 		"""
 			Intentar obtener el detalle de historial
@@ -1968,8 +2295,7 @@ class TestTicketRoute:
 		12.45,
 		None
 	])
-	@patch("apps.tickets.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_route_get_ticket_history_with_wrong_history_id(self, mockToken, history_id):
 		"""
 			Intentar obtener el detalle de historial
@@ -1991,7 +2317,6 @@ class TestTicketRoute:
 		assert responseStatus == 422
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_history_without_authorization(self):
 		"""
 			Intentar obtener el detalle de historial
@@ -2013,7 +2338,6 @@ class TestTicketRoute:
 		assert responseJson == ResponseNoToken
 
 
-	@patch("apps.tickets.commands.commands.get_db", get_db)
 	def test_route_get_ticket_history_with_token_expired(self):
 		"""
 			Intentar obtener el detalle de historial
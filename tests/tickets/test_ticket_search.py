@@ -0,0 +1,313 @@
+import pytest
+
+from sqlalchemy import event
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from apps import Model
+from apps.users.models import User
+from apps.projects.models import Project
+from apps.tickets.models import Ticket
+from apps.tickets.commands.utils import search
+
+
+TICKETS = [
+	{"title": "Interfaz Grafica", "description": "Pantalla de formularios"},
+	{"title": "Formularios", "description": None},
+	{"title": "Descuento del 50%", "description": None},
+	{"title": "Endpoints", "description": "Limites de petición"},
+]
+
+
+class TestTicketSearch:
+
+	def setup_method(self, method):
+		self.engine = create_engine("sqlite://")
+		Model.metadata.create_all(self.engine)
+
+		self.db = Session(self.engine)
+
+		user = User(
+			name = 'bolivar',
+			email = 'bolivar@gmail.com',
+			username = 'bolivar19',
+			password = '12345'
+		)
+		self.db.add(user)
+		self.db.commit()
+
+		project = Project(title = "Proyecto de tests", description = "Proyecto para hacer tests", user_id = user.id)
+		self.db.add(project)
+		self.db.commit()
+
+		self.project_id = project.id
+
+	def teardown_method(self, method):
+		self.db.close()
+		self.engine.dispose()
+
+	def insert_tickets(self):
+		self.db.execute(
+			insert(Ticket),
+			[{**ticket, "project_id": self.project_id} for ticket in TICKETS]
+		)
+		self.db.commit()
+
+
+	def test_create_search_index_sqlite(self):
+		"""
+			Validar que se crea la tabla FTS5, se llena con los
+			tickets existentes y se usa en modo 'auto'
+		"""
+		self.insert_tickets()
+
+		assert search.get_search_backend(db = self.db, backend = search.SearchAuto) == search.SearchMemory
+
+		assert search.create_search_index(self.engine) == search.SearchFTS
+		assert search.create_search_index(self.engine) == search.SearchFTS
+
+		assert search.get_search_backend(db = self.db, backend = search.SearchAuto) == search.SearchFTS
+
+		tickets, total = search.search_tickets(
+			db = self.db,
+			project_id = self.project_id,
+			value = "formulario",
+			backend = search.SearchAuto
+		)
+
+		assert total == 2
+		assert tickets[0].title == "Formularios"
+
+
+	def test_search_fts_follows_changes(self):
+		"""
+			Validar que los triggers mantienen la tabla FTS5
+			al crear, actualizar y eliminar tickets
+		"""
+		search.create_search_index(self.engine)
+		self.insert_tickets()
+
+		self.db.execute(
+			update(Ticket)
+			.where(Ticket.title == "Endpoints")
+			.values(title = "Formulario API")
+		)
+		self.db.commit()
+
+		tickets, total = search.search_tickets(
+			db = self.db,
+			project_id = self.project_id,
+			value = "formulario",
+			backend = search.SearchFTS
+		)
+
+		assert total == 3
+
+		self.db.delete(tickets[0])
+		self.db.commit()
+
+		_, total = search.search_tickets(
+			db = self.db,
+			project_id = self.project_id,
+			value = "formulario",
+			backend = search.SearchFTS
+		)
+
+		assert total == 2
+
+
+	@pytest.mark.parametrize("backend", [
+		search.SearchFTS,
+		search.SearchMemory,
+		search.SearchLike,
+	])
+	def test_search_backends_same_results(self, backend):
+		"""
+			Validar que todos los motores encuentran los mismos
+			tickets, incluso con búsquedas cortas o con '%'
+		"""
+		search.create_search_index(self.engine)
+		self.insert_tickets()
+
+		expected = {
+			"formulario": {"Interfaz Grafica", "Formularios"},
+			"50%": {"Descuento del 50%"},
+			"te": {"Interfaz Grafica", "Endpoints"},
+			"petición": {"Endpoints"},
+			"no existe": set(),
+		}
+
+		for value, titles in expected.items():
+			tickets, total = search.search_tickets(
+				db = self.db,
+				project_id = self.project_id,
+				value = value,
+				backend = backend
+			)
+
+			assert total == len(titles)
+			assert {ticket.title for ticket in tickets} == titles
+
+
+	@pytest.mark.parametrize("backend", [
+		search.SearchFTS,
+		search.SearchMemory,
+		search.SearchLike,
+	])
+	def test_stream_tickets(self, backend):
+		"""
+			Validar que el stream entrega todos los resultados
+			en orden y sin acumularlos en la sesión
+		"""
+		search.create_search_index(self.engine)
+
+		self.db.execute(
+			insert(Ticket),
+			[{"title": f"API {i}", "project_id": self.project_id} for i in range(25)]
+		)
+		self.db.commit()
+
+		tickets, total = search.search_tickets(
+			db = self.db,
+			project_id = self.project_id,
+			value = "api",
+			pageSize = 20,
+			backend = backend
+		)
+
+		result = search.stream_tickets(
+			db = self.db,
+			project_id = self.project_id,
+			value = "api",
+			chunk_size = 10,
+			backend = backend
+		)
+
+		ids = [ticket.id for ticket in result]
+
+		assert len(ids) == total == 25
+		assert ids[:20] == [ticket.id for ticket in tickets]
+		assert len(self.db.identity_map) == 0
+
+
+	def test_search_memory_reuses_index(self):
+		"""
+			Validar que el índice en memoria no se reconstruye: solo
+			agrega los tickets nuevos del proyecto
+		"""
+		self.insert_tickets()
+
+		search.search_tickets(db = self.db, project_id = self.project_id, value = "formulario", backend = search.SearchMemory)
+		builds = search.trigram_index.builds
+
+		search.search_tickets(db = self.db, project_id = self.project_id, value = "endpoint", backend = search.SearchMemory)
+		assert search.trigram_index.builds == builds
+
+		self.db.add(Ticket(title = "Endpoint nuevo", project_id = self.project_id))
+		self.db.commit()
+
+		refreshes = search.trigram_index.refreshes
+
+		tickets, total = search.search_tickets(db = self.db, project_id = self.project_id, value = "endpoint", backend = search.SearchMemory)
+
+		assert search.trigram_index.builds == builds
+		assert search.trigram_index.refreshes == refreshes + 1
+		assert total == 2
+
+
+	def test_search_memory_follows_changes(self):
+		"""
+			Validar que las actualizaciones y eliminaciones (una por una o
+			por lotes con sus IDs) cambian solo esos tickets del índice
+		"""
+		self.insert_tickets()
+
+		def titles(value):
+			tickets, _ = search.search_tickets(db = self.db, project_id = self.project_id, value = value, backend = search.SearchMemory)
+
+			return {ticket.title for ticket in tickets}
+
+		assert titles("formulario") == {"Interfaz Grafica", "Formularios"}
+		builds = search.trigram_index.builds
+
+		ticket_id = self.db.scalar(select(Ticket.id).where(Ticket.title == "Endpoints"))
+		self.db.execute(update(Ticket).where(Ticket.id == ticket_id).values(title = "Formulario API"))
+		self.db.commit()
+
+		assert titles("formulario") == {"Interfaz Grafica", "Formularios", "Formulario API"}
+		assert titles("endpoint") == set()
+
+		ids = self.db.scalars(select(Ticket.id).where(Ticket.title.in_(["Formularios", "Descuento del 50%"]))).all()
+		self.db.execute(update(Ticket).where(Ticket.id.in_(ids)).values(description = "Pantalla nueva"))
+		self.db.commit()
+
+		assert titles("pantalla") == {"Interfaz Grafica", "Formularios", "Descuento del 50%"}
+
+		self.db.delete(self.db.get(Ticket, ticket_id))
+		self.db.commit()
+
+		assert titles("formulario") == {"Interfaz Grafica", "Formularios"}
+		assert search.trigram_index.builds == builds
+
+
+	def test_search_memory_bulk_invalidates_project(self):
+		"""
+			Validar que un UPDATE por lotes de un proyecto solo
+			reconstruye el índice de ese proyecto
+		"""
+		self.insert_tickets()
+
+		other = Project(title = "Otro proyecto", description = "Otro proyecto para tests", user_id = self.db.get(Project, self.project_id).user_id)
+		self.db.add(other)
+		self.db.commit()
+
+		self.db.execute(insert(Ticket), [{"title": "Formulario externo", "project_id": other.id}])
+		self.db.commit()
+
+		for project_id in (self.project_id, other.id):
+			search.search_tickets(db = self.db, project_id = project_id, value = "formulario", backend = search.SearchMemory)
+
+		builds = search.trigram_index.builds
+
+		self.db.execute(update(Ticket).where(Ticket.project_id == self.project_id).values(description = "Cambiado"))
+		self.db.commit()
+
+		_, total = search.search_tickets(db = self.db, project_id = other.id, value = "formulario", backend = search.SearchMemory)
+
+		assert total == 1
+		assert search.trigram_index.builds == builds
+
+		_, total = search.search_tickets(db = self.db, project_id = self.project_id, value = "cambiado", backend = search.SearchMemory)
+
+		assert total == len(TICKETS)
+		assert search.trigram_index.builds == builds + 1
+
+
+	def test_search_backend_detected_once(self):
+		"""
+			Validar que 'auto' no consulta 'sqlite_master' en cada búsqueda
+		"""
+		search.create_search_index(self.engine)
+
+		queries = []
+		count_query = lambda *args: queries.append(args[2])
+		event.listen(self.engine, "before_cursor_execute", count_query)
+
+		try:
+			for _ in range(3):
+				assert search.get_search_backend(db = self.db, backend = search.SearchAuto) == search.SearchFTS
+		finally:
+			event.remove(self.engine, "before_cursor_execute", count_query)
+
+		assert queries == []
+
+
+	def test_search_with_unknown_backend(self):
+		"""
+			Generar un error con un motor de búsqueda desconocido
+		"""
+		with pytest.raises(ValueError):
+			search.get_search_backend(db = self.db, backend = "elastic")
@@ -1,10 +1,20 @@
 import os
+import asyncio
+import threading
 import pytest
+from unittest.mock import patch
+
+from sqlalchemy.util.concurrency import greenlet_spawn
 
 from pydantic import ValidationError
 
 from apps.users.commands.utils.password import HashPassword
 from apps.users.commands.utils.password import ValidateHashedPassword
+from apps.users.commands.utils.password import PasswordExecutor
+from apps.users.commands.utils.password import get_cost
+from apps.users.commands.utils.password import needs_rehash
+from apps.users.commands.utils.benchmark import benchmark_hash
+from apps.users.commands.utils.benchmark import choose_rounds
 
 
 def test_valid_hash_password():
@@ -75,3 +85,89 @@ def test_invalid_validation_of_params(password, hashed):
 		passwordHashed = hashed
 	)
 
+
+
+def test_password_executor_rejects_when_full():
+	""" Validar que el pool rechaza tareas cuando no quedan espacios """
+	executor = PasswordExecutor(workers = 1, queue_size = 1)
+	release = threading.Event()
+
+	running = [executor.submit(release.wait) for _ in range(2)]
+
+	with pytest.raises(ValueError) as error:
+		executor.submit(release.wait)
+
+	assert error.value.args[1] == 503
+	assert executor.rejected == 1
+
+	release.set()
+
+	for future in running:
+		future.result(timeout = 5)
+
+	assert executor.run(sum, [1, 2]) == 3
+
+
+def test_password_executor_async():
+	""" Validar la API asíncrona y la espera dentro de un greenlet """
+	executor = PasswordExecutor(workers = 1, queue_size = 0)
+
+	async def main():
+		result = await executor.arun(sum, [1, 2])
+		result_greenlet = await greenlet_spawn(executor.run, sum, [3, 4])
+
+		return result, result_greenlet
+
+	assert asyncio.run(main()) == (3, 7)
+
+
+def test_password_executor_run_in_caller_thread():
+	""" 
+		Validar que fuera de un greenlet 'run' no ocupa otro hilo:
+		corre en el hilo que lo llama y respeta el límite del pool
+	"""
+	executor = PasswordExecutor(workers = 1, queue_size = 0)
+
+	assert executor.run(threading.current_thread) is threading.current_thread()
+
+	release = threading.Event()
+	running = executor.submit(release.wait)
+
+	with pytest.raises(ValueError) as error:
+		executor.run(sum, [1, 2])
+
+	assert error.value.args[1] == 503
+
+	release.set()
+	running.result(timeout = 5)
+
+	assert executor.run(sum, [1, 2]) == 3
+
+
+@patch("apps.users.commands.utils.password.PASSWORD_BCRYPT_ROUNDS", 4)
+def test_hash_password_with_configured_rounds():
+	""" Validar que el hash usa el costo configurado """
+	hashed = HashPassword.getHash("12345")
+
+	assert get_cost(hashed) == 4
+	assert get_cost(hashed.decode("utf-8")) == 4
+	assert not needs_rehash(hashed)
+	assert needs_rehash(hashed, rounds = 10)
+
+
+def test_get_cost_with_invalid_hash():
+	""" Validar el error con un hash que no es de bcrypt """
+	with pytest.raises(ValueError):
+		get_cost(b"12345")
+
+
+def test_benchmark_hash():
+	""" Validar el resultado del benchmark de bcrypt """
+	result = benchmark_hash(rounds = [4, 5], samples = 1)
+
+	assert list(result.keys()) == [4, 5]
+	assert result[4]["median_ms"] > 0
+	assert result[4]["max_ms"] >= result[4]["median_ms"]
+
+	assert choose_rounds(budget_ms = 10_000, rounds = [4], samples = 1) == 4
+	assert choose_rounds(budget_ms = 0, rounds = [4], samples = 1) is None
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from sqlalchemy import event
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from tests import verify_token_as
+from tests.users import set_user_schema
+
+from main import app
+from apps import Model
+from apps import get_async_db
+from apps.utils.token.token import token_cache
+from apps.users.models import User
+from apps.users.schemas import schemas
+from apps.users.commands.utils.password import get_cost
+
+
+client = TestClient(app)
+
+class TestAsyncRouterUser:
+	"""
+		Rutas con ASYNC_DB_URL: 'get_async_db' entrega una 'AsyncSession'
+		(aiosqlite) y los 'commands' corren con 'run_sync'.
+	"""
+
+	def setup_method(self):
+		token_cache.clear()
+
+		# Los otros tests reemplazan 'get_async_db' por una sesión síncrona
+		self.override = app.dependency_overrides.pop(get_async_db, None)
+
+		self.directory = tempfile.mkdtemp()
+		path = os.path.join(self.directory, "async.db")
+
+		self.engine = create_engine(f"sqlite:///{path}")
+		Model.metadata.create_all(self.engine)
+
+		# Sin pool: cada petición del TestClient puede correr en otro event loop
+		self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass = NullPool)
+
+		self.queries = []
+		event.listen(self.async_engine.sync_engine, "before_cursor_execute", self.count_query)
+
+		self.async_session = patch(
+			"apps.async_session",
+			async_sessionmaker(autoflush = False, expire_on_commit = False, bind = self.async_engine)
+		)
+		self.async_session.start()
+
+		self.url = "/user"
+		self.headers = {"Content-Type": "application/json"}
+		self.auth = {"Authorization": "Bearer token-key"}
+
+	def teardown_method(self):
+		self.async_session.stop()
+
+		if self.override is not None:
+			app.dependency_overrides[get_async_db] = self.override
+
+		event.remove(self.async_engine.sync_engine, "before_cursor_execute", self.count_query)
+
+		self.engine.dispose()
+		shutil.rmtree(self.directory)
+
+	def count_query(self, *args):
+		self.queries.append(args[2])
+
+	def create_user(self):
+		response = client.post(f"{self.url}/", headers = self.headers, json = set_user_schema().model_dump())
+
+		assert response.status_code == 201
+
+		return response.json()
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
+	def test_async_create_and_get_user(self, mockToken):
+		"""
+			Validar crear y obtener un usuario con la sesión asíncrona
+		"""
+		user = self.create_user()
+
+		response = client.get(f"{self.url}/{user['id']}", headers = {**self.headers, **self.auth})
+
+		assert response.status_code == 200
+		assert response.json()["email"] == user["email"]
+		assert any("INSERT INTO user" in query for query in self.queries)
+
+		with Session(self.engine) as db:
+			assert db.get(User, user["id"]).username == user["username"]
+
+
+	def test_async_login_rehash_password(self):
+		"""
+			Validar el login y que la tarea de fondo actualice el hash
+			con su propia sesión asíncrona
+		"""
+		user = self.create_user()
+		data = set_user_schema()
+
+		with patch("apps.users.commands.utils.password.PASSWORD_BCRYPT_ROUNDS", 4):
+			response = client.post(
+				f"{self.url}/login",
+				headers = self.headers,
+				json = schemas.UserLogin(email = data.email, password = data.password).model_dump()
+			)
+
+		assert response.status_code == 200
+		assert "token" in response.json()["auth"]
+
+		with Session(self.engine) as db:
+			assert get_cost(db.get(User, user["id"]).password) == 4
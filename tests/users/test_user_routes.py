@@ -1,19 +1,30 @@
 import pytest
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from  unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
+from sqlalchemy.exc import OperationalError
+
 from tests import ENGINE
 from tests import SESSION
 from tests import get_db
+from tests import verify_token_as
 from tests.users import set_new_user
 from tests.users import set_user_schema
 
 from main import app
 from apps import Model
+from apps import get_async_db
+from apps.utils.token.token import token_cache
 from apps.users.models import User
 from apps.users.schemas import schemas
+from apps.users.routes.routes import rehash_password
 from apps.users.commands.utils.password import ValidateHashedPassword
+from apps.users.commands.utils.password import password_executor
+from apps.users.commands.utils.password import get_cost
 from apps.users.commands.utils.error_messages import (
 	EmailORUsernameInvalid,
 	DoesNotExistsUser,
@@ -23,7 +34,9 @@ from apps.users.commands.utils.error_messages import (
 	UsernamelUnchanged,
 	InvalidCredentials,
 	InvalidCredentialsNoEmail,
-	SerializerUser
+	SerializerUser,
+	PasswordServiceBusy,
+	RefreshTokenRevoked
 )
 
 ResponseNoToken = {"detail": "Ausencia del token en la cabecera"}
@@ -32,11 +45,15 @@ TokenExpirado = {
 }
 ResponseTokenNoValido = {"detail": "Token no valido"}
 
+app.dependency_overrides[get_async_db] = get_db
+
 client = TestClient(app)
 
 class TestRouterUser:
 
 	def setup_method(self):
+		token_cache.clear()
+
 		Model.metadata.drop_all(ENGINE)
 		Model.metadata.create_all(ENGINE)
 
@@ -58,7 +75,6 @@ class TestRouterUser:
 		self.db.close()
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_create_user(self):
 		""" Validando ruta para crear un usuario"""
 
@@ -91,7 +107,6 @@ class TestRouterUser:
 		set_user_schema(username = "bol19"),
 		set_user_schema(email = "bol19@data.com")
 	])
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_create_user_with_an_existing_email_or_username(self, data_user):
 		""" Validar que no se cree un usuario con un email o username ya registrado """
 
@@ -109,8 +124,7 @@ class TestRouterUser:
 
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_get_user_by_id(self, mockToken):
 		""" Validar obtener usuario por ID"""
 
@@ -132,8 +146,7 @@ class TestRouterUser:
 		assert resultJson['email'] == user.email
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_get_user_does_not_exists(self, mockToken):
 		""" Obtener información de un usuario que no existe """
 
@@ -152,7 +165,6 @@ class TestRouterUser:
 		assert resultJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_get_user_by_id_without_authorization(self):
 		"""
 			Obtener información de un usuario, pero
@@ -167,7 +179,6 @@ class TestRouterUser:
 		assert resultJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_get_user_by_id_with_expired_token(self):
 		"""
 			Obtener información de un usuario, pero
@@ -184,8 +195,7 @@ class TestRouterUser:
 		assert resultJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_delete_user(self, mockToken):
 		""" Validar que se elimine un Usuario """
 
@@ -200,8 +210,7 @@ class TestRouterUser:
 		assert resultStatus == 204
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as(user_id = 100))
 	def test_delete_user_does_not_exists(self, mockToken):
 		"""
 			Intenar eliminar un usuario, pero
@@ -222,7 +231,6 @@ class TestRouterUser:
 		assert resultJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_delete_user_without_authorization(self):
 		"""
 			Intenar eliminar un usuario, pero
@@ -239,7 +247,6 @@ class TestRouterUser:
 		assert resultJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_delete_user_with_token_expired(self):
 		"""
 			Intenar eliminar un usuario, pero
@@ -257,8 +264,26 @@ class TestRouterUser:
 		assert resultJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as(user_id = 2))
+	def test_delete_user_of_another_user(self, mockToken):
+		"""
+			Intenar eliminar un usuario, pero
+			con el token de otro usuario
+		"""
+		self.headers.update(self.auth)
+		user_id = 1
+
+		response = client.delete(f"{self.url}/{user_id}", headers = self.headers)
+
+		resultStatus = response.status_code
+		resultJson = response.json()
+
+		assert resultStatus == 403
+		assert resultJson == {"detail": "No tiene permisos sobre este usuario"}
+		assert self.db.get(User, user_id) is not None
+
+
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_email_user(self, mockToken):
 		""" Validar actualización del 'email' del usuario """
 
@@ -286,8 +311,7 @@ class TestRouterUser:
 		assert resultJson['email'] == infoUdate.email
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as(user_id = 100))
 	def test_update_email_does_not_exists_user(self, mockToken):
 		""" Actualizar el 'email' de un usuario que no existe """
 
@@ -314,8 +338,7 @@ class TestRouterUser:
 		assert resultJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_email_with_existing_email(self, mockToken):
 		""" Actualizar un 'email' con uno ya registrado """
 		DATA_EMAIL = "bolivar19@data.com"
@@ -348,8 +371,7 @@ class TestRouterUser:
 		assert resultJson == {"message": EmailAlreadyExists.get(email = infoUdate.email)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_email_unchanged(self, mockToken):
 		""" 
 			Intentar hacer una actualización del 'email' pero,
@@ -380,8 +402,7 @@ class TestRouterUser:
 		assert resultJson == {"message": EmailUnchanged.get()}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_email_with_invalid_credentials(self, mockToken):
 		""" 
 			Actualizando email pero ingresando credenciales
@@ -410,7 +431,6 @@ class TestRouterUser:
 		assert resultJson == {"message": InvalidCredentials.get()}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_email_user_without_authorization(self):
 		"""
 			Actualizando email pero, sin enviar
@@ -436,7 +456,6 @@ class TestRouterUser:
 		assert resultJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_email_user_with_token_expired(self):
 		"""
 			Actualizando email pero, enviando un token
@@ -463,8 +482,7 @@ class TestRouterUser:
 		assert resultJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_password_user(self, mockToken):
 		""" Validar actualización del 'password' """
 
@@ -492,8 +510,7 @@ class TestRouterUser:
 		assert resultJson['email'] == user.email
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as(user_id = 100))
 	def test_update_password_does_not_exists_user(self, mockToken):
 		""" 
 			Actualizar 'password' de un usuario que no existe
@@ -522,7 +539,6 @@ class TestRouterUser:
 		assert resultJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_password_user_without_authorization(self):
 		"""
 			Actualizar 'password' de un usuario, pero
@@ -549,7 +565,6 @@ class TestRouterUser:
 		assert resultJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_password_user_with_expired_token(self):
 		"""
 			Actualizar 'password' de un usuario, pero
@@ -577,8 +592,7 @@ class TestRouterUser:
 		assert resultJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_username_user(self, mockToken):
 		""" Validar actualización del nombre de usuario """
 
@@ -606,8 +620,7 @@ class TestRouterUser:
 		assert resultJson["username"] == infoUdate.username
 
 	
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as(user_id = 100))
 	def test_update_username_does_not_exists_user(self, mockToken):
 		""" 
 			Intentar actualizar el 'username' de un usuario que
@@ -638,8 +651,7 @@ class TestRouterUser:
 		assert resultJson == {"message": DoesNotExistsUser.get(id = user_id)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_username_with_existing_username(self, mockToken):
 		""" Actualizar 'username' pero con una ya registrado. """
 		mockToken.result_value.state.result_value = True
@@ -671,8 +683,7 @@ class TestRouterUser:
 		assert resultJson == {"message": UsernameAlreadyExists.get(username = infoUdate.username)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_username_unchanged(self, mockToken):
 		""" 
 			Intentar actualizar el 'username' sin
@@ -704,8 +715,7 @@ class TestRouterUser:
 		assert resultJson == {"message": UsernamelUnchanged.get()}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_username_with_invalid_credentials(self, mockToken):
 		""" 
 			Intentar actualizar el 'username' pero ingresando
@@ -742,8 +752,7 @@ class TestRouterUser:
 		aliquam unde animi quod debitis voluptates recusandae ut minima, 
 		eos dicta molestiae accusamus?""", "password": "12345"},
 	])
-	@patch("apps.users.commands.commands.get_db", get_db)
-	@patch("apps.utils.token.token.verify_token")
+	@patch("apps.utils.token.token.verify_token", side_effect = verify_token_as())
 	def test_update_username_user_with_wrong_value_username(self, mockToken, update_user):
 		"""
 			Intentar actualizar el 'username' pero,
@@ -768,7 +777,6 @@ class TestRouterUser:
 		assert resultJson["message"] == "La longitud debe ser entre 4 y 20 caracteres en (username)"
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_username_user_without_authorization(self):
 		"""
 			Intentar actualizar el 'username' pero,
@@ -794,7 +802,6 @@ class TestRouterUser:
 		assert resultJson == ResponseNoToken
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_update_username_user_with_token_expired(self):
 		"""
 			Intentar actualizar el 'username' pero,
@@ -822,7 +829,6 @@ class TestRouterUser:
 		assert resultJson == ResponseTokenNoValido
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_login_user(self):
 		""" Valiadar el acceso del usuario """
 
@@ -852,7 +858,133 @@ class TestRouterUser:
 		assert "refresh" in resultJson["auth"]
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
+	def test_refresh_and_logout(self):
+		""" Validar la rotación del refresh token y el logout """
+		data = set_user_schema()
+
+		response = client.post(
+			f"{self.url}/login",
+			headers = self.headers,
+			json = {"email": data.email, "password": data.password}
+		)
+		refresh = response.json()["auth"]["refresh"]
+
+		response = client.post(f"{self.url}/refresh", headers = self.headers, json = {"token": refresh})
+
+		assert response.status_code == 200
+		assert response.json()["auth"]["refresh"] != refresh
+
+		response = client.post(
+			f"{self.url}/logout", 
+			headers = self.headers, 
+			json = {"token": response.json()["auth"]["refresh"]}
+		)
+
+		assert response.status_code == 204
+
+		# El refresh token ya usado pertenece a la familia revocada
+		response = client.post(f"{self.url}/refresh", headers = self.headers, json = {"token": refresh})
+
+		assert response.status_code == 400
+		assert response.json() == {"message": RefreshTokenRevoked.get()}
+
+
+	@patch("apps.users.commands.utils.password.PASSWORD_BCRYPT_ROUNDS", 4)
+	def test_login_rehash_password(self):
+		""" 
+			Validar que después del login se actualiza el hash
+			al costo configurado
+		"""
+		data = set_user_schema()
+
+		auth = schemas.UserLogin(
+			email = data.email,
+			password = data.password
+		)
+
+		response = client.post(
+			f"{self.url}/login",
+			headers = self.headers,
+			json = auth.model_dump()
+		)
+
+		self.db.expire_all()
+		user = self.db.get(User, self.user.id)
+
+		assert response.status_code == 200
+		assert get_cost(user.password) == 4
+		assert ValidateHashedPassword.is_validate(data.password, user.password)
+
+
+	def test_login_without_rehash(self):
+		""" 
+			Validar que si el hash ya tiene el costo configurado
+			no se agrega la tarea de fondo
+		"""
+		data = set_user_schema()
+
+		auth = schemas.UserLogin(
+			email = data.email,
+			password = data.password
+		)
+
+		cost = get_cost(self.user.password)
+
+		with patch("apps.users.commands.utils.password.PASSWORD_BCRYPT_ROUNDS", cost), \
+			patch("apps.users.routes.routes.rehash_password") as mockRehash:
+			response = client.post(
+				f"{self.url}/login",
+				headers = self.headers,
+				json = auth.model_dump()
+			)
+
+		assert response.status_code == 200
+		assert "rehash" not in response.json()
+		mockRehash.assert_not_called()
+
+
+	def test_rehash_password_with_database_error(self):
+		""" 
+			Validar que un error de la base de datos en la
+			tarea de fondo no se propaga
+		"""
+		@asynccontextmanager
+		async def open_db():
+			raise OperationalError("SELECT 1", {}, Exception("database is locked"))
+			yield
+
+		data = set_user_schema()
+		auth = schemas.UserLogin(email = data.email, password = data.password)
+
+		assert asyncio.run(rehash_password(open_db = open_db, user_id = self.user.id, infoLogin = auth)) is None
+
+
+	def test_login_with_password_service_busy(self):
+		""" 
+			Validar que el login responde 503 cuando el pool
+			de contraseñas no admite más tareas
+		"""
+		data = set_user_schema()
+
+		auth = schemas.UserLogin(
+			email = data.email,
+			password = data.password
+		)
+
+		slots = threading.BoundedSemaphore(1)
+		slots.acquire()
+
+		with patch.object(password_executor, "slots", slots):
+			response = client.post(
+				f"{self.url}/login",
+				headers = self.headers,
+				json = auth.model_dump()
+			)
+
+		assert response.status_code == 503
+		assert response.json() == {"message": PasswordServiceBusy.get()}
+
+
 	def test_login_with_an_invalid_email(self):
 		""" 
 			Intentar acceder al sistema con un email incorrecto
@@ -878,7 +1010,6 @@ class TestRouterUser:
 		assert resultJson == {"message": InvalidCredentialsNoEmail.get(email = auth.email)}
 
 
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_login_with_invalid_credentials(self):
 		""" 
 			Intentar acceder al sistema con credenciales 
@@ -5,7 +5,6 @@ from pydantic import ValidationError
 
 from tests import ENGINE
 from tests import SESSION
-from tests import get_db
 
 from apps import Model
 from apps.users.models import User
@@ -30,7 +29,6 @@ class TestCommandUserUtils:
 
 	@patch("apps.users.commands.utils.utils.User", User)
 	@patch("apps.users.commands.commands.User", User)
-	@patch("apps.users.commands.commands.get_db", get_db)
 	def test_serializer_user(self):
 		""" Validar que se genera un objeto User serializado """
 		user = User(
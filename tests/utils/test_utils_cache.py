@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from apps import Model
+from apps.users.models import User
+from apps.projects.models import Project
+from apps.utils.cache.cache import MemoryCache
+from apps.utils.cache.cache import DetailCache
+from apps.utils.cache.cache import CacheBackend
+from apps.utils.cache.cache import cache_key
+
+
+class DictCache(CacheBackend):
+	""" Backend local sin TTL ni límite, como el que reemplazaría a Redis """
+
+	def __init__(self):
+		self.values = {}
+		self.tags = {}
+
+	def get(self, key):
+		return self.values.get(key)
+
+	def set(self, key, value, tags = ()):
+		self.values[key] = value
+
+		for tag in tags:
+			self.tags.setdefault(tag, set()).add(key)
+
+	def delete(self, *keys):
+		for key in keys:
+			self.values.pop(key, None)
+
+	def delete_tag(self, tag):
+		self.delete(*self.tags.pop(tag, ()))
+
+	def clear(self):
+		self.values.clear()
+		self.tags.clear()
+
+
+def test_memory_cache_lru():
+	""" Validar que al llenarse se descarta la entrada usada hace más tiempo """
+	cache = MemoryCache(max_size = 2, ttl = 60)
+
+	cache.set("a", 1)
+	cache.set("b", 2)
+	cache.get("a")
+	cache.set("c", 3)
+
+	assert cache.get("a") == 1
+	assert cache.get("b") is None
+	assert cache.get("c") == 3
+	assert cache.snapshot() == {
+		"size": 2,
+		"max_size": 2,
+		"hits": 3,
+		"misses": 1,
+		"hit_ratio": 0.75,
+		"evictions": 1,
+		"expirations": 0,
+	}
+
+
+def test_memory_cache_ttl():
+	""" Validar que una entrada vencida ya no se devuelve """
+	cache = MemoryCache(max_size = 10, ttl = 30)
+
+	with patch("apps.utils.cache.cache.time.monotonic", return_value = 1000):
+		cache.set("a", 1)
+
+	with patch("apps.utils.cache.cache.time.monotonic", return_value = 1029):
+		assert cache.get("a") == 1
+
+	with patch("apps.utils.cache.cache.time.monotonic", return_value = 1030):
+		assert cache.get("a") is None
+
+	assert cache.snapshot()["size"] == 0
+	assert cache.snapshot()["expirations"] == 1
+
+
+def test_memory_cache_tags():
+	""" Validar que invalidar una etiqueta borra todas sus claves """
+	cache = MemoryCache(max_size = 10, ttl = 60)
+
+	cache.set("project:1", "A", tags = ["project:1"])
+	cache.set("ticket:1", "B", tags = ["project:1"])
+	cache.set("ticket:2", "C", tags = ["project:2"])
+
+	cache.delete_tag("project:1")
+
+	assert cache.get("project:1") is None
+	assert cache.get("ticket:1") is None
+	assert cache.get("ticket:2") == "C"
+	assert cache.tags == {"project:2": {"ticket:2"}}
+
+
+def test_memory_cache_disabled():
+	""" Con 'max_size' 0 no se guarda nada """
+	cache = MemoryCache(max_size = 0, ttl = 60)
+
+	cache.set("a", 1)
+
+	assert cache.get("a") is None
+
+
+def test_detail_cache_with_other_backend():
+	""" Validar el cache de lectura con un backend distinto al de memoria """
+	engine = create_engine("sqlite://", poolclass = StaticPool)
+	Model.metadata.create_all(engine)
+
+	with Session(engine) as db:
+		db.add(User(name = "bolivar", email = "bolivar@gmail.com", username = "bolivar19", password = "12345"))
+		db.add(Project(title = "Proyecto A", description = "descripción", priority = "alta", user_id = 1))
+		db.commit()
+
+	backend = DictCache()
+	cache = DetailCache(backend = MemoryCache(max_size = 10, ttl = 60))
+	cache.use(backend)
+
+	queries = []
+	event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+	def load(db):
+		return cache.load(
+			db,
+			key = cache_key("project", 1),
+			loader = lambda: db.get(Project, 1),
+			tags = lambda project: [cache_key("user", project.user_id)]
+		)
+
+	with Session(engine) as db:
+		assert load(db).title == "Proyecto A"
+
+	with Session(engine) as db:
+		project = load(db)
+
+		# La copia del cache queda en la sesión, sin consultar la base de datos
+		assert project in db
+		assert project.title == "Proyecto A"
+
+	assert len(queries) == 1
+
+	cache.invalidate_tag(cache_key("user", 1))
+
+	assert backend.values == {}
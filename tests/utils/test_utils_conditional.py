@@ -0,0 +1,79 @@
+import datetime
+
+from fastapi import FastAPI
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from apps.utils.conditional.conditional import make_etag
+from apps.utils.conditional.conditional import http_date
+from apps.utils.conditional.conditional import matches_etag
+from apps.utils.conditional.conditional import ConditionalMiddleware
+
+
+def test_make_etag():
+	""" Validar que el mismo contenido da el mismo ETag débil """
+	updated = datetime.datetime(2024, 1, 1, 12, 30)
+
+	etag = make_etag("ticket", 1, updated)
+
+	assert etag.startswith('W/"')
+	assert etag == make_etag("ticket", 1, updated)
+	assert etag != make_etag("ticket", 2, updated)
+
+
+def test_matches_etag():
+	""" Validar la comparación débil de If-None-Match """
+	etag = make_etag("proyecto", 1)
+	opaque = etag.removeprefix("W/")
+
+	assert matches_etag(etag, etag)
+	assert matches_etag(opaque, etag)
+	assert matches_etag(f'"otro", {etag}', etag)
+	assert matches_etag("*", etag)
+	assert not matches_etag('"otro"', etag)
+
+
+def test_http_date():
+	""" Las fechas sin zona se toman como UTC """
+	assert http_date(datetime.datetime(2024, 1, 1, 12, 30, 15, 500)) == "Mon, 01 Jan 2024 12:30:15 GMT"
+
+
+def test_conditional_middleware():
+	""" Validar que el middleware cambia un 200 con el mismo ETag por un 304 """
+	updated = datetime.datetime(2024, 1, 1, 12, 30)
+	etag = make_etag("recurso", 1)
+
+	app = FastAPI()
+	app.add_middleware(ConditionalMiddleware)
+
+	@app.get("/recurso")
+	def recurso(response: Response):
+		response.headers["ETag"] = etag
+		response.headers["Last-Modified"] = http_date(updated)
+
+		return {"id": 1}
+
+	client = TestClient(app)
+
+	response = client.get("/recurso")
+
+	assert response.status_code == 200
+	assert response.json() == {"id": 1}
+
+	response = client.get("/recurso", headers = {"If-None-Match": etag})
+
+	assert response.status_code == 304
+	assert response.content == b""
+	assert response.headers["ETag"] == etag
+
+	response = client.get("/recurso", headers = {"If-None-Match": '"otro"'})
+
+	assert response.status_code == 200
+
+	response = client.get("/recurso", headers = {"If-Modified-Since": http_date(updated)})
+
+	assert response.status_code == 304
+
+	response = client.get("/recurso", headers = {"If-Modified-Since": http_date(updated - datetime.timedelta(seconds = 1))})
+
+	assert response.status_code == 200
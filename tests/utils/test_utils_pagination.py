@@ -6,6 +6,10 @@ from fastapi import Request
 from apps.utils.pagination.pagination import add_params_to_url
 from apps.utils.pagination.pagination import set_url_pagination
 from apps.utils.pagination.pagination import get_url_from_request
+from apps.utils.pagination.pagination import encode_cursor
+from apps.utils.pagination.pagination import decode_cursor
+from apps.utils.pagination.pagination import CursorNext
+from apps.utils.pagination.pagination import CursorPrevious
 
 
 @pytest.mark.parametrize(
@@ -23,6 +27,11 @@ from apps.utils.pagination.pagination import get_url_from_request
 			"project_id": 21,
 			"type": "abierto",
 			}, "&project_id=21&type=abierto"
+		),
+		(
+			{
+			"title": "Limites de petición",
+			}, "&title=Limites%20de%20petici%C3%B3n"
 		)
 	]
 )
@@ -160,3 +169,59 @@ def test_invalid_url_from_request_with_wrong_param(request_value):
 	""" Validando error al pasar un parametro errorneo"""
 	result = get_url_from_request(request = request_value)
 
+
+
+def test_valid_encode_and_decode_cursor():
+	cursor = encode_cursor(25)
+	cursor_previous = encode_cursor(3, CursorPrevious)
+
+	assert "=" not in cursor
+	assert decode_cursor(cursor) == (25, CursorNext)
+	assert decode_cursor(cursor_previous) == (3, CursorPrevious)
+
+
+@pytest.mark.parametrize("cursor", ["", "cursor-invalido", "eyJrIjoiYSIsImQiOiJuIn0"])
+@pytest.mark.xfail(reason = "Cursor invalido", raises = ValueError)
+def test_invalid_decode_cursor(cursor):
+	decode_cursor(cursor)
+
+
+class Element:
+	def __init__(self, id):
+		self.id = id
+
+
+def test_valid_set_url_pagination_with_cursor():
+	pageSize = 2
+	elements = [Element(5), Element(6)]
+
+	pg = set_url_pagination(
+		request = {"base_url": "http://127.0.0.1:8000", "path": "/ticket/23"},
+		elements = elements,
+		total_elements = None,
+		page = 1,
+		pageSize = pageSize,
+		cursor = encode_cursor(4)
+	)
+
+	pg_next = f"http://127.0.0.1:8000/ticket/23?cursor={encode_cursor(6)}&pageSize={pageSize}"
+	pg_previous = f"http://127.0.0.1:8000/ticket/23?cursor={encode_cursor(5, CursorPrevious)}&pageSize={pageSize}"
+
+	assert pg.get("next") == pg_next
+	assert pg.get("previous") == pg_previous
+	assert pg.get("cursor") == encode_cursor(6)
+
+
+def test_valid_set_url_pagination_with_cursor_last_page():
+	pg = set_url_pagination(
+		request = {"base_url": "http://127.0.0.1:8000", "path": "/ticket/23"},
+		elements = [Element(7)],
+		total_elements = None,
+		page = 1,
+		pageSize = 2,
+		cursor = encode_cursor(6)
+	)
+
+	assert pg.get("next") is None
+	assert pg.get("cursor") is None
+	assert pg.get("previous") is not None
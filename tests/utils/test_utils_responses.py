@@ -0,0 +1,89 @@
+import json
+import datetime
+
+import pytest
+from unittest.mock import patch
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+
+from pydantic import ValidationError
+
+from apps.users.models import User
+from apps.projects.models import Project
+from apps.tickets.models import Ticket
+from apps.tickets.models import ChoicesType
+from apps.tickets.models import ChoicesState
+from apps.tickets.models import ChoicesPrority
+from apps.projects.models import ChoicesPrority as ProjectPriority
+from apps.tickets.schemas import schemas
+from apps.utils.responses.responses import dump_json
+from apps.utils.responses.responses import type_adapter
+from apps.utils.responses.responses import ModelResponse
+from apps.utils.responses.responses import default_response
+
+
+def set_content(total = 3):
+	now = datetime.datetime(2024, 1, 1, 12, 30)
+
+	user = User(id = 1, name = "bolivar", email = "bolivar@gmail.com", username = "bolivar19", password = "12345")
+	project = Project(id = 1, title = "Proyecto A", description = "descripción", priority = ProjectPriority.alta, user_id = 1, user = user, created = now, updated = now)
+	tickets = [
+		Ticket(id = i, title = f"Tarea {i}", description = "descripción", priority = ChoicesPrority.baja, state = ChoicesState.nuevo, type = ChoicesType.abierto, project_id = 1, created = now, updated = now)
+		for i in range(1, total + 1)
+	]
+
+	return {
+		"previous": None,
+		"current": 1,
+		"next": "http://testserver/ticket/project/1/search?page=2",
+		"cursor": None,
+		"project": project,
+		"content": {"total": total, "tickets": tickets}
+	}
+
+
+def test_dump_json_same_as_response_model():
+	""" Validar que el JSON es el mismo que genera el 'response_model' de FastAPI """
+	content = set_content()
+	adapter = type_adapter(schemas.TicketsByProjectResponse)
+
+	expected = jsonable_encoder(adapter.validate_python(content, from_attributes = True))
+
+	assert json.loads(dump_json(schemas.TicketsByProjectResponse, content)) == expected
+	assert type_adapter(schemas.TicketsByProjectResponse) is adapter
+
+
+def test_model_response():
+	""" Validar el cuerpo y que se conserven los headers de la ruta """
+	response = ModelResponse(schemas.TicketsByProjectResponse, set_content(total = 1), headers = {"ETag": 'W/"1"'})
+
+	body = json.loads(response.body)
+
+	assert response.status_code == 200
+	assert response.headers["ETag"] == 'W/"1"'
+	assert response.headers["content-type"] == "application/json"
+	assert body["project"]["priority"] == "alta"
+	assert body["content"]["tickets"][0]["created"] == "2024-01-01T12:30:00"
+
+
+def test_model_response_with_wrong_content():
+	""" El contenido que no cumple el schema no se envía """
+	content = set_content()
+	del content["project"]
+
+	with pytest.raises(ValidationError):
+		ModelResponse(schemas.TicketsByProjectResponse, content)
+
+
+def test_default_response(caplog):
+	""" Validar ORJSONResponse por defecto y el aviso si falta orjson """
+	assert default_response() is ORJSONResponse
+	assert not caplog.records
+
+	with patch("apps.utils.responses.responses.orjson", None):
+		assert default_response() is JSONResponse
+
+	assert "orjson" in caplog.records[0].getMessage()
+	assert caplog.records[0].levelname == "WARNING"
@@ -0,0 +1,72 @@
+from sqlalchemy.exc import OperationalError
+
+from apps.utils.token.revocation import BloomFilter
+from apps.utils.token.revocation import RevocationList
+
+
+def test_bloom_filter():
+	""" Validar que no hay falsos negativos y pocos falsos positivos """
+	bloom = BloomFilter(capacity = 1000, error_rate = 0.01)
+	revoked = [f"revoked-{i}" for i in range(1000)]
+
+	for value in revoked:
+		bloom.add(value)
+
+	assert all(value in bloom for value in revoked)
+
+	false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+
+	assert bloom.count == 1000
+	assert false_positives < 300
+
+
+def test_revocation_list_checks_db_only_on_positives():
+	""" Validar que una familia no revocada no consulta la base de datos """
+	confirmed = []
+
+	def confirm(family):
+		confirmed.append(family)
+		return family == "revoked"
+
+	revocation = RevocationList(capacity = 100, loader = lambda: ["revoked"], confirm = confirm)
+
+	assert not revocation.is_revoked(None)
+	assert not revocation.is_revoked("valid")
+	assert revocation.is_revoked("revoked")
+
+	assert confirmed == ["revoked"]
+	assert revocation.snapshot() == {"revoked": 1, "checks": 2, "db_checks": 1}
+
+
+def test_revocation_list_reload():
+	""" 
+		Validar que la recarga ve lo revocado por otros workers
+		y conserva lo revocado en este mientras corría
+	"""
+	families = []
+	revocation = RevocationList(capacity = 100, refresh_seconds = 0, loader = lambda: list(families), confirm = lambda family: True)
+
+	assert not revocation.is_revoked("other-worker")
+
+	families.append("other-worker")
+	# Todavía no se ve en la consulta (sin commit)
+	revocation.add("this-worker")
+
+	assert revocation.is_revoked("this-worker")
+
+	families.append("this-worker")
+
+	assert revocation.is_revoked("other-worker")
+	assert revocation.is_revoked("this-worker")
+
+
+def test_revocation_list_reload_with_db_error():
+	""" Validar que un error de la base de datos conserva el filtro actual """
+	def loader():
+		raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+	revocation = RevocationList(capacity = 100, loader = loader, confirm = lambda family: True)
+	revocation.add("revoked")
+
+	assert revocation.is_revoked("revoked")
+	assert revocation.loaded is not None
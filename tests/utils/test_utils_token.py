@@ -1,5 +1,9 @@
 import jwt
+import time
 import pytest
+from unittest.mock import patch
+
+from fastapi import HTTPException
 
 from pydantic import ValidationError
 
@@ -10,9 +14,16 @@ from apps.utils.token.token import extract_token_from_str
 from apps.utils.token.token import validate_token
 from apps.utils.token.token import create_refresh_token
 from apps.utils.token.token import validate_authorization
+from apps.utils.token.token import get_principal
+from apps.utils.token.token import authorize_user
+from apps.utils.token.token import Principal
+from apps.utils.token.token import compact_claims
+from apps.utils.token.token import TOKEN_VERSION
 from apps.utils.token.token import TokenCreate
 from apps.utils.token.token import TokenRefresh
 from apps.utils.token.token import TokenDecode
+from apps.utils.token.token import TokenCache
+from apps.utils.token.token import token_cache
 
 from apps.utils.token.exceptions import TokenInvalidError
 from apps.utils.token.exceptions import TokenExpiredError
@@ -142,3 +153,134 @@ def test_invalid_verification_token():
 
     assert len(error_token) != len(token)
     assert not result.state
+
+
+def test_token_cache_lru_and_expiration():
+    """ Comprobar la caché de tokens: aciertos, expulsión LRU y expiración"""
+    cache = TokenCache(max_size = 2)
+    exp = time.time() + 60
+
+    cache.set("token-1", {"id": 1, "exp": exp})
+    cache.set("token-2", {"id": 2, "exp": exp})
+
+    assert cache.get("token-1") == {"id": 1, "exp": exp}
+
+    cache.set("token-3", {"id": 3, "exp": exp})
+
+    assert cache.get("token-2") is None
+    assert cache.get("token-3")["id"] == 3
+
+    cache.set("token-4", {"id": 4, "exp": time.time() - 1})
+    cache.set("token-5", {"id": 5})
+
+    assert cache.get("token-4") is None
+    assert cache.get("token-5") is None
+    assert cache.snapshot() == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+    }
+
+
+def test_validate_authorization_uses_cache():
+    """ Comprobar que un token valido solo se verifica una vez"""
+    token = TokenCreate.main(data = {"id": 1, "name": "Freddy"})
+    token_cache.clear()
+
+    assert validate_authorization(authorization = f"Bearer {token}") == token
+
+    with patch("apps.utils.token.token.verify_token") as mockVerify:
+        assert validate_authorization(authorization = f"Bearer {token}") == token
+
+    mockVerify.assert_not_called()
+
+
+def test_validate_authorization_without_cache_invalid_token():
+    """ Comprobar que un token invalido no se guarda en la caché"""
+    token = TokenCreate.main(data = {"id": 1, "name": "Freddy"})[:-5]
+    token_cache.clear()
+
+    with pytest.raises(HTTPException):
+        validate_authorization(authorization = f"Bearer {token}")
+
+    assert token_cache.get(token) is None
+
+
+def test_get_principal_decodes_once():
+    """ Comprobar que el principal sale de la caché sin volver a verificar el token"""
+    token = TokenCreate.main(data = {"id": 1, "username": "freddy19", "name": "Freddy"})
+    token_cache.clear()
+
+    principal = get_principal(authorization = f"Bearer {token}")
+
+    assert isinstance(principal, Principal)
+    assert principal.id == 1
+    assert principal.username == "freddy19"
+    assert principal.exp > time.time()
+
+    with patch("apps.utils.token.token.verify_token") as mockVerify:
+        assert get_principal(authorization = f"Bearer {token}") is principal
+
+    mockVerify.assert_not_called()
+
+
+def test_get_principal_without_id():
+    """ Comprobar que un token valido pero sin 'id' no se acepta"""
+    token = TokenCreate.main(data = {"name": "Freddy"})
+    token_cache.clear()
+
+    with pytest.raises(HTTPException) as e:
+        get_principal(authorization = f"Bearer {token}")
+
+    assert e.value.status_code == 401
+    assert token_cache.get(token) is None
+
+
+def test_authorize_user():
+    """ Comprobar que solo el dueño del token opera sobre su usuario"""
+    principal = Principal(id = 1, username = "freddy19", exp = int(time.time()) + 60)
+
+    assert authorize_user(id = 1, principal = principal) is principal
+
+    with pytest.raises(HTTPException) as e:
+        authorize_user(id = 2, principal = principal)
+
+    assert e.value.status_code == 403
+
+
+def test_compact_claims():
+    """ Comprobar los claims v2 desde un usuario y desde tokens v1 y v2"""
+    user = {"id": 1, "name": "Freddy", "email": "freddy10@gmail.com", "password": "$2b$10$..."}
+    expected = {"sub": "1", "ver": TOKEN_VERSION}
+
+    assert compact_claims(user) == expected
+    assert compact_claims({"sub": "1", "ver": 2, "exp": 1}) == expected
+
+    with pytest.raises(ValueError):
+        compact_claims({"name": "Freddy"})
+
+
+def test_compact_token_is_smaller():
+    """ Comprobar que el token v2 es más pequeño y se acepta"""
+    user = {"id": 1, "name": "Freddy", "email": "freddy10@gmail.com", "username": "freddy19", "password": "$2b$10$" + "a" * 53}
+    old_token = TokenCreate.main(data = user)
+    token = TokenCreate.main(data = compact_claims(user))
+    token_cache.clear()
+
+    assert len(token) < len(old_token)
+    assert get_principal(authorization = f"Bearer {token}").id == 1
+    assert get_principal(authorization = f"Bearer {old_token}").id == 1
+
+
+def test_get_principal_with_old_version():
+    """ Comprobar que un token v1 se rechaza al subir 'TOKEN_MIN_VERSION'"""
+    token = TokenCreate.main(data = {"id": 1, "username": "freddy19"})
+    token_cache.clear()
+
+    with patch("apps.utils.token.token.TOKEN_MIN_VERSION", 2):
+        with pytest.raises(HTTPException) as e:
+            get_principal(authorization = f"Bearer {token}")
+
+    assert e.value.status_code == 401
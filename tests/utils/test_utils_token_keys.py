@@ -0,0 +1,148 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+import jwt
+
+pytest.importorskip("cryptography")
+
+from apps.utils.token.keys import KeyRing
+from apps.utils.token.keys import generate_key
+from apps.utils.token.token import TokenCreate
+from apps.utils.token.token import encode_jwt
+from apps.utils.token.token import decode_jwt
+from apps.utils.token.token import validate_token
+from apps.utils.token.benchmark import benchmark_tokens
+from apps.utils.token.exceptions import TokenInvalidError
+
+
+CLAIMS = {"sub": "1", "ver": 2}
+
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_key_ring_sign_and_verify(tmp_path, algorithm):
+	""" Firmar y verificar con la llave del directorio y su 'kid' """
+	generate_key(str(tmp_path), "2025-01", algorithm)
+	ring = KeyRing(path = str(tmp_path), algorithm = algorithm)
+
+	token = encode_jwt(CLAIMS, ring = ring)
+
+	assert jwt.get_unverified_header(token)["kid"] == "2025-01"
+	assert decode_jwt(token, ring = ring) == CLAIMS
+
+
+def test_key_ring_rotation(tmp_path):
+	""" Rotar la llave sin reiniciar: los tokens viejos siguen valiendo hasta borrar su llave """
+	path = str(tmp_path)
+	generate_key(path, "old", "EdDSA")
+	ring = KeyRing(path = path, algorithm = "EdDSA", refresh_seconds = 0)
+
+	old_token = encode_jwt(CLAIMS, ring = ring)
+
+	# La nueva llave privada es la más reciente
+	generate_key(path, "new", "EdDSA")
+	os.utime(os.path.join(path, "new.pem"), (time.time() + 1, time.time() + 1))
+
+	new_token = encode_jwt(CLAIMS, ring = ring)
+
+	assert jwt.get_unverified_header(new_token)["kid"] == "new"
+	assert decode_jwt(old_token, ring = ring) == CLAIMS
+
+	os.remove(os.path.join(path, "old.pem"))
+	os.remove(os.path.join(path, "old.pub"))
+
+	with pytest.raises(jwt.InvalidSignatureError):
+		decode_jwt(old_token, ring = ring)
+
+	assert decode_jwt(new_token, ring = ring) == CLAIMS
+
+
+def test_key_ring_verification_only(tmp_path):
+	""" Un worker con solo llaves públicas verifica, pero no puede firmar """
+	signer_path = tmp_path / "signer"
+	verifier_path = tmp_path / "verifier"
+	signer_path.mkdir()
+	verifier_path.mkdir()
+
+	generate_key(str(signer_path), "2025-01", "ES256")
+	os.rename(signer_path / "2025-01.pub", verifier_path / "2025-01.pub")
+
+	signer = KeyRing(path = str(signer_path), algorithm = "ES256")
+	verifier = KeyRing(path = str(verifier_path), algorithm = "ES256", refresh_seconds = 3600)
+
+	token = encode_jwt(CLAIMS, ring = signer)
+
+	assert decode_jwt(token, ring = verifier) == CLAIMS
+	assert verifier.loads == 1
+
+	with pytest.raises(ValueError):
+		verifier.signing_key()
+
+
+def test_key_ring_unknown_kids(tmp_path):
+	""" 
+		'kid' inventados: como mucho una lectura del directorio por
+		intervalo, y una llave rotada se encuentra en el siguiente
+	"""
+	path = str(tmp_path)
+	generate_key(path, "2025-01", "EdDSA")
+	ring = KeyRing(path = path, algorithm = "EdDSA", refresh_seconds = 60)
+
+	with patch.object(ring, "files", wraps = ring.files) as mockFiles:
+		for i in range(50):
+			with pytest.raises(jwt.InvalidSignatureError):
+				ring.verification_key(f"kid-{i % 5}")
+
+		assert mockFiles.call_count == 1
+
+	generate_key(path, "2025-02", "EdDSA")
+
+	with pytest.raises(jwt.InvalidSignatureError):
+		ring.verification_key("2025-02")
+
+	with patch("apps.utils.token.keys.time.monotonic", return_value = time.monotonic() + 61):
+		assert ring.verification_key("2025-02") is not None
+
+	assert ring.unknown == {}
+
+
+def test_generate_key_private_permissions(tmp_path):
+	""" La llave privada se crea solo con permisos para el dueño """
+	generate_key(str(tmp_path), "2025-01", "ES256")
+
+	assert os.stat(tmp_path / "2025-01.pem").st_mode & 0o777 == 0o600
+
+
+def test_key_ring_with_symmetric_algorithm(tmp_path):
+	""" El directorio de llaves solo aplica a ES256 y EdDSA """
+	with pytest.raises(ValueError):
+		KeyRing(path = str(tmp_path), algorithm = "HS256")
+
+
+def test_validate_token_with_key_ring(tmp_path):
+	""" Con llaves asimétricas, un token HS256 ya no es valido """
+	generate_key(str(tmp_path), "2025-01", "EdDSA")
+	ring = KeyRing(path = str(tmp_path), algorithm = "EdDSA")
+
+	hs256_token = TokenCreate.main(data = CLAIMS)
+
+	with patch("apps.utils.token.token.key_ring", ring):
+		token = TokenCreate.main(data = CLAIMS)
+
+		assert validate_token(token = token)["sub"] == "1"
+
+		with pytest.raises(TokenInvalidError):
+			validate_token(token = hs256_token)
+
+
+def test_benchmark_tokens():
+	""" Validar el resultado del benchmark de firma y verificación """
+	result = benchmark_tokens(number = 20)
+
+	assert set(result) == {"HS256", "ES256", "EdDSA"}
+
+	for times in result.values():
+		assert times["sign_us"] > 0
+		assert times["verify_us"] > 0
+		assert times["token_bytes"] > 0
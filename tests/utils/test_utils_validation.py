@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+
+from pydantic import ConfigDict
+from pydantic import ValidationError
+
+from apps.tickets.models import ChoicesType
+from apps.tickets.commands.utils import utils
+from apps.utils.validation import validation
+from apps.utils.validation.benchmark import benchmark_validate_call
+
+
+def add(a: int, b: int) -> int:
+	return a + b
+
+
+def test_validate_call_enabled():
+	"""
+		Validar que con 'VALIDATE_CALL' se validan los argumentos
+		con y sin configuración
+	"""
+	with patch.object(validation, "VALIDATE_CALL", True):
+		validated = validation.validate_call(add)
+		validated_config = validation.validate_call(config = ConfigDict(hide_input_in_errors = True))(add)
+
+	assert validated is not add
+	assert validated("1", 2) == 3
+	assert validated_config(1, "2") == 3
+
+	with pytest.raises(ValidationError):
+		validated("abc", 2)
+
+
+def test_validate_call_disabled():
+	"""
+		Validar que sin 'VALIDATE_CALL' se devuelve la
+		misma función, sin envolver
+	"""
+	with patch.object(validation, "VALIDATE_CALL", False):
+		assert validation.validate_call(add) is add
+		assert validation.validate_call(config = ConfigDict(hide_input_in_errors = True))(add) is add
+
+
+def test_validate_choice_cache_names():
+	"""
+		Validar que los nombres de las opciones se calculan
+		una sola vez por Enum
+	"""
+	utils.choice_names.cache_clear()
+
+	assert utils.validate_choice(choice = "abierto", options = ChoicesType)
+	assert not utils.validate_choice(choice = "nuevo", options = ChoicesType)
+
+	info = utils.choice_names.cache_info()
+
+	assert info.misses == 1
+	assert info.hits == 1
+
+
+def test_benchmark_validate_call():
+	"""
+		Validar el resultado del micro-benchmark
+	"""
+	result = benchmark_validate_call(number = 50)
+
+	assert result["number"] == 50
+	assert result["validated_us"] > 0
+	assert result["raw_us"] > 0
+	assert result["saved_us"] == pytest.approx(result["validated_us"] - result["raw_us"], abs = 0.02)